@@ -14,5 +14,5 @@ if [ ! -f /home/vanguard/.ssh/id_rsa.pem ]; then
     su vanguard -c 'openssl rsa -in /home/vanguard/.ssh/id_rsa.pem -pubout -out /home/vanguard/.ssh/id_rsa.pub'
 fi
 
-# Run gunicorn as vanguard user
-exec su vanguard -c 'gunicorn main:app --bind 0.0.0.0:8000 --workers 4'
+# Run gunicorn as vanguard user (gevent workers keep idle event streams cheap)
+exec su vanguard -c 'gunicorn main:app --bind 0.0.0.0:8000 --workers 4 --worker-class gevent --worker-connections 2000'
@@ -0,0 +1,8 @@
+# loaded by gunicorn from the working directory; pass it with --config when using --chdir
+
+
+def on_starting(server):
+    # schema changes run here, once, before any worker imports main.py
+    from migrations import migrate_databases
+
+    migrate_databases()
@@ -1,27 +1,45 @@
 import argon2
+import atexit
+import base64
 from argon2 import PasswordHasher
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
 from datetime import datetime, timedelta
-from flask import Flask, request, send_from_directory, jsonify
+from flask import Flask, Response, g, has_app_context, request, send_from_directory, jsonify
+from functools import wraps
 from flask_cors import CORS
 from flask_sitemapper import Sitemapper
+from migrations import migrate_databases
+import gzip
+import hashlib
+import html
+import json
 import jwt
+import math
+import multiprocessing
 import os
 import pyotp
+import queue
+import re
 import requests
 import sqlite3
 import secrets
 import threading
 import time
 import tomllib
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 FTC_API_URL = "https://ftc-api.firstinspires.org/v2.0"
 BLOCK_REGISTRATION = False
-RSA_PUBLIC_KEY = ""
-RSA_PRIVATE_KEY = ""
 
 with open("data/settings.toml", "rb") as f:
     settings = tomllib.load(f)
 
+FTC_API_URL = settings["ftc_api"].get("url", FTC_API_URL)
 FTC_API_USERNAME = settings["ftc_api"]["username"]
 FTC_API_TOKEN = settings["ftc_api"]["token"]
 NTFY_SERVER_URL = settings["notifications"]["ntfy_server_url"]
@@ -33,8 +51,357 @@ ADMIN_SECRET = settings["admin"]["admin_secret"]
 REGISTRATION_NOTIF_URL = settings["admin"]["registration_notification_url"]
 SCHEDULE_OFFSET_MINUTES_MIN = -180
 SCHEDULE_OFFSET_MINUTES_MAX = 180
+CACHE_DB_PATH = settings.get("cache", {}).get("path", "data/cache.db")
+# when set, every FTC API and ntfy exchange is appended to this archive (see tests/replay.py)
+RECORD_PATH = settings.get("record", {}).get("path", "")
+# seconds an upstream response stays fresh, keyed by the FTC API resource
+UPSTREAM_CACHE_TTLS = {
+    "events": 3600,
+    "teams": 21600,
+    "schedule": 15,
+    "matches": 10,
+    "scores": 5,
+    "rankings": 5,
+} | settings.get("cache", {}).get("ttl", {})
+METRICS_FLUSH_INTERVAL = 5
+UPSTREAM_LEASE_SECONDS = 15
+UPSTREAM_TIMEOUT = settings.get("upstream", {}).get("timeout", 5)
+UPSTREAM_FAILURE_THRESHOLD = settings.get("upstream", {}).get("failure_threshold", 5)
+UPSTREAM_MAX_STALE_SECONDS = settings.get("upstream", {}).get("max_stale_seconds", 6 * 3600)
+UPSTREAM_PROBE_INTERVAL = settings.get("upstream", {}).get("probe_interval", 10)
+UPSTREAM_RATE = settings.get("upstream", {}).get("rate_per_second", 5)
+UPSTREAM_BURST = settings.get("upstream", {}).get("burst", 20)
+# share of the bucket each priority class must leave untouched, and how long it may queue for a token
+UPSTREAM_PRIORITY_RESERVE = {"realtime": 0.0, "interactive": 0.25, "bulk": 0.5}
+UPSTREAM_PRIORITY_MAX_WAIT = {"realtime": 10, "interactive": 5, "bulk": 2}
+AUTH_ALGORITHM = settings.get("auth", {}).get("algorithm", "RS256")
+AUTH_KEYS_DIR = settings.get("auth", {}).get("keys_dir", "data/keys")
+# kid to sign with; by default the key file in AUTH_KEYS_DIR for AUTH_ALGORITHM written last
+AUTH_SIGNING_KEY = settings.get("auth", {}).get("signing_key", "")
+# access tokens are short-lived; the refresh token from login renews them without a password
+ACCESS_TOKEN_MINUTES = settings.get("auth", {}).get("access_token_minutes", 15)
+REFRESH_TOKEN_DAYS = settings.get("auth", {}).get("refresh_token_days", 30)
+# a refresh token replaced this recently is turned away without revoking its family, since two
+# tabs sharing one token can race to refresh it
+REFRESH_REUSE_GRACE_SECONDS = 30
+# argon2 parameters; tests/calibrate_argon2.py suggests values for the host
+PASSWORD_HASH_PARAMETERS = {
+    name: settings.get("passwords", {})[name]
+    for name in ("time_cost", "memory_cost", "parallelism")
+    if name in settings.get("passwords", {})
+}
+# hashing runs in this many processes per worker (0 hashes inline); callers wait at
+# most queue_timeout seconds for one of max_pending slots before getting a 503
+PASSWORD_WORKERS = settings.get("passwords", {}).get("workers", 2)
+PASSWORD_MAX_PENDING = settings.get("passwords", {}).get("max_pending", 8)
+PASSWORD_QUEUE_TIMEOUT = settings.get("passwords", {}).get("queue_timeout", 5)
+# verified tokens kept per worker so repeat requests skip the RS256 signature check
+AUTH_CACHE_SIZE = 4096
+EVENT_STREAM_POLL_SECONDS = settings.get("stream", {}).get("poll_seconds", 5)
+EVENT_STREAM_KEEPALIVE_SECONDS = 20
+DB_PATH = "data/default.db"
+# connections each worker keeps open to DB_PATH; requests past that wait up to pool_timeout seconds
+DB_POOL_SIZE = settings.get("database", {}).get("pool_size", 8)
+DB_POOL_TIMEOUT = settings.get("database", {}).get("pool_timeout", 10)
+DB_CACHED_STATEMENTS = settings.get("database", {}).get("cached_statements", 256)
+# connections each worker keeps open to CACHE_DB_PATH, which every upstream fetch and metrics flush uses
+CACHE_DB_POOL_SIZE = settings.get("cache", {}).get("pool_size", 4)
+DB_PRAGMAS = {
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -16384,
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
+} | settings.get("database", {}).get("pragmas", {})
+# times a statement that opens a write transaction is retried after "database is locked"
+DB_LOCKED_RETRIES = 3
+# when enabled, note and strategy upserts from all requests are committed together every interval_ms
+WRITE_QUEUE_ENABLED = settings.get("database", {}).get("write_queue", False)
+WRITE_QUEUE_INTERVAL_MS = settings.get("database", {}).get("write_queue_interval_ms", 5)
+WRITE_QUEUE_RESULT_TIMEOUT = 30
+# seconds between maintenance passes (0 disables them), and free pages each pass returns to the filesystem
+MAINTENANCE_INTERVAL = settings.get("maintenance", {}).get("interval", 300)
+MAINTENANCE_VACUUM_PAGES = settings.get("maintenance", {}).get("vacuum_pages", 1024)
+MAINTENANCE_BATCH_SIZE = 500
+# a pass renews its lease after every batch, so this only has to outlast one step of it
+MAINTENANCE_LEASE_SECONDS = 120
+# snapshots of default.db: seconds between scheduled ones (0 disables the schedule), how many to keep,
+# and pages copied per step with a pause after each so requests keep getting the CPU and the database
+BACKUP_DIR = settings.get("backup", {}).get("dir", "data/backups")
+BACKUP_INTERVAL = settings.get("backup", {}).get("interval", 86400)
+BACKUP_KEEP = settings.get("backup", {}).get("keep", 7)
+BACKUP_COMPRESS = settings.get("backup", {}).get("compress", False)
+BACKUP_STEP_PAGES = settings.get("backup", {}).get("step_pages", 256)
+BACKUP_STEP_SLEEP_MS = settings.get("backup", {}).get("step_sleep_ms", 25)
+# an unfinished backup older than this is assumed to have died with its worker
+BACKUP_STALE_SECONDS = 6 * 3600
+# days rows are kept once they stop mattering; 0 keeps them forever
+RETENTION_DAYS = {
+    "notifications": 30,
+    "denied_registrations": 90,
+    "orphaned_strategy": 180,
+    "refresh_tokens": 7,
+} | settings.get("maintenance", {}).get("retention_days", {})
+# days of stats_counters snapshots kept for the growth rates on the admin dashboard
+STATS_HISTORY_DAYS = 7
+# table and condition (on the cutoff timestamp) each retention rule deletes from
+RETENTION_RULES = {
+    "notifications": ("notifications", "sent_at < ?"),
+    "denied_registrations": ("registrations", "status = 'denied' AND reviewed_at < ?"),
+    # boards of teams whose account was deleted
+    "orphaned_strategy": (
+        "strategy",
+        "updated_at < ? AND team_id NOT IN (SELECT id FROM users)",
+    ),
+    "refresh_tokens": ("refresh_tokens", "expires_at < ? OR revoked_at < ?"),
+}
+
+
+class RetryingCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        return self._retry(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._retry(super().executemany, sql, seq_of_parameters)
+
+    def _retry(self, execute, sql, parameters):
+        # only the statement that starts a transaction can be rerun safely; later
+        # ones would lose the earlier writes of the rolled-back transaction
+        in_transaction = self.connection.in_transaction
+        for attempt in range(DB_LOCKED_RETRIES + 1):
+            try:
+                return execute(sql, parameters)
+            except sqlite3.OperationalError as e:
+                if "database is locked" not in str(e):
+                    raise
+                prefix = self.connection.pool.metric_prefix
+                if in_transaction or attempt == DB_LOCKED_RETRIES:
+                    metric_incr(f"{prefix}.locked_errors")
+                    raise
+                if self.connection.in_transaction:
+                    self.connection.rollback()
+                metric_incr(f"{prefix}.locked_retries")
+                time.sleep(0.05 * 2**attempt)
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    A connection that close() hands back to the ConnectionPool it came from
+    instead of closing, so its page cache and prepared statements outlive the
+    request.
+    """
+
+    pool = None
+    lease = None
+
+    def cursor(self, factory=RetryingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        super().commit()
+        metric_incr(f"{self.pool.metric_prefix}.commits")
+
+    def close(self):
+        if self.lease is None:
+            return
+        self.lease = None
+        if self.in_transaction:
+            self.rollback()
+        self.pool.connections.put(self)
+
+
+class ConnectionPool:
+    """
+    Up to size connections to one database file per worker, opened on demand
+    and reused most-recently-returned first. Counters go to metrics under
+    metric_prefix.
+    """
+
+    def __init__(self, path: str, size: int, pragmas: dict, metric_prefix: str):
+        self.path = path
+        self.size = size
+        self.pragmas = pragmas
+        self.metric_prefix = metric_prefix
+        self.connections: queue.LifoQueue = queue.LifoQueue()
+        self.lock = threading.Lock()
+        self.opened = 0
+
+    def open(self) -> PooledConnection:
+        # a pooled connection is only ever used by one request or thread at a time
+        connection = sqlite3.connect(
+            self.path,
+            factory=PooledConnection,
+            check_same_thread=False,
+            cached_statements=DB_CACHED_STATEMENTS,
+        )
+        connection.pool = self
+        for name, value in self.pragmas.items():
+            connection.execute(f"PRAGMA {name} = {value}")
+        metric_incr(f"{self.metric_prefix}.connections_opened")
+        return connection
+
+    def get(self) -> PooledConnection:
+        try:
+            connection = self.connections.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                can_open = self.opened < self.size
+                if can_open:
+                    self.opened += 1
+            if can_open:
+                try:
+                    connection = self.open()
+                except sqlite3.Error:
+                    with self.lock:
+                        self.opened -= 1
+                    raise
+            else:
+                started = time.perf_counter()
+                try:
+                    connection = self.connections.get(timeout=DB_POOL_TIMEOUT)
+                except queue.Empty:
+                    metric_incr(f"{self.metric_prefix}.pool_exhausted")
+                    raise sqlite3.OperationalError("database connection pool exhausted")
+                metric_incr(f"{self.metric_prefix}.waits")
+                metric_incr(
+                    f"{self.metric_prefix}.wait_ms", int((time.perf_counter() - started) * 1000)
+                )
+
+        connection.lease = object()
+        metric_incr(f"{self.metric_prefix}.checkouts")
+        # handlers that return early without close() get it back at teardown
+        if has_app_context():
+            g.setdefault("db_leases", []).append((connection, connection.lease))
+        return connection
+
+
+db_pool = ConnectionPool(DB_PATH, DB_POOL_SIZE, DB_PRAGMAS, "db")
+# what cache.db holds can be fetched again, so commits there skip the fsync
+cache_db_pool = ConnectionPool(
+    CACHE_DB_PATH, CACHE_DB_POOL_SIZE, {"synchronous": "NORMAL", "busy_timeout": 5000}, "cache_db"
+)
+
+
+def get_db() -> PooledConnection:
+    return db_pool.get()
+
+
+def get_cache_db() -> PooledConnection:
+    return cache_db_pool.get()
+
+
+class WriteQueue:
+    """
+    Write-behind queue for upserts. A background thread commits everything
+    submitted within interval seconds in one transaction; a write to a key that
+    is still pending replaces the earlier one, and every caller waiting on that
+    key gets the updated_at that was committed. A write that fails only fails
+    the callers of its own key.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.condition = threading.Condition()
+        self.pending: dict[tuple, tuple[str, tuple, int, Future]] = {}
+        self.committing: dict[tuple, tuple[str, tuple, int, Future]] = {}
+        self.thread = None
+
+    def submit(self, key: tuple, sql: str, parameters: tuple, updated_at: int) -> Future:
+        with self.condition:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+            previous = self.pending.get(key)
+            future = previous[3] if previous else Future()
+            self.pending[key] = (sql, parameters, updated_at, future)
+            self.condition.notify()
+        metric_incr("write_queue.writes")
+        if previous:
+            metric_incr("write_queue.coalesced")
+        return future
+
+    def wait(self, key: tuple):
+        # for read-modify-write callers that must see a queued write to key first
+        with self.condition:
+            entry = self.pending.get(key) or self.committing.get(key)
+        if entry:
+            entry[3].exception(timeout=WRITE_QUEUE_RESULT_TIMEOUT)
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+            # let the writes of concurrent requests join this transaction
+            time.sleep(self.interval)
+            with self.condition:
+                batch = self.committing = self.pending
+                self.pending = {}
+            self.commit(batch)
+            with self.condition:
+                self.committing = {}
+
+    def commit(self, batch: dict[tuple, tuple[str, tuple, int, Future]]):
+        started = time.perf_counter()
+        # each write gets a savepoint, so one that fails is rolled back and reported to its
+        # own callers while the rest of the batch still commits
+        failed = {}
+        try:
+            db = get_db()
+            try:
+                db.execute("BEGIN IMMEDIATE")
+                for key, (sql, parameters, _, _) in batch.items():
+                    db.execute("SAVEPOINT queued_write")
+                    try:
+                        db.execute(sql, parameters)
+                    except sqlite3.Error as e:
+                        db.execute("ROLLBACK TO queued_write")
+                        failed[key] = e
+                    db.execute("RELEASE queued_write")
+                db.commit()
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"Failed to commit queued writes: {e}")
+            for _, _, _, future in batch.values():
+                future.set_exception(e)
+            return
+
+        metric_incr("write_queue.batches")
+        metric_incr("write_queue.rows", len(batch) - len(failed))
+        metric_incr("write_queue.commit_ms", int((time.perf_counter() - started) * 1000))
+        if failed:
+            metric_incr("write_queue.failed", len(failed))
+        for key, (_, _, updated_at, future) in batch.items():
+            if key in failed:
+                print(f"Failed to write {key}: {failed[key]}")
+                future.set_exception(failed[key])
+            else:
+                future.set_result(updated_at)
+
+
+write_queue = WriteQueue(WRITE_QUEUE_INTERVAL_MS / 1000) if WRITE_QUEUE_ENABLED else None
+
+
+def write_upsert(key: tuple, sql: str, parameters: tuple, updated_at: int) -> int:
+    # returns the updated_at that is durable for key, which a coalesced later write may have replaced
+    if write_queue is None:
+        db = get_db()
+        db.execute(sql, parameters)
+        db.commit()
+        db.close()
+        return updated_at
+    return write_queue.submit(key, sql, parameters, updated_at).result(
+        timeout=WRITE_QUEUE_RESULT_TIMEOUT
+    )
+
 
-get_db = lambda: sqlite3.connect("data/default.db", check_same_thread=True)
 get_totp = lambda: pyotp.TOTP(ADMIN_SECRET)
 
 
@@ -111,11 +478,957 @@ def set_team_schedule_offset(
     return safe_offset, updated_at
 
 
+metrics: dict[str, int] = {}
+metrics_lock = threading.Lock()
+metrics_flushed_at = time.monotonic()
+
+
+def metric_incr(name: str, amount: int = 1):
+    global metrics_flushed_at
+    with metrics_lock:
+        metrics[name] = metrics.get(name, 0) + amount
+        if time.monotonic() - metrics_flushed_at < METRICS_FLUSH_INTERVAL:
+            return
+        metrics_flushed_at = time.monotonic()
+    flush_metrics()
+
+
+def flush_metrics():
+    # counters live per worker and are summed into cache.db so every worker sees the totals
+    with metrics_lock:
+        pending = list(metrics.items())
+        metrics.clear()
+    if not pending:
+        return
+
+    try:
+        cache_db = get_cache_db()
+        try:
+            cache_db.executemany(
+                """INSERT INTO metrics (name, value) VALUES (?, ?)
+                   ON CONFLICT(name) DO UPDATE SET value = value + excluded.value""",
+                pending,
+            )
+            cache_db.commit()
+        finally:
+            cache_db.close()
+    except sqlite3.Error as e:
+        print(f"Failed to flush metrics: {e}")
+
+
+# whatever a worker counted since its last flush would otherwise be lost when it exits
+atexit.register(flush_metrics)
+
+
+def read_metrics(prefix: str = "") -> dict[str, int]:
+    flush_metrics()
+    cache_db = get_cache_db()
+    cursor = cache_db.cursor()
+    cursor.execute(
+        "SELECT name, value FROM metrics WHERE name LIKE ? ORDER BY name",
+        (prefix + "%",),
+    )
+    rows = cursor.fetchall()
+    cursor.close()
+    cache_db.close()
+    return {row[0]: row[1] for row in rows}
+
+
+def record_exchange(r: requests.Response, *args, **kwargs):
+    # credentials never go into the archive
+    request_headers = {
+        name: value
+        for name, value in r.request.headers.items()
+        if name.lower() != "authorization"
+    }
+    request_body = r.request.body or b""
+    if isinstance(request_body, str):
+        request_body = request_body.encode("utf-8")
+
+    try:
+        record_db = sqlite3.connect(RECORD_PATH, timeout=5)
+        record_db.execute(
+            """INSERT INTO exchanges (recorded_at, method, url, request_headers, request_body, status_code, response_headers, response_body, elapsed_ms)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (
+                time.time(),
+                r.request.method,
+                r.request.url,
+                json.dumps(request_headers),
+                zlib.compress(request_body),
+                r.status_code,
+                json.dumps(dict(r.headers)),
+                zlib.compress(r.content),
+                int(r.elapsed.total_seconds() * 1000),
+            ),
+        )
+        record_db.commit()
+        record_db.close()
+    except sqlite3.Error as e:
+        print(f"Failed to record {r.request.method} {r.request.url}: {e}")
+
+
+class UpstreamResponse:
+    def __init__(
+        self,
+        status_code: int,
+        content: bytes,
+        cached: bool = False,
+        stale_age: int | None = None,
+    ):
+        self.status_code = status_code
+        self.content = content
+        self.cached = cached
+        self.stale_age = stale_age
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def normalize_upstream_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), query, "")
+    )
+
+
+def get_upstream_ttl(url: str) -> int:
+    # paths look like /v2.0/<season>/<resource>/...
+    path = urlsplit(url).path[len(urlsplit(FTC_API_URL).path) :]
+    segments = [segment for segment in path.split("/") if segment]
+    resource = segments[1] if len(segments) > 1 else ""
+    return int(UPSTREAM_CACHE_TTLS.get(resource, 0))
+
+
+def read_upstream_cache(cache_key: str) -> UpstreamResponse | None:
+    cache_db = get_cache_db()
+    try:
+        row = cache_db.execute(
+            "SELECT status_code, body FROM upstream_cache WHERE url = ? AND expires_at > ?",
+            (cache_key, time.time()),
+        ).fetchone()
+    finally:
+        cache_db.close()
+    if row is None:
+        return None
+    return UpstreamResponse(row[0], row[1], cached=True)
+
+
+def read_stale_upstream_cache(cache_key: str) -> UpstreamResponse | None:
+    now = time.time()
+    cache_db = get_cache_db()
+    cursor = cache_db.cursor()
+    cursor.execute(
+        "SELECT status_code, body, fetched_at FROM upstream_cache WHERE url = ? AND fetched_at > ?",
+        (cache_key, now - UPSTREAM_MAX_STALE_SECONDS),
+    )
+    row = cursor.fetchone()
+    cursor.close()
+    cache_db.close()
+    if row is None:
+        return None
+    metric_incr("upstream_cache.stale_served")
+    return UpstreamResponse(row[0], row[1], cached=True, stale_age=int(now - row[2]))
+
+
+def upstream_unavailable() -> UpstreamResponse:
+    body = {"status": "fuck", "error": "ftc api unavailable"}
+    return UpstreamResponse(503, json.dumps(body).encode("utf-8"))
+
+
+def upstream_headers(*responses: UpstreamResponse) -> dict[str, str]:
+    stale_ages = [r.stale_age for r in responses if r.stale_age is not None]
+    if not stale_ages:
+        return {}
+    return {"X-Vanguard-Stale": str(max(stale_ages))}
+
+
+def upstream_breaker_open() -> bool:
+    cache_db = get_cache_db()
+    try:
+        row = cache_db.execute("SELECT state FROM upstream_breaker WHERE id = 1").fetchone()
+    finally:
+        cache_db.close()
+    return row is not None and row[0] == "open"
+
+
+def record_upstream_failure():
+    metric_incr("upstream_breaker.failures")
+    cache_db = get_cache_db()
+    try:
+        cache_db.execute(
+            """UPDATE upstream_breaker
+               SET failures = failures + 1,
+                   opened_at = CASE WHEN state = 'closed' AND failures + 1 >= ? THEN ? ELSE opened_at END,
+                   state = CASE WHEN failures + 1 >= ? THEN 'open' ELSE state END
+               WHERE id = 1""",
+            (UPSTREAM_FAILURE_THRESHOLD, time.time(), UPSTREAM_FAILURE_THRESHOLD),
+        )
+        cache_db.commit()
+    finally:
+        cache_db.close()
+
+
+def record_upstream_success():
+    # almost every fetch succeeds with no failures to clear; reading first skips the write lock
+    cache_db = get_cache_db()
+    try:
+        row = cache_db.execute(
+            "SELECT failures FROM upstream_breaker WHERE id = 1 AND state = 'closed'"
+        ).fetchone()
+        if row is not None and row[0] > 0:
+            cache_db.execute(
+                "UPDATE upstream_breaker SET failures = 0 WHERE id = 1 AND state = 'closed' AND failures > 0"
+            )
+            cache_db.commit()
+    finally:
+        cache_db.close()
+
+
+def take_upstream_token(priority: str) -> float:
+    # returns 0 when a token was taken, otherwise roughly how long until one frees up for this class
+    reserve = UPSTREAM_BURST * UPSTREAM_PRIORITY_RESERVE[priority]
+    cache_db = get_cache_db()
+    try:
+        cache_db.execute("BEGIN IMMEDIATE")
+        cursor = cache_db.cursor()
+        cursor.execute("SELECT tokens, updated_at FROM upstream_budget WHERE id = 1")
+        tokens, updated_at = cursor.fetchone()
+        cursor.close()
+
+        now = time.time()
+        tokens = min(UPSTREAM_BURST, tokens + max(0, now - updated_at) * UPSTREAM_RATE)
+        if tokens - 1 < reserve:
+            cache_db.rollback()
+            return (reserve + 1 - tokens) / UPSTREAM_RATE
+
+        cache_db.execute(
+            "UPDATE upstream_budget SET tokens = ?, updated_at = ? WHERE id = 1",
+            (tokens - 1, now),
+        )
+        cache_db.commit()
+        return 0
+    finally:
+        cache_db.close()
+
+
+def acquire_upstream_budget(priority: str, max_wait: float) -> bool:
+    wait = take_upstream_token(priority)
+    if wait == 0:
+        metric_incr(f"upstream_budget.granted.{priority}")
+        return True
+    if max_wait <= 0:
+        return False
+
+    # queue depth is a gauge: each worker adds while waiting and subtracts when done
+    metric_incr(f"upstream_budget.queued.{priority}")
+    started = time.monotonic()
+    deadline = started + max_wait
+    try:
+        while wait > 0:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            # jitter so workers waiting on the same refill don't all retry at once
+            time.sleep(min(wait + secrets.randbelow(50) / 1000, remaining))
+            wait = take_upstream_token(priority)
+        metric_incr(f"upstream_budget.granted.{priority}")
+        return True
+    finally:
+        metric_incr(f"upstream_budget.queued.{priority}", -1)
+        metric_incr(f"upstream_budget.waits.{priority}")
+        metric_incr(
+            f"upstream_budget.wait_ms.{priority}",
+            int((time.monotonic() - started) * 1000),
+        )
+
+
+def upstream_request(url: str, headers: dict | None = None) -> requests.Response | None:
+    # None means the FTC API is unreachable or erroring; it counts against the breaker
+    try:
+        r = s.get(url, headers=headers or {}, timeout=UPSTREAM_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"FTC API request failed: {e}")
+        record_upstream_failure()
+        return None
+
+    if r.status_code >= 500:
+        print(f"FTC API returned {r.status_code} for {url}")
+        record_upstream_failure()
+        return None
+
+    record_upstream_success()
+    return r
+
+
+def upstream_probe_loop():
+    # while the breaker is open, a single worker (holding the probe lease) checks whether to close it
+    while True:
+        time.sleep(UPSTREAM_PROBE_INTERVAL)
+        try:
+            if not upstream_breaker_open():
+                continue
+            if not acquire_upstream_budget("realtime", 0):
+                continue
+
+            owner = secrets.token_hex(8)
+            if not acquire_upstream_lease("upstream-breaker-probe", owner):
+                continue
+            try:
+                r = s.get(FTC_API_URL, timeout=UPSTREAM_TIMEOUT)
+                healthy = r.status_code < 500
+            except requests.RequestException:
+                healthy = False
+            finally:
+                release_upstream_lease("upstream-breaker-probe", owner)
+
+            if healthy:
+                print("FTC API recovered, closing upstream breaker")
+                cache_db = get_cache_db()
+                cache_db.execute(
+                    "UPDATE upstream_breaker SET state = 'closed', failures = 0 WHERE id = 1"
+                )
+                cache_db.commit()
+                cache_db.close()
+        except Exception as e:
+            print(f"Upstream probe error: {e}")
+
+
+def acquire_upstream_lease(cache_key: str, owner: str) -> bool:
+    now = time.time()
+    cache_db = get_cache_db()
+    try:
+        cache_db.execute(
+            "DELETE FROM upstream_leases WHERE url = ? AND expires_at < ?",
+            (cache_key, now),
+        )
+        cursor = cache_db.execute(
+            "INSERT OR IGNORE INTO upstream_leases (url, owner, expires_at) VALUES (?, ?, ?)",
+            (cache_key, owner, now + UPSTREAM_LEASE_SECONDS),
+        )
+        acquired = cursor.rowcount == 1
+        cache_db.commit()
+    finally:
+        cache_db.close()
+    return acquired
+
+
+def release_upstream_lease(cache_key: str, owner: str):
+    cache_db = get_cache_db()
+    try:
+        cache_db.execute(
+            "DELETE FROM upstream_leases WHERE url = ? AND owner = ?", (cache_key, owner)
+        )
+        cache_db.commit()
+    finally:
+        cache_db.close()
+
+
+def wait_for_upstream_lease(cache_key: str) -> UpstreamResponse | None:
+    # another worker holds the lease; poll the shared cache until it publishes the result
+    deadline = time.monotonic() + UPSTREAM_LEASE_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        cached = read_upstream_cache(cache_key)
+        if cached is not None:
+            return cached
+
+        cache_db = get_cache_db()
+        cursor = cache_db.cursor()
+        cursor.execute("SELECT 1 FROM upstream_leases WHERE url = ?", (cache_key,))
+        lease_held = cursor.fetchone() is not None
+        cursor.close()
+        cache_db.close()
+        if not lease_held:
+            return read_upstream_cache(cache_key)
+    return None
+
+
+def fetch_upstream(
+    url: str, cache_key: str, ttl: int, priority: str
+) -> UpstreamResponse:
+    owner = secrets.token_hex(8)
+    if ttl > 0 and not acquire_upstream_lease(cache_key, owner):
+        metric_incr("upstream_flight.coalesced_workers")
+        cached = wait_for_upstream_lease(cache_key)
+        if cached is not None:
+            return cached
+        owner = None
+
+    try:
+        # bulk calls take cached data over spending budget that realtime calls may need
+        if not acquire_upstream_budget(priority, 0):
+            stale = read_stale_upstream_cache(cache_key) if priority == "bulk" else None
+            if stale is not None:
+                metric_incr(f"upstream_budget.deferred.{priority}")
+                return stale
+            if not acquire_upstream_budget(priority, UPSTREAM_PRIORITY_MAX_WAIT[priority]):
+                metric_incr(f"upstream_budget.rejected.{priority}")
+                return read_stale_upstream_cache(cache_key) or upstream_unavailable()
+
+        metric_incr("upstream_flight.fetches")
+        if ttl <= 0:
+            r = upstream_request(url)
+            if r is None:
+                return upstream_unavailable()
+            return UpstreamResponse(r.status_code, r.content)
+
+        # expired rows are kept so the next fetch can be a conditional one
+        cache_db = get_cache_db()
+        cursor = cache_db.cursor()
+        cursor.execute(
+            "SELECT status_code, body, last_modified, etag FROM upstream_cache WHERE url = ?",
+            (cache_key,),
+        )
+        stored = cursor.fetchone()
+        cursor.close()
+        cache_db.close()
+
+        headers = {}
+        if stored is not None and stored[2]:
+            headers["FMS-OnlyModifiedSince"] = stored[2]
+            headers["If-Modified-Since"] = stored[2]
+        if stored is not None and stored[3]:
+            headers["If-None-Match"] = stored[3]
+
+        r = upstream_request(url, headers)
+        if r is None:
+            return read_stale_upstream_cache(cache_key) or upstream_unavailable()
+
+        fetched_at = time.time()
+        if r.status_code == 304 and stored is not None:
+            metric_incr("upstream_cache.revalidated")
+            cache_db = get_cache_db()
+            cache_db.execute(
+                "UPDATE upstream_cache SET fetched_at = ?, expires_at = ? WHERE url = ?",
+                (fetched_at, fetched_at + ttl, cache_key),
+            )
+            cache_db.commit()
+            cache_db.close()
+            return UpstreamResponse(stored[0], stored[1])
+
+        if r.status_code == 200:
+            cache_db = get_cache_db()
+            cache_db.execute(
+                """INSERT OR REPLACE INTO upstream_cache (url, status_code, body, fetched_at, expires_at, last_modified, etag)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    cache_key,
+                    r.status_code,
+                    r.content,
+                    fetched_at,
+                    fetched_at + ttl,
+                    r.headers.get("Last-Modified"),
+                    r.headers.get("ETag"),
+                ),
+            )
+            cache_db.commit()
+            cache_db.close()
+        return UpstreamResponse(r.status_code, r.content)
+    finally:
+        if ttl > 0 and owner:
+            release_upstream_lease(cache_key, owner)
+
+
+upstream_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="upstream")
+
+
+class UpstreamFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.response: UpstreamResponse | None = None
+
+
+upstream_flights: dict[str, UpstreamFlight] = {}
+upstream_flights_lock = threading.Lock()
+
+
+def ftc_get(url: str, priority: str = "interactive") -> UpstreamResponse:
+    cache_key = normalize_upstream_url(url)
+    ttl = get_upstream_ttl(cache_key)
+
+    if ttl > 0:
+        cached = read_upstream_cache(cache_key)
+        if cached is not None:
+            metric_incr("upstream_cache.hit")
+            return cached
+
+    metric_incr("upstream_cache.miss")
+
+    if upstream_breaker_open():
+        metric_incr("upstream_breaker.short_circuited")
+        return read_stale_upstream_cache(cache_key) or upstream_unavailable()
+
+    # single flight: concurrent requests for the same URL in this worker share one fetch
+    with upstream_flights_lock:
+        flight = upstream_flights.get(cache_key)
+        leader = flight is None
+        if leader:
+            flight = upstream_flights[cache_key] = UpstreamFlight()
+
+    if not leader:
+        metric_incr("upstream_flight.coalesced_threads")
+        flight.done.wait(UPSTREAM_LEASE_SECONDS)
+        if flight.response is not None:
+            return flight.response
+        return fetch_upstream(url, cache_key, ttl, priority)
+
+    try:
+        flight.response = fetch_upstream(url, cache_key, ttl, priority)
+        return flight.response
+    finally:
+        with upstream_flights_lock:
+            upstream_flights.pop(cache_key, None)
+        flight.done.set()
+
+
+def fetch_event_schedule(
+    year: int, event: str, priority: str = "interactive"
+) -> tuple[list[dict], dict[str, str]]:
+    # Fetch both qual and playoff schedules and merge them
+    qual_url = f"{FTC_API_URL}/{year}/schedule/{event}?tournamentLevel=qual"
+    playoff_url = f"{FTC_API_URL}/{year}/schedule/{event}?tournamentLevel=playoff"
+
+    qual_res = ftc_get(qual_url, priority)
+    playoff_res = ftc_get(playoff_url, priority)
+
+    qual_schedule = []
+    playoff_schedule = []
+
+    if qual_res.status_code == 200:
+        qual_data = qual_res.json()
+        qual_schedule = qual_data.get("schedule", [])
+
+    if playoff_res.status_code == 200:
+        playoff_data = playoff_res.json()
+        playoff_schedule = playoff_data.get("schedule", [])
+
+    return qual_schedule + playoff_schedule, upstream_headers(qual_res, playoff_res)
+
+
+def build_bundle_section(
+    status_code: int, content: bytes, headers: dict[str, str]
+) -> dict:
+    section = {
+        "version": hashlib.sha256(content).hexdigest()[:16],
+        "status": status_code,
+        "data": json.loads(content) if status_code == 200 else None,
+    }
+    if "X-Vanguard-Stale" in headers:
+        section["staleAge"] = int(headers["X-Vanguard-Stale"])
+    return section
+
+
+def fetch_event_bundle(event: str, priority: str = "interactive") -> dict[str, dict]:
+    now = datetime.now() - timedelta(weeks=34)
+    year = now.year
+
+    schedule_future = upstream_executor.submit(
+        fetch_event_schedule, year, event, priority
+    )
+    upstream_urls = {
+        "rankings": f"{FTC_API_URL}/{year}/rankings/{event}",
+        "teams": f"{FTC_API_URL}/{year}/teams?eventCode={event}",
+        "qualScores": f"{FTC_API_URL}/{year}/scores/{event}/qual",
+        "playoffScores": f"{FTC_API_URL}/{year}/scores/{event}/playoff",
+    }
+    upstream_futures = {
+        name: upstream_executor.submit(ftc_get, url, priority)
+        for name, url in upstream_urls.items()
+    }
+
+    schedule, schedule_headers = schedule_future.result()
+    schedule = json.dumps({"schedule": schedule}).encode("utf-8")
+    sections = {"schedule": build_bundle_section(200, schedule, schedule_headers)}
+    for name, future in upstream_futures.items():
+        r = future.result()
+        sections[name] = build_bundle_section(r.status_code, r.content, upstream_headers(r))
+    return sections
+
+
+class EventStreamPoller:
+    # one per event per worker; polls the bundle and fans changed sections out to subscribers
+    def __init__(self, event_code: str):
+        self.event_code = event_code
+        self.sections: dict[str, dict] = {}
+        self.subscribers: set[queue.Queue] = set()
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def subscribe(self) -> queue.Queue:
+        subscriber = queue.Queue()
+        with self.lock:
+            self.subscribers.add(subscriber)
+            if self.sections:
+                subscriber.put(dict(self.sections))
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def run(self):
+        while True:
+            with event_stream_pollers_lock:
+                with self.lock:
+                    if not self.subscribers:
+                        event_stream_pollers.pop(self.event_code, None)
+                        return
+
+            try:
+                sections = fetch_event_bundle(self.event_code, "realtime")
+                with self.lock:
+                    changed = {
+                        name: section
+                        for name, section in sections.items()
+                        if self.sections.get(name, {}).get("version")
+                        != section["version"]
+                    }
+                    self.sections.update(changed)
+                    if changed:
+                        for subscriber in self.subscribers:
+                            subscriber.put(changed)
+            except Exception as e:
+                print(f"Event stream poll error for {self.event_code}: {e}")
+
+            time.sleep(EVENT_STREAM_POLL_SECONDS)
+
+
+event_stream_pollers: dict[str, EventStreamPoller] = {}
+event_stream_pollers_lock = threading.Lock()
+
+
+def subscribe_event_stream(event_code: str) -> tuple[EventStreamPoller, queue.Queue]:
+    with event_stream_pollers_lock:
+        poller = event_stream_pollers.get(event_code)
+        started = poller is None
+        if started:
+            poller = event_stream_pollers[event_code] = EventStreamPoller(event_code)
+        subscriber = poller.subscribe()
+    if started:
+        poller.thread.start()
+    return poller, subscriber
+
+
+def key_algorithm(private_key) -> str | None:
+    if isinstance(private_key, ed25519.Ed25519PrivateKey):
+        return "EdDSA"
+    if isinstance(private_key, ec.EllipticCurvePrivateKey) and isinstance(
+        private_key.curve, ec.SECP256R1
+    ):
+        return "ES256"
+    if isinstance(private_key, rsa.RSAPrivateKey):
+        return "RS256"
+    return None
+
+
+def generate_signing_key(algorithm: str):
+    # the kid is dated so a rotated key never reuses a name; if another worker
+    # creates the same kid first, its key is the one that stays
+    kid = f"{algorithm.lower()}-{datetime.now().strftime('%Y%m%d')}"
+    if algorithm == "EdDSA":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    elif algorithm == "ES256":
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    elif algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        raise ValueError(f"unsupported signing algorithm {algorithm}")
+
+    os.makedirs(AUTH_KEYS_DIR, exist_ok=True)
+    path = os.path.join(AUTH_KEYS_DIR, f"{kid}.pem")
+    staging_path = f"{path}.{os.getpid()}"
+    with open(os.open(staging_path, os.O_WRONLY | os.O_CREAT, 0o600), "wb") as f:
+        f.write(
+            private_key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    try:
+        os.link(staging_path, path)
+        print(f"Generated {algorithm} signing key {kid}")
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(staging_path)
+
+
+class SigningKeys:
+    """
+    Every key in AUTH_KEYS_DIR (<kid>.pem) can verify tokens; one of them signs.
+    The RSA key pair in ~/.ssh that older tokens were signed with stays valid
+    for verification as kid "rsa-legacy", and those tokens carry no kid.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.loaded_at = None
+        self.keys_dir_mtime = None
+        self.public_keys: dict[str, tuple[str, object]] = {}
+        self.signing_kid = None
+        self.signing_key = None
+        self.signing_algorithm = None
+
+    def load(self):
+        # taken before listing, so a key added while this runs still triggers the next reload
+        keys_dir_mtime = self.read_keys_dir_mtime()
+        public_keys = {}
+        private_keys = {}
+        modified = {}
+        ssh_dir = os.path.expanduser("~/.ssh")
+        if os.path.exists(os.path.join(ssh_dir, "id_rsa.pem")):
+            with open(os.path.join(ssh_dir, "id_rsa.pem"), "rb") as f:
+                private_keys["rsa-legacy"] = serialization.load_pem_private_key(
+                    f.read(), password=None
+                )
+
+        if os.path.isdir(AUTH_KEYS_DIR):
+            for name in sorted(os.listdir(AUTH_KEYS_DIR)):
+                if not name.endswith(".pem"):
+                    continue
+                with open(os.path.join(AUTH_KEYS_DIR, name), "rb") as f:
+                    private_keys[name[:-4]] = serialization.load_pem_private_key(
+                        f.read(), password=None
+                    )
+                    modified[name[:-4]] = os.fstat(f.fileno()).st_mtime_ns
+
+        for kid, private_key in private_keys.items():
+            algorithm = key_algorithm(private_key)
+            if algorithm is None:
+                print(f"Ignoring signing key {kid}: unsupported key type")
+                continue
+            public_keys[kid] = (algorithm, private_key.public_key())
+
+        signing_kid = AUTH_SIGNING_KEY
+        if not signing_kid:
+            candidates = [
+                kid
+                for kid, (algorithm, _) in public_keys.items()
+                if algorithm == AUTH_ALGORITHM and kid != "rsa-legacy"
+            ]
+            if candidates:
+                # the most recently written key file, whatever its kid; an operator's own kids
+                # need not sort by date the way generated ones do
+                signing_kid = max(candidates, key=lambda kid: (modified[kid], kid))
+            elif AUTH_ALGORITHM == "RS256" and "rsa-legacy" in public_keys:
+                signing_kid = "rsa-legacy"
+            else:
+                generate_signing_key(AUTH_ALGORITHM)
+                return self.load()
+        if signing_kid not in public_keys:
+            raise ValueError(f"signing key {signing_kid} not found in {AUTH_KEYS_DIR}")
+
+        self.public_keys = public_keys
+        self.signing_kid = signing_kid
+        self.signing_key = private_keys[signing_kid]
+        self.signing_algorithm = public_keys[signing_kid][0]
+        self.keys_dir_mtime = keys_dir_mtime
+        self.loaded_at = time.monotonic()
+
+    @staticmethod
+    def read_keys_dir_mtime() -> int | None:
+        try:
+            return os.stat(AUTH_KEYS_DIR).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def ensure_loaded(self):
+        with self.lock:
+            if self.loaded_at is None:
+                self.load()
+
+    def sign(self, claims: dict) -> str:
+        self.ensure_loaded()
+        headers = None if self.signing_kid == "rsa-legacy" else {"kid": self.signing_kid}
+        return jwt.encode(
+            claims, self.signing_key, algorithm=self.signing_algorithm, headers=headers
+        )
+
+    def verify(self, token: str) -> dict:
+        self.ensure_loaded()
+        kid = jwt.get_unverified_header(token).get("kid", "rsa-legacy")
+        if kid not in self.public_keys:
+            # another worker may have rotated in a key since this one loaded; adding a key file
+            # changes the directory's mtime, so made-up kids cost a stat, not a reload
+            with self.lock:
+                if self.read_keys_dir_mtime() != self.keys_dir_mtime:
+                    self.load()
+        if kid not in self.public_keys:
+            raise jwt.InvalidTokenError(f"unknown signing key {kid}")
+        algorithm, public_key = self.public_keys[kid]
+        return jwt.decode(token, public_key, algorithms=[algorithm])
+
+
+signing_keys = SigningKeys()
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+password_pool: ProcessPoolExecutor | None = None
+password_pool_lock = threading.Lock()
+password_slots = threading.BoundedSemaphore(PASSWORD_MAX_PENDING)
+
+
+def get_password_pool() -> ProcessPoolExecutor:
+    # created on first use so each gunicorn worker gets its own pool; children are
+    # forked because spawned ones would re-import whatever script started the process
+    global password_pool
+    with password_pool_lock:
+        if password_pool is None:
+            password_pool = ProcessPoolExecutor(
+                max_workers=PASSWORD_WORKERS,
+                mp_context=multiprocessing.get_context("fork"),
+            )
+        return password_pool
+
+
+def run_password_job(function, *args):
+    if not password_slots.acquire(timeout=PASSWORD_QUEUE_TIMEOUT):
+        metric_incr("passwords.rejected")
+        raise PasswordHasherBusy()
+
+    global password_pool
+    started = time.monotonic()
+    try:
+        if PASSWORD_WORKERS <= 0:
+            return function(*args)
+        try:
+            return get_password_pool().submit(function, *args).result()
+        except BrokenProcessPool:
+            print("Password hashing pool broke, starting a new one")
+            with password_pool_lock:
+                password_pool = None
+            return get_password_pool().submit(function, *args).result()
+    finally:
+        password_slots.release()
+        metric_incr("passwords.jobs")
+        metric_incr("passwords.job_ms", int((time.monotonic() - started) * 1000))
+
+
+def hash_password(password: str) -> str:
+    return run_password_job(ph.hash, password)
+
+
+def verify_password(stored_hash: str, password: str) -> bool:
+    # raises argon2.exceptions.VerifyMismatchError like ph.verify
+    return run_password_job(ph.verify, stored_hash, password)
+
+
+def issue_access_token(team_id: int, scope: list[str]) -> str:
+    return signing_keys.sign(
+        {
+            "id": team_id,
+            "scope": scope,
+            "exp": int(
+                (datetime.now() + timedelta(minutes=ACCESS_TOKEN_MINUTES)).timestamp()
+            ),
+        }
+    )
+
+
+def hash_refresh_token(refresh_token: str) -> str:
+    # refresh tokens are random 256-bit strings, so a fast hash is enough
+    return hashlib.sha256(refresh_token.encode("utf-8")).hexdigest()
+
+
+def issue_refresh_token(cursor: sqlite3.Cursor, team_id: int, family_id: int | None = None) -> str:
+    # a login starts a family; each refresh replaces the token with a new one in the same family
+    refresh_token = secrets.token_urlsafe(32)
+    created_at = int(datetime.now().timestamp())
+    cursor.execute(
+        """INSERT INTO refresh_tokens (team_id, token_hash, created_at, expires_at, family_id)
+           VALUES (?, ?, ?, ?, ?)""",
+        (
+            team_id,
+            hash_refresh_token(refresh_token),
+            created_at,
+            created_at + REFRESH_TOKEN_DAYS * 86400,
+            family_id,
+        ),
+    )
+    if family_id is None:
+        cursor.execute(
+            "UPDATE refresh_tokens SET family_id = id WHERE id = ?", (cursor.lastrowid,)
+        )
+    return refresh_token
+
+
+def revoke_refresh_tokens(cursor: sqlite3.Cursor, team_id: int):
+    cursor.execute(
+        "UPDATE refresh_tokens SET revoked_at = ? WHERE team_id = ? AND revoked_at IS NULL",
+        (int(datetime.now().timestamp()), team_id),
+    )
+
+
+verified_tokens: OrderedDict[bytes, dict] = OrderedDict()
+verified_tokens_lock = threading.Lock()
+
+
+def verify_token(token: str) -> dict:
+    # raises the same jwt exceptions as jwt.decode
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    with verified_tokens_lock:
+        payload = verified_tokens.get(digest)
+        if payload is not None:
+            verified_tokens.move_to_end(digest)
+
+    if payload is not None:
+        if payload["exp"] > time.time():
+            metric_incr("auth_cache.hit")
+            return payload
+        with verified_tokens_lock:
+            verified_tokens.pop(digest, None)
+        raise jwt.ExpiredSignatureError("Signature has expired")
+
+    metric_incr("auth_cache.miss")
+    payload = signing_keys.verify(token)
+    # tokens without an expiry are verified every time
+    if isinstance(payload.get("exp"), (int, float)):
+        with verified_tokens_lock:
+            verified_tokens[digest] = payload
+            if len(verified_tokens) > AUTH_CACHE_SIZE:
+                verified_tokens.popitem(last=False)
+    return payload
+
+
+def require_auth(handler=None, *, admin: bool = False):
+    # claims of the verified token are left in g.token_payload for the handler
+    if handler is None:
+        return lambda handler: require_auth(handler, admin=admin)
+
+    @wraps(handler)
+    def wrapper(*args, **kwargs):
+        auth_header = request.headers.get("Authorization")
+        if auth_header and auth_header.startswith("Bearer "):
+            token = auth_header.split(" ")[1]
+        else:
+            token = None
+        if not token:
+            return {"status": "fuck", "error": "no auth"}, 401
+
+        try:
+            g.token_payload = verify_token(token)
+        except jwt.ExpiredSignatureError:
+            return {"status": "fuck", "error": "token expired"}, 401
+        except jwt.InvalidTokenError:
+            return {"status": "fuck", "error": "invalid token"}, 401
+
+        if admin and "admin" not in g.token_payload.get("scope", []):
+            return {"status": "fuck", "error": "unauthorized"}, 403
+        return handler(*args, **kwargs)
+
+    return wrapper
+
+
 def get_active_event(team_id: int) -> str | None:
     now = datetime.now() - timedelta(weeks=34)
     year = now.year
 
-    r = s.get(f"{FTC_API_URL}/{year}/events?teamNumber={team_id}")
+    r = ftc_get(f"{FTC_API_URL}/{year}/events?teamNumber={team_id}", "realtime")
     if r.status_code != 200:
         return None
 
@@ -204,7 +1517,7 @@ def send_notification(
         headers["Click"] = click
 
     try:
-        r = requests.post(url, data=message.encode("utf-8"), headers=headers)
+        r = ntfy.post(url, data=message.encode("utf-8"), headers=headers)
         if r.status_code == 200:
             sent_at = int(datetime.now().timestamp())
             cursor.execute(
@@ -231,7 +1544,9 @@ def notification_callback():
         if not event:
             continue
 
-        r = s.get(f"{FTC_API_URL}/{year}/schedule/{event}?tournamentLevel=qual")
+        r = ftc_get(
+            f"{FTC_API_URL}/{year}/schedule/{event}?tournamentLevel=qual", "realtime"
+        )
         if r.status_code != 200:
             continue
         if not r.json().get("schedule"):
@@ -293,6 +1608,429 @@ def notification_loop():
         time.sleep(30)
 
 
+def acquire_maintenance_lease(owner: str) -> bool:
+    # also renews it for an owner that already holds it
+    now = time.time()
+    cache_db = get_cache_db()
+    try:
+        cursor = cache_db.execute(
+            """UPDATE maintenance_lease SET owner = ?, expires_at = ?
+               WHERE id = 1 AND (owner IS NULL OR owner = ? OR expires_at < ?)""",
+            (owner, now + MAINTENANCE_LEASE_SECONDS, owner, now),
+        )
+        acquired = cursor.rowcount == 1
+        cache_db.commit()
+    finally:
+        cache_db.close()
+    return acquired
+
+
+def renew_maintenance_lease(owner: str):
+    # a pass that lost its lease stops rather than run alongside the worker that took it over
+    if not acquire_maintenance_lease(owner):
+        raise RuntimeError("maintenance lease lost")
+
+
+def release_maintenance_lease(owner: str):
+    cache_db = get_cache_db()
+    try:
+        cache_db.execute(
+            "UPDATE maintenance_lease SET owner = NULL, expires_at = 0 WHERE id = 1 AND owner = ?",
+            (owner,),
+        )
+        cache_db.commit()
+    finally:
+        cache_db.close()
+
+
+def prune_rows(
+    db: PooledConnection, table: str, condition: str, cutoff: int, owner: str
+) -> int:
+    # small batches, each its own transaction, so saves are never locked out for long
+    deleted = 0
+    while True:
+        cursor = db.execute(
+            f"""DELETE FROM {table} WHERE id IN (
+                    SELECT id FROM {table} WHERE {condition} LIMIT ?
+                )""",
+            (cutoff,) * condition.count("?") + (MAINTENANCE_BATCH_SIZE,),
+        )
+        db.commit()
+        deleted += cursor.rowcount
+        renew_maintenance_lease(owner)
+        if cursor.rowcount < MAINTENANCE_BATCH_SIZE:
+            return deleted
+        time.sleep(0)
+
+
+def run_maintenance(owner: str) -> dict:
+    # owner holds the maintenance lease, which every step renews
+    started_at = time.time()
+    cache_db = get_cache_db()
+    run_id = cache_db.execute(
+        "INSERT INTO maintenance_runs (started_at) VALUES (?)", (started_at,)
+    ).lastrowid
+    cache_db.commit()
+    cache_db.close()
+
+    deleted = {}
+    db = get_db()
+    try:
+        for rule, (table, condition) in RETENTION_RULES.items():
+            days = RETENTION_DAYS.get(rule, 0)
+            if days:
+                deleted[rule] = prune_rows(
+                    db, table, condition, int(started_at - days * 86400), owner
+                )
+
+        # the admin dashboard's growth and write rates compare stats_counters with these
+        db.execute(
+            """INSERT OR REPLACE INTO stats_snapshots (name, taken_at, value, writes)
+               SELECT name, ?, value, inserts + updates + deletes FROM stats_counters""",
+            (int(started_at),),
+        )
+        db.execute(
+            "DELETE FROM stats_snapshots WHERE taken_at < ?",
+            (int(started_at - STATS_HISTORY_DAYS * 86400),),
+        )
+        db.commit()
+        renew_maintenance_lease(owner)
+
+        page_size = db.execute("PRAGMA page_size").fetchone()[0]
+        free_before = db.execute("PRAGMA freelist_count").fetchone()[0]
+        # runs until it has freed that many pages; the rows it returns have to be read for that
+        db.execute(f"PRAGMA incremental_vacuum({int(MAINTENANCE_VACUUM_PAGES)})").fetchall()
+        free_after = db.execute("PRAGMA freelist_count").fetchone()[0]
+        # the file only shrinks once the WAL is checkpointed; PASSIVE never waits on readers
+        db.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+    finally:
+        db.close()
+
+    report = {
+        "startedAt": started_at,
+        "durationMs": round((time.time() - started_at) * 1000),
+        "deleted": deleted,
+        "freedPages": free_before - free_after,
+        "bytesReclaimed": (free_before - free_after) * page_size,
+        "freePages": free_after,
+    }
+
+    cache_db = get_cache_db()
+    cache_db.execute(
+        """UPDATE maintenance_runs SET finished_at = ?, deleted = ?, freed_pages = ?, bytes_reclaimed = ?
+           WHERE id = ?""",
+        (time.time(), json.dumps(deleted), report["freedPages"], report["bytesReclaimed"], run_id),
+    )
+    cache_db.execute(
+        "DELETE FROM maintenance_runs WHERE started_at < ?",
+        (started_at - STATS_HISTORY_DAYS * 86400,),
+    )
+    cache_db.commit()
+    cache_db.close()
+
+    metric_incr("maintenance.runs")
+    metric_incr("maintenance.bytes_reclaimed", report["bytesReclaimed"])
+    for rule, count in deleted.items():
+        metric_incr(f"maintenance.deleted.{rule}", count)
+    if report["bytesReclaimed"] or any(deleted.values()):
+        print(
+            f"Maintenance: deleted {deleted}, reclaimed {report['bytesReclaimed']} bytes "
+            f"in {report['durationMs']} ms"
+        )
+    return report
+
+
+def maintenance_loop():
+    # every worker runs this loop; the lease and the last recorded run keep it to one pass per interval
+    while True:
+        time.sleep(MAINTENANCE_INTERVAL)
+        try:
+            owner = secrets.token_hex(8)
+            if not acquire_maintenance_lease(owner):
+                continue
+            try:
+                cache_db = get_cache_db()
+                last_run = cache_db.execute(
+                    "SELECT started_at FROM maintenance_runs ORDER BY id DESC LIMIT 1"
+                ).fetchone()
+                cache_db.close()
+                if last_run and time.time() - last_run[0] < MAINTENANCE_INTERVAL:
+                    continue
+                run_maintenance(owner)
+            finally:
+                release_maintenance_lease(owner)
+        except Exception as e:
+            print(f"Maintenance error: {e}")
+
+
+def claim_backup(min_interval: float) -> int | None:
+    # returns the new backup's id, or None while another is running or the last one is too recent
+    now = time.time()
+    cache_db = get_cache_db()
+    try:
+        cache_db.execute("BEGIN IMMEDIATE")
+        # claims are serialized here, so only the newest row can still be running
+        latest = cache_db.execute(
+            "SELECT started_at, finished_at FROM backups ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        running = latest and latest[1] is None and latest[0] > now - BACKUP_STALE_SECONDS
+        last_succeeded = cache_db.execute(
+            "SELECT started_at FROM backups WHERE error IS NULL ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        if running or (last_succeeded and now - last_succeeded[0] < min_interval):
+            cache_db.rollback()
+            return None
+        backup_id = cache_db.execute(
+            "INSERT INTO backups (started_at) VALUES (?)", (now,)
+        ).lastrowid
+        cache_db.commit()
+        return backup_id
+    finally:
+        cache_db.close()
+
+
+def compress_backup(path: str) -> str:
+    with open(path, "rb") as source, gzip.open(path + ".gz", "wb", compresslevel=1) as target:
+        while chunk := source.read(1024 * 1024):
+            target.write(chunk)
+            time.sleep(0)
+    os.remove(path)
+    return path + ".gz"
+
+
+def rotate_backups():
+    if BACKUP_KEEP <= 0:
+        return
+    # names sort by the time they were taken
+    backups = sorted(
+        name
+        for name in os.listdir(BACKUP_DIR)
+        if name.startswith("default-") and not name.endswith(".partial")
+    )
+    for name in backups[:-BACKUP_KEEP]:
+        os.remove(os.path.join(BACKUP_DIR, name))
+
+
+def run_backup(backup_id: int):
+    started_at = time.time()
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    path = os.path.join(BACKUP_DIR, f"default-{datetime.now().strftime('%Y%m%d-%H%M%S')}.db")
+    pages = size = None
+    error = None
+    try:
+        source = sqlite3.connect(DB_PATH, isolation_level=None, timeout=5)
+        target = sqlite3.connect(path + ".partial")
+        try:
+            # a step that sees a write from another connection starts the backup over, so under
+            # steady saves it would never finish; a read transaction held across all the steps pins
+            # one WAL snapshot instead, without blocking writers
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            source.backup(
+                target,
+                pages=BACKUP_STEP_PAGES,
+                progress=lambda status, remaining, total: time.sleep(BACKUP_STEP_SLEEP_MS / 1000),
+            )
+            source.execute("COMMIT")
+            pages = target.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            target.close()
+            source.close()
+
+        os.replace(path + ".partial", path)
+        if BACKUP_COMPRESS:
+            path = compress_backup(path)
+        size = os.path.getsize(path)
+        rotate_backups()
+        metric_incr("backup.runs")
+        metric_incr("backup.bytes", size)
+        print(f"Backed up {DB_PATH} to {path} ({size} bytes in {time.time() - started_at:.1f} s)")
+    except Exception as e:
+        error = str(e)
+        metric_incr("backup.errors")
+        print(f"Backup error: {e}")
+        if os.path.exists(path + ".partial"):
+            os.remove(path + ".partial")
+
+    cache_db = get_cache_db()
+    cache_db.execute(
+        "UPDATE backups SET finished_at = ?, path = ?, pages = ?, bytes = ?, error = ? WHERE id = ?",
+        (time.time(), path, pages, size, error, backup_id),
+    )
+    cache_db.commit()
+    cache_db.close()
+
+
+def backup_loop():
+    # every worker checks; claim_backup lets one of them take each scheduled backup
+    while True:
+        time.sleep(60)
+        try:
+            backup_id = claim_backup(BACKUP_INTERVAL)
+            if backup_id is not None:
+                run_backup(backup_id)
+        except Exception as e:
+            print(f"Backup loop error: {e}")
+
+
+# Strategy strokes are stored as zlib(STROKE_FORMAT + records), one record per stroke:
+#   flags (bit 0 eraser, bit 1 color is free text), color (3 bytes, or varint length + utf-8),
+#   varint lineWidthFactor * 65536, varint point count, then zigzag varint x, y per point in
+#   1/STROKE_SCALE of the field, the first absolute and the rest as deltas from the previous point.
+# Records can be concatenated, so appending never has to decode the points already stored.
+STROKE_FORMAT = b"\x01"
+STROKE_SCALE = 4096
+STROKE_WIDTH_SCALE = 65536
+
+
+def write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def scale_stroke_value(value, scale: int) -> int:
+    # JSON bodies can carry NaN, Infinity or 1e400, which round() would turn into an OverflowError
+    scaled = float(value) * scale
+    if not math.isfinite(scaled):
+        raise ValueError(f"stroke value {value!r} is not a finite number")
+    return round(scaled)
+
+
+def encode_strokes(strokes: list[dict]) -> bytes:
+    # raises ValueError, TypeError or KeyError on strokes that aren't shaped like the board's
+    out = bytearray()
+    for stroke in strokes:
+        color = str(stroke.get("color") or "#ffffff")
+        hex_color = len(color) == 7 and color[0] == "#"
+        if hex_color:
+            color_bytes = bytes.fromhex(color[1:])
+        else:
+            color_bytes = color.encode("utf-8")
+        out.append((1 if stroke.get("isEraser") else 0) | (0 if hex_color else 2))
+        if not hex_color:
+            write_varint(out, len(color_bytes))
+        out += color_bytes
+        width = scale_stroke_value(stroke.get("lineWidthFactor") or 0, STROKE_WIDTH_SCALE)
+        write_varint(out, min(max(width, 0), STROKE_WIDTH_SCALE - 1))
+
+        points = stroke["points"]
+        write_varint(out, len(points))
+        previous_x = previous_y = 0
+        for point in points:
+            x = scale_stroke_value(point["x"], STROKE_SCALE)
+            y = scale_stroke_value(point["y"], STROKE_SCALE)
+            for delta in (x - previous_x, y - previous_y):
+                write_varint(out, delta * 2 if delta >= 0 else -delta * 2 - 1)
+            previous_x, previous_y = x, y
+    return bytes(out)
+
+
+def decode_strokes(records: bytes) -> list[dict]:
+    strokes = []
+    offset = 0
+    while offset < len(records):
+        flags = records[offset]
+        offset += 1
+        if flags & 2:
+            length, offset = read_varint(records, offset)
+            color = records[offset : offset + length].decode("utf-8")
+            offset += length
+        else:
+            color = "#" + records[offset : offset + 3].hex()
+            offset += 3
+        width, offset = read_varint(records, offset)
+        count, offset = read_varint(records, offset)
+
+        points = []
+        x = y = 0
+        for _ in range(count):
+            dx, offset = read_varint(records, offset)
+            dy, offset = read_varint(records, offset)
+            x += (dx >> 1) ^ -(dx & 1)
+            y += (dy >> 1) ^ -(dy & 1)
+            points.append({"x": x / STROKE_SCALE, "y": y / STROKE_SCALE})
+        strokes.append(
+            {
+                "points": points,
+                "color": color,
+                "isEraser": bool(flags & 1),
+                "lineWidthFactor": width / STROKE_WIDTH_SCALE,
+            }
+        )
+    return strokes
+
+
+def pack_strokes(records: bytes) -> bytes | None:
+    return zlib.compress(STROKE_FORMAT + records) if records else None
+
+
+def unpack_strokes(stroke_data: bytes | None, legacy_strokes: str | None) -> bytes:
+    # rows saved before stroke_data existed still hold the JSON in strokes
+    if stroke_data:
+        data = zlib.decompress(stroke_data)
+        if data[:1] != STROKE_FORMAT:
+            raise ValueError(f"unknown stroke format {data[:1]!r}")
+        return data[1:]
+    if legacy_strokes:
+        return encode_strokes(json.loads(legacy_strokes))
+    return b""
+
+
+def strategy_payload(row: tuple, compact: bool) -> dict:
+    # row is (strokes, stroke_data, stroke_count, robots_data, updated_at)
+    strategy = {
+        "strokes": None,
+        "strokesEncoded": None,
+        "strokeCount": row[2],
+        "robotsData": row[3],
+        "updatedAt": row[4],
+    }
+    if compact:
+        stroke_data = row[1] or pack_strokes(unpack_strokes(None, row[0]))
+        if stroke_data:
+            strategy["strokesEncoded"] = base64.b64encode(stroke_data).decode("ascii")
+    else:
+        records = unpack_strokes(row[1], row[0])
+        if records:
+            strategy["strokes"] = json.dumps(decode_strokes(records))
+    return strategy
+
+
+def split_strokes(records: bytes) -> list[bytes]:
+    # record boundaries, so strokes can be erased without re-encoding the others
+    boundaries = []
+    offset = 0
+    while offset < len(records):
+        start = offset
+        flags = records[offset]
+        offset += 1
+        if flags & 2:
+            length, offset = read_varint(records, offset)
+            offset += length
+        else:
+            offset += 3
+        _, offset = read_varint(records, offset)
+        count, offset = read_varint(records, offset)
+        for _ in range(count * 2):
+            _, offset = read_varint(records, offset)
+        boundaries.append(records[start:offset])
+    return boundaries
+
+
 sitemapper = Sitemapper()
 
 app = Flask(__name__)
@@ -305,181 +2043,62 @@ CORS(
         "capacitor://localhost",
         r"capacitor-electron://.*",
     ],
+    expose_headers=["X-Vanguard-Cursor", "X-Vanguard-Stale"],
 )
 sitemapper.init_app(app)
 
-ph = PasswordHasher()
-s = requests.Session()
 
-s.auth = (FTC_API_USERNAME, FTC_API_TOKEN)
+@app.teardown_appcontext
+def release_db_connections(exception):
+    for connection, lease in g.pop("db_leases", []):
+        # the connection may already be back in the pool and leased to someone else
+        if connection.lease is lease:
+            connection.close()
 
-ssh_dir = os.path.expanduser("~/.ssh")
-with open(os.path.join(ssh_dir, "id_rsa.pub"), "r") as f:
-    RSA_PUBLIC_KEY = f.read()
-with open(os.path.join(ssh_dir, "id_rsa.pem"), "r") as f:
-    RSA_PRIVATE_KEY = f.read()
-
-db = get_db()
-cursor = db.cursor()
-cursor.execute("PRAGMA journal_mode=WAL;")
-cursor.execute(
-    "CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, password TEXT)"
-)
 
-cursor.execute(
-    """CREATE TABLE IF NOT EXISTS registrations (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        team_number INTEGER NOT NULL,
-        email TEXT NOT NULL,
-        image_link TEXT NOT NULL,
-        status TEXT NOT NULL DEFAULT 'pending',
-        submitted_at INTEGER NOT NULL,
-        reviewed_at INTEGER
-    )"""
-)
+ph = PasswordHasher(**PASSWORD_HASH_PARAMETERS)
+s = requests.Session()
+ntfy = requests.Session()
 
-cursor.execute("""CREATE TABLE IF NOT EXISTS notes (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    team_id INTEGER NOT NULL,
-    subject_team_id INTEGER NOT NULL,
-    auto_performance TEXT,
-    teleop_performance TEXT,
-    general_notes TEXT,
-    updated_at INTEGER NOT NULL,
-    UNIQUE(team_id, subject_team_id)
-)""")
-cursor.execute("""CREATE TABLE IF NOT EXISTS notifications (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    team_id INTEGER NOT NULL,
-    title TEXT NOT NULL,
-    message TEXT NOT NULL,
-    sent_at INTEGER NOT NULL,
-    UNIQUE(team_id, title, message)
-)""")
-cursor.execute("""CREATE TABLE IF NOT EXISTS strategy (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    team_id INTEGER NOT NULL,
-    event_code TEXT NOT NULL,
-    match_number INTEGER NOT NULL,
-    match_description TEXT NOT NULL,
-    phase TEXT NOT NULL,
-    strokes TEXT,
-    robots_data TEXT,
-    updated_at INTEGER NOT NULL,
-    UNIQUE(team_id, event_code, match_description, phase)
-)""")
-# Migration: add match_description column if it doesn't exist
-cursor.execute("PRAGMA table_info(strategy)")
-columns = [col[1] for col in cursor.fetchall()]
-if "match_description" not in columns:
-    print("Migrating strategy table: adding match_description column")
-    cursor.execute("ALTER TABLE strategy ADD COLUMN match_description TEXT DEFAULT ''")
-    cursor.execute(
-        "UPDATE strategy SET match_description = 'Match ' || match_number WHERE match_description = ''"
-    )
-    db.commit()
+s.auth = (FTC_API_USERNAME, FTC_API_TOKEN)
 
-# Migration: fix UNIQUE constraint to include match_description
-cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='strategy'")
-strategy_sql = cursor.fetchone()
-if (
-    strategy_sql
-    and "UNIQUE(team_id, event_code, match_description, phase)" not in strategy_sql[0]
-):
-    print("Migrating strategy table: fixing UNIQUE constraint")
-    cursor.execute("ALTER TABLE strategy RENAME TO strategy_old")
-    cursor.execute("""CREATE TABLE strategy (
+if RECORD_PATH:
+    record_db = sqlite3.connect(RECORD_PATH, timeout=5)
+    record_db.execute("PRAGMA journal_mode=WAL")
+    # bodies are zlib-compressed; headers are JSON objects
+    record_db.execute("""CREATE TABLE IF NOT EXISTS exchanges (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
-        team_id INTEGER NOT NULL,
-        event_code TEXT NOT NULL,
-        match_number INTEGER NOT NULL,
-        match_description TEXT NOT NULL,
-        phase TEXT NOT NULL,
-        drawing_data TEXT,
-        robots_data TEXT,
-        updated_at INTEGER NOT NULL,
-        UNIQUE(team_id, event_code, match_description, phase)
+        recorded_at REAL NOT NULL,
+        method TEXT NOT NULL,
+        url TEXT NOT NULL,
+        request_headers TEXT NOT NULL,
+        request_body BLOB NOT NULL,
+        status_code INTEGER NOT NULL,
+        response_headers TEXT NOT NULL,
+        response_body BLOB NOT NULL,
+        elapsed_ms INTEGER NOT NULL
     )""")
-    cursor.execute("""INSERT INTO strategy (id, team_id, event_code, match_number, match_description, phase, drawing_data, robots_data, updated_at)
-        SELECT id, team_id, event_code, match_number, COALESCE(match_description, 'Match ' || match_number), phase, drawing_data, robots_data, updated_at
-        FROM strategy_old""")
-    cursor.execute("DROP TABLE strategy_old")
-    db.commit()
+    record_db.commit()
+    record_db.close()
 
-# Migration: add strokes column if it doesn't exist
-cursor.execute("PRAGMA table_info(strategy)")
-strategy_columns = [col[1] for col in cursor.fetchall()]
-if "strokes" not in strategy_columns:
-    print("Migrating strategy table: adding strokes column")
-    cursor.execute("ALTER TABLE strategy ADD COLUMN strokes TEXT")
-    db.commit()
-
-# Migration: convert schedule_offsets to event-scoped keys
-cursor.execute(
-    "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schedule_offsets'"
-)
-schedule_offsets_exists = cursor.fetchone() is not None
-
-if not schedule_offsets_exists:
-    cursor.execute("""CREATE TABLE schedule_offsets (
-        team_id INTEGER NOT NULL,
-        event_code TEXT NOT NULL,
-        time_offset_minutes INTEGER NOT NULL DEFAULT 0,
-        updated_at INTEGER NOT NULL,
-        PRIMARY KEY(team_id, event_code)
-    )""")
-else:
-    cursor.execute("PRAGMA table_info(schedule_offsets)")
-    team_schedule_columns = cursor.fetchall()
-    team_schedule_column_names = [col[1] for col in team_schedule_columns]
-    team_id_pk_position = next(
-        (col[5] for col in team_schedule_columns if col[1] == "team_id"), 0
-    )
-    event_code_pk_position = next(
-        (col[5] for col in team_schedule_columns if col[1] == "event_code"), 0
-    )
-    has_event_scoped_pk = team_id_pk_position == 1 and event_code_pk_position == 2
-
-    if "event_code" not in team_schedule_column_names or not has_event_scoped_pk:
-        print("Migrating schedule_offsets table to event-scoped offsets")
-        cursor.execute("ALTER TABLE schedule_offsets RENAME TO schedule_offsets_legacy")
-        cursor.execute("""CREATE TABLE schedule_offsets (
-            team_id INTEGER NOT NULL,
-            event_code TEXT NOT NULL,
-            time_offset_minutes INTEGER NOT NULL DEFAULT 0,
-            updated_at INTEGER NOT NULL,
-            PRIMARY KEY(team_id, event_code)
-        )""")
-
-        cursor.execute("PRAGMA table_info(schedule_offsets_legacy)")
-        legacy_columns = [col[1] for col in cursor.fetchall()]
-        if "event_code" in legacy_columns:
-            cursor.execute(
-                """INSERT OR REPLACE INTO schedule_offsets (team_id, event_code, time_offset_minutes, updated_at)
-                   SELECT team_id,
-                          COALESCE(NULLIF(UPPER(TRIM(event_code)), ''), '__LEGACY__'),
-                          time_offset_minutes,
-                          updated_at
-                   FROM schedule_offsets_legacy"""
-            )
-        else:
-            cursor.execute(
-                """INSERT OR REPLACE INTO schedule_offsets (team_id, event_code, time_offset_minutes, updated_at)
-                   SELECT team_id,
-                          '__LEGACY__',
-                          time_offset_minutes,
-                          updated_at
-                   FROM schedule_offsets_legacy"""
-            )
-        cursor.execute("DROP TABLE schedule_offsets_legacy")
+    s.hooks["response"].append(record_exchange)
+    ntfy.hooks["response"].append(record_exchange)
 
-db.commit()
-db.close()
+# the gunicorn master already ran these (gunicorn.conf.py), so workers only check the version
+migrate_databases(DB_PATH, CACHE_DB_PATH)
 
 if len(NTFY_TEAMS) > 0:
     thread = threading.Thread(target=notification_loop, daemon=True)
     thread.start()
 
+threading.Thread(target=upstream_probe_loop, daemon=True).start()
+
+if MAINTENANCE_INTERVAL > 0:
+    threading.Thread(target=maintenance_loop, daemon=True).start()
+
+if BACKUP_INTERVAL > 0:
+    threading.Thread(target=backup_loop, daemon=True).start()
+
 
 @sitemapper.include(lastmod="2026-02-14")
 @app.route("/", methods=["GET"])
@@ -559,7 +2178,7 @@ def _api_v1_uaregister():
         db.commit()
         cursor.close()
         db.close()
-        requests.post(
+        ntfy.post(
             REGISTRATION_NOTIF_URL,
             data=f"Team {team_number} is registering for Vanguard. Please review.",
             headers={
@@ -591,7 +2210,10 @@ def _api_v1_register():
             "error": "password must be at least 8 characters",
         }, 400
 
-    hash = ph.hash(password)
+    try:
+        hash = hash_password(password)
+    except PasswordHasherBusy:
+        return {"status": "fuck", "error": "server busy"}, 503
 
     try:
         db = get_db()
@@ -606,7 +2228,7 @@ def _api_v1_register():
         db.commit()
         cursor.close()
         db.close()
-        requests.post(
+        ntfy.post(
             REGISTRATION_NOTIF_URL,
             data=f"Team {team_id} just registered for Vanguard!",
             headers={
@@ -634,146 +2256,228 @@ def _api_v1_login():
     try:
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("SELECT password FROM users WHERE id = ?", (team_id,))
+        cursor.execute("SELECT password FROM users WHERE id = ?", (team_id,))
+        row = cursor.fetchone()
+        # argon2 takes a while; the pooled connection goes back until it is done
+        cursor.close()
+        db.close()
+
+        if row is None:
+            return {"status": "fuck", "error": "skibidi creds"}, 401
+
+        stored_hash = row[0]
+        verify_password(stored_hash, password)
+
+        # hashes made with older parameters are upgraded while we have the password
+        new_hash = None
+        if ph.check_needs_rehash(stored_hash):
+            new_hash = hash_password(password)
+
+        db = get_db()
+        cursor = db.cursor()
+        if new_hash is not None:
+            cursor.execute(
+                "UPDATE users SET password = ? WHERE id = ? AND password = ?",
+                (new_hash, team_id, stored_hash),
+            )
+            metric_incr("passwords.rehashed")
+
+        token = issue_access_token(team_id, ["user"])
+        refresh_token = issue_refresh_token(cursor, team_id)
+        db.commit()
+        cursor.close()
+        db.close()
+        return {
+            "status": "success!",
+            "token": token,
+            "refreshToken": refresh_token,
+            "expiresIn": ACCESS_TOKEN_MINUTES * 60,
+        }, 200
+    except argon2.exceptions.VerifyMismatchError:
+        return {"status": "fuck", "error": "skibidi creds"}, 401
+    except PasswordHasherBusy:
+        return {"status": "fuck", "error": "server busy"}, 503
+    except Exception as e:
+        print(e)
+        return {"status": "fuck", "error": "idk"}, 500
+
+
+@app.route("/api/v1/password_reset", methods=["POST"])
+@require_auth
+def _api_v1_password_reset():
+    team_id = g.token_payload.get("id")
+
+    data = request.json
+    current_password = data.get("currentPassword")
+    new_password = data.get("newPassword")
+
+    if not current_password or not new_password:
+        return {"status": "fuck", "error": "missing fields"}, 400
+
+    if len(new_password) < 6:
+        return {"status": "fuck", "error": "password too short"}, 400
+
+    try:
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute("SELECT password FROM users WHERE id = ?", (team_id,))
+        row = cursor.fetchone()
+        # argon2 takes a while; the pooled connection goes back until it is done
+        cursor.close()
+        db.close()
+
+        if row is None:
+            return {"status": "fuck", "error": "user not found"}, 404
+
+        stored_hash = row[0]
+        verify_password(stored_hash, current_password)
+
+        new_hash = hash_password(new_password)
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute(
+            "UPDATE users SET password = ? WHERE id = ?", (new_hash, team_id)
+        )
+        # other devices have to log in again; this one gets a fresh pair
+        revoke_refresh_tokens(cursor, team_id)
+        token = issue_access_token(team_id, ["user"])
+        refresh_token = issue_refresh_token(cursor, team_id)
+        db.commit()
+        cursor.close()
+        db.close()
+        return {
+            "status": "success!",
+            "token": token,
+            "refreshToken": refresh_token,
+            "expiresIn": ACCESS_TOKEN_MINUTES * 60,
+        }, 200
+    except argon2.exceptions.VerifyMismatchError:
+        return {"status": "fuck", "error": "incorrect password"}, 401
+    except PasswordHasherBusy:
+        return {"status": "fuck", "error": "server busy"}, 503
+    except Exception as e:
+        print(e)
+        return {"status": "fuck", "error": "idk"}, 500
+
+
+@app.route("/api/v1/token/refresh", methods=["POST"])
+def _api_v1_token_refresh():
+    data = request.json
+    refresh_token = data.get("refreshToken") if data else None
+    if not refresh_token:
+        return {"status": "fuck", "error": "missing refresh token"}, 400
+
+    now = int(datetime.now().timestamp())
+    try:
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute(
+            """SELECT id, team_id, family_id, expires_at, revoked_at, rotated
+               FROM refresh_tokens WHERE token_hash = ?""",
+            (hash_refresh_token(refresh_token),),
+        )
         row = cursor.fetchone()
-
         if row is None:
-            return {"status": "fuck", "error": "skibidi creds"}, 401
-
-        stored_hash = row[0]
-        ph.verify(stored_hash, password)
+            cursor.close()
+            db.close()
+            return {"status": "fuck", "error": "invalid refresh token"}, 401
+        token_id, team_id, family_id, expires_at, revoked_at, rotated = row
+
+        if revoked_at is not None:
+            if rotated and now - revoked_at > REFRESH_REUSE_GRACE_SECONDS:
+                # a replaced token came back, so it leaked; end every session descended from its login
+                cursor.execute(
+                    "UPDATE refresh_tokens SET revoked_at = ? WHERE family_id = ? AND revoked_at IS NULL",
+                    (now, family_id),
+                )
+                db.commit()
+                metric_incr("auth.refresh_reuse")
+                print(f"Refresh token reuse for team {team_id}, revoked family {family_id}")
+            cursor.close()
+            db.close()
+            return {"status": "fuck", "error": "invalid refresh token"}, 401
+        if expires_at <= now:
+            cursor.close()
+            db.close()
+            return {"status": "fuck", "error": "refresh token expired"}, 401
 
-        token = jwt.encode(
-            {
-                "id": team_id,
-                "scope": ["user"],
-                "exp": int((datetime.now() + timedelta(hours=24)).timestamp()),
-            },
-            RSA_PRIVATE_KEY,
-            algorithm="RS256",
+        cursor.execute(
+            """UPDATE refresh_tokens SET revoked_at = ?, rotated = 1
+               WHERE id = ? AND revoked_at IS NULL""",
+            (now, token_id),
         )
+        if cursor.rowcount == 0:
+            # another request replaced it first
+            cursor.close()
+            db.close()
+            return {"status": "fuck", "error": "invalid refresh token"}, 401
+        new_refresh_token = issue_refresh_token(cursor, team_id, family_id)
+        db.commit()
         cursor.close()
         db.close()
-        return {"status": "success!", "token": token}, 200
-    except argon2.exceptions.VerifyMismatchError:
-        return {"status": "fuck", "error": "skibidi creds"}, 401
     except Exception as e:
         print(e)
         return {"status": "fuck", "error": "idk"}, 500
 
+    return {
+        "status": "success!",
+        "token": issue_access_token(team_id, ["user"]),
+        "refreshToken": new_refresh_token,
+        "expiresIn": ACCESS_TOKEN_MINUTES * 60,
+    }, 200
 
-@app.route("/api/v1/password_reset", methods=["POST"])
-def _api_v1_password_reset():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        team_id = payload.get("id")
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
 
+@app.route("/api/v1/token/revoke", methods=["POST"])
+def _api_v1_token_revoke():
     data = request.json
-    current_password = data.get("currentPassword")
-    new_password = data.get("newPassword")
-
-    if not current_password or not new_password:
-        return {"status": "fuck", "error": "missing fields"}, 400
-
-    if len(new_password) < 6:
-        return {"status": "fuck", "error": "password too short"}, 400
+    refresh_token = data.get("refreshToken") if data else None
+    if not refresh_token:
+        return {"status": "fuck", "error": "missing refresh token"}, 400
 
     try:
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("SELECT password FROM users WHERE id = ?", (team_id,))
-        row = cursor.fetchone()
-
-        if row is None:
-            cursor.close()
-            db.close()
-            return {"status": "fuck", "error": "user not found"}, 404
-
-        stored_hash = row[0]
-        ph.verify(stored_hash, current_password)
-
-        new_hash = ph.hash(new_password)
         cursor.execute(
-            "UPDATE users SET password = ? WHERE id = ?", (new_hash, team_id)
+            "UPDATE refresh_tokens SET revoked_at = ? WHERE token_hash = ? AND revoked_at IS NULL",
+            (int(datetime.now().timestamp()), hash_refresh_token(refresh_token)),
         )
         db.commit()
         cursor.close()
         db.close()
-        return {"status": "success!"}, 200
-    except argon2.exceptions.VerifyMismatchError:
-        return {"status": "fuck", "error": "incorrect password"}, 401
+        return {"status": "success"}, 200
     except Exception as e:
         print(e)
         return {"status": "fuck", "error": "idk"}, 500
 
 
 @app.route("/api/v1/verify", methods=["GET"])
+@require_auth
 def _api_v1_verify():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        return {
-            "status": "success!",
-            "scope": payload.get("scope"),
-            "id": payload.get("id"),
-        }, 200
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except:
-        return {"status": "fuck", "error": "invalid token"}, 401
+    payload = g.token_payload
+    return {
+        "status": "success!",
+        "scope": payload.get("scope"),
+        "id": payload.get("id"),
+    }, 200
 
 
 @app.route("/api/v1/events", methods=["GET"])
+@require_auth
 def _api_v1_events():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        team_id = payload.get("id")
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except:
-        return {"status": "fuck", "error": "invalid token"}, 401
+    team_id = g.token_payload.get("id")
 
     # fetch events from FTC API
 
     now = datetime.now() - timedelta(weeks=34)
     year = now.year
 
-    r = s.get(f"{FTC_API_URL}/{year}/events?teamNumber={team_id}")
-    return r.json(), r.status_code
+    r = ftc_get(f"{FTC_API_URL}/{year}/events?teamNumber={team_id}")
+    return r.json(), r.status_code, upstream_headers(r)
 
 
 @app.route("/api/v1/event", methods=["GET"])
+@require_auth
 def _api_v1_event():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
     # fetch event from FTC API
 
     try:
@@ -784,24 +2488,13 @@ def _api_v1_event():
     now = datetime.now() - timedelta(weeks=34)
     year = now.year
 
-    r = s.get(f"{FTC_API_URL}/{year}/events?eventCode={event}")
-    return r.json(), r.status_code
+    r = ftc_get(f"{FTC_API_URL}/{year}/events?eventCode={event}")
+    return r.json(), r.status_code, upstream_headers(r)
 
 
 @app.route("/api/v1/schedule", methods=["GET"])
+@require_auth
 def _api_v1_schedule():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
     # fetch schedule from FTC API
 
     try:
@@ -812,43 +2505,81 @@ def _api_v1_schedule():
     now = datetime.now() - timedelta(weeks=34)
     year = now.year
 
-    # Fetch both qual and playoff schedules and merge them
-    qual_url = f"{FTC_API_URL}/{year}/schedule/{event}?tournamentLevel=qual"
-    playoff_url = f"{FTC_API_URL}/{year}/schedule/{event}?tournamentLevel=playoff"
+    schedule, headers = fetch_event_schedule(year, event)
+    return {"schedule": schedule}, 200, headers
 
-    qual_res = s.get(qual_url)
-    playoff_res = s.get(playoff_url)
 
-    qual_schedule = []
-    playoff_schedule = []
+@app.route("/api/v1/event/<event_code>/bundle", methods=["GET"])
+@require_auth
+def _api_v1_event_bundle(event_code):
+    event_code = normalize_event_code(event_code)
+    if not event_code:
+        return {"status": "fuck", "error": "missing event"}, 400
 
-    if qual_res.status_code == 200:
-        qual_data = qual_res.json()
-        qual_schedule = qual_data.get("schedule", [])
+    # sections whose version the client already holds are sent without data
+    known_versions = set(filter(None, request.args.get("since", "").split(",")))
+
+    try:
+        sections = fetch_event_bundle(event_code)
+    except Exception as e:
+        print(e)
+        return {"status": "fuck", "error": "idk"}, 500
+
+    for section in sections.values():
+        if section["version"] in known_versions:
+            del section["data"]
+
+    stale_ages = [section["staleAge"] for section in sections.values() if "staleAge" in section]
+    headers = {"X-Vanguard-Stale": str(max(stale_ages))} if stale_ages else {}
+    return {"status": "success", "eventCode": event_code, "sections": sections}, 200, headers
 
-    if playoff_res.status_code == 200:
-        playoff_data = playoff_res.json()
-        playoff_schedule = playoff_data.get("schedule", [])
 
-    merged_schedule = qual_schedule + playoff_schedule
+# the client reads this with fetch so the token stays in the Authorization header, out of
+# access logs and browser history; the stream ends when the token expires
+@app.route("/api/v1/event/<event_code>/stream", methods=["GET"])
+@require_auth
+def _api_v1_event_stream(event_code):
+    payload = g.token_payload
+    event_code = normalize_event_code(event_code)
+    if not event_code:
+        return {"status": "fuck", "error": "missing event"}, 400
 
-    return {"schedule": merged_schedule}, 200
+    known_versions = set(filter(None, request.args.get("since", "").split(",")))
+    token_exp = payload.get("exp", 0)
+
+    def generate():
+        poller, subscriber = subscribe_event_stream(event_code)
+        try:
+            yield f"retry: {int(EVENT_STREAM_POLL_SECONDS * 1000)}\n\n"
+            while time.time() < token_exp:
+                try:
+                    sections = subscriber.get(timeout=EVENT_STREAM_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+
+                sections = {
+                    name: section
+                    for name, section in sections.items()
+                    if section["version"] not in known_versions
+                }
+                known_versions.clear()
+                if sections:
+                    yield f"event: sections\ndata: {json.dumps(sections)}\n\n"
+        finally:
+            poller.unsubscribe(subscriber)
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.route("/api/v1/schedule/offset", methods=["GET"])
+@require_auth
 def _api_v1_schedule_offset_get():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        team_id = payload.get("id")
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
+    team_id = g.token_payload.get("id")
 
     event_code = normalize_event_code(request.args.get("event"))
     if not event_code:
@@ -866,19 +2597,9 @@ def _api_v1_schedule_offset_get():
 
 
 @app.route("/api/v1/schedule/offset", methods=["PUT"])
+@require_auth
 def _api_v1_schedule_offset_put():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        team_id = payload.get("id")
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
+    team_id = g.token_payload.get("id")
 
     event_code = normalize_event_code(request.args.get("event"))
     if not event_code:
@@ -907,19 +2628,8 @@ def _api_v1_schedule_offset_put():
 
 
 @app.route("/api/v1/matches", methods=["GET"])
+@require_auth
 def _api_v1_matches():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
     try:
         event = request.args.get("event")
     except:
@@ -939,66 +2649,33 @@ def _api_v1_matches():
     if params:
         url = f"{url}?{'&'.join(params)}"
 
-    r = s.get(url)
-    return r.json(), r.status_code
+    r = ftc_get(url)
+    return r.json(), r.status_code, upstream_headers(r)
 
 
 @app.route("/api/v1/scores/<event>/<level>", methods=["GET"])
+@require_auth
 def _api_v1_scores(event, level):
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
     now = datetime.now() - timedelta(weeks=34)
     year = now.year
 
-    r = s.get(f"{FTC_API_URL}/{year}/scores/{event}/{level}")
-    return r.json(), r.status_code
+    r = ftc_get(f"{FTC_API_URL}/{year}/scores/{event}/{level}")
+    return r.json(), r.status_code, upstream_headers(r)
 
 
 @app.route("/api/v1/team/<int:team_number>/events", methods=["GET"])
+@require_auth
 def _api_v1_team_events(team_number):
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
     now = datetime.now() - timedelta(weeks=34)
     year = now.year
 
-    r = s.get(f"{FTC_API_URL}/{year}/events?teamNumber={team_number}")
-    return r.json(), r.status_code
+    r = ftc_get(f"{FTC_API_URL}/{year}/events?teamNumber={team_number}", "bulk")
+    return r.json(), r.status_code, upstream_headers(r)
 
 
 @app.route("/api/v1/rankings", methods=["GET"])
+@require_auth
 def _api_v1_rankings():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
     # fetch rankings from FTC API using event rankings
 
     try:
@@ -1012,24 +2689,13 @@ def _api_v1_rankings():
     now = datetime.now() - timedelta(weeks=34)
     year = now.year
 
-    r = s.get(f"{FTC_API_URL}/{year}/rankings/{event}")
-    return r.json(), r.status_code
+    r = ftc_get(f"{FTC_API_URL}/{year}/rankings/{event}")
+    return r.json(), r.status_code, upstream_headers(r)
 
 
 @app.route("/api/v1/teams", methods=["GET"])
+@require_auth
 def _api_v1_teams():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
     try:
         event = request.args.get("event")
     except:
@@ -1038,45 +2704,24 @@ def _api_v1_teams():
     now = datetime.now() - timedelta(weeks=34)
     year = now.year
 
-    r = s.get(f"{FTC_API_URL}/{year}/teams?eventCode={event}")
-    return r.json(), r.status_code
+    r = ftc_get(f"{FTC_API_URL}/{year}/teams?eventCode={event}")
+    return r.json(), r.status_code, upstream_headers(r)
 
 
 @app.route("/api/v1/team/<int:team_number>", methods=["GET"])
+@require_auth
 def _api_v1_team_info(team_number):
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
     now = datetime.now() - timedelta(weeks=34)
     year = now.year
 
-    r = s.get(f"{FTC_API_URL}/{year}/teams?teamNumber={team_number}")
-    return r.json(), r.status_code
+    r = ftc_get(f"{FTC_API_URL}/{year}/teams?teamNumber={team_number}", "bulk")
+    return r.json(), r.status_code, upstream_headers(r)
 
 
 @app.route("/api/v1/notes", methods=["GET"])
+@require_auth
 def _api_v1_notes_get():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        team_id = payload.get("id")
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
+    team_id = g.token_payload.get("id")
 
     subject_team_id = request.args.get("team")
     if not subject_team_id:
@@ -1125,19 +2770,9 @@ def _api_v1_notes_get():
 
 
 @app.route("/api/v1/notes", methods=["POST"])
+@require_auth
 def _api_v1_notes_post():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        team_id = payload.get("id")
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
+    team_id = g.token_payload.get("id")
 
     data = request.json
     if not data:
@@ -1153,11 +2788,10 @@ def _api_v1_notes_post():
         return {"status": "fuck", "error": "invalid request data"}, 400
 
     try:
-        db = get_db()
-        cursor = db.cursor()
         updated_at = int(datetime.now().timestamp())
 
-        cursor.execute(
+        updated_at = write_upsert(
+            ("notes", team_id, subject_team_id),
             """INSERT INTO notes (team_id, subject_team_id, auto_performance, teleop_performance, general_notes, updated_at)
                VALUES (?, ?, ?, ?, ?, ?)
                ON CONFLICT(team_id, subject_team_id) 
@@ -1174,10 +2808,8 @@ def _api_v1_notes_post():
                 general_notes,
                 updated_at,
             ),
+            updated_at,
         )
-        db.commit()
-        cursor.close()
-        db.close()
 
         return {"status": "success", "updatedAt": updated_at}, 200
     except Exception as e:
@@ -1186,19 +2818,9 @@ def _api_v1_notes_post():
 
 
 @app.route("/api/v1/notes/list", methods=["GET"])
+@require_auth
 def _api_v1_notes_list():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        team_id = payload.get("id")
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
+    team_id = g.token_payload.get("id")
 
     try:
         db = get_db()
@@ -1223,19 +2845,9 @@ def _api_v1_notes_list():
 
 
 @app.route("/api/v1/strategy", methods=["GET"])
+@require_auth
 def _api_v1_strategy_get():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        team_id = payload.get("id")
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
+    team_id = g.token_payload.get("id")
 
     event_code = request.args.get("event")
     match_number = request.args.get("match")
@@ -1253,55 +2865,289 @@ def _api_v1_strategy_get():
     if phase not in ("auto", "teleop", "endgame"):
         return {"status": "fuck", "error": "invalid phase"}, 400
 
+    # format=compact returns the stored encoding (base64 in strokesEncoded) instead of JSON strokes
+    compact = request.args.get("format") == "compact"
+
     try:
         db = get_db()
         cursor = db.cursor()
         cursor.execute(
-            """SELECT strokes, robots_data, updated_at
+            """SELECT strokes, stroke_data, stroke_count, robots_data, updated_at
                FROM strategy WHERE team_id = ? AND event_code = ? AND match_description = ? AND phase = ?""",
             (team_id, event_code, match_description, phase),
         )
-        row = cursor.fetchone()
-        cursor.close()
-        db.close()
-
-        if row is None:
-            return {
-                "status": "success",
-                "strategy": {
-                    "strokes": None,
-                    "robotsData": None,
-                    "updatedAt": None,
-                },
-            }, 200
+        row = cursor.fetchone()
+        cursor.close()
+        db.close()
+
+        if row is None:
+            return {
+                "status": "success",
+                "strategy": {
+                    "strokes": None,
+                    "strokesEncoded": None,
+                    "strokeCount": 0,
+                    "robotsData": None,
+                    "updatedAt": None,
+                },
+            }, 200
+
+        return {"status": "success", "strategy": strategy_payload(row, compact)}, 200
+    except Exception as e:
+        print(e)
+        return {"status": "fuck", "error": "idk"}, 500
+
+
+@app.route("/api/v1/notes/bulk", methods=["GET"])
+@require_auth
+def _api_v1_notes_bulk():
+    # all of the caller's notes as NDJSON, oldest change first; pass X-Vanguard-Cursor back as
+    # since to get only notes saved since (inclusive, as updated_at has 1 s resolution)
+    team_id = g.token_payload.get("id")
+
+    try:
+        since = int(request.args.get("since", 0))
+    except ValueError:
+        return {"status": "fuck", "error": "since must be int"}, 400
+
+    headers = {}
+    event_teams = None
+    event = request.args.get("event")
+    if event:
+        year = (datetime.now() - timedelta(weeks=34)).year
+        r = ftc_get(f"{FTC_API_URL}/{year}/teams?eventCode={event}")
+        if r.status_code != 200:
+            return r.json(), r.status_code, upstream_headers(r)
+        event_teams = {team["teamNumber"] for team in r.json().get("teams", [])}
+        headers = upstream_headers(r)
+
+    try:
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute(
+            """SELECT subject_team_id, auto_performance, teleop_performance, general_notes, updated_at
+               FROM notes WHERE team_id = ? AND updated_at >= ?
+               ORDER BY updated_at""",
+            (team_id, since),
+        )
+        rows = cursor.fetchall()
+        cursor.close()
+        db.close()
+    except Exception as e:
+        print(e)
+        return {"status": "fuck", "error": "idk"}, 500
+
+    # the cursor covers every note read, including ones the event filter drops
+    headers["X-Vanguard-Cursor"] = str(rows[-1][4] if rows else since)
+    if event_teams is not None:
+        rows = [row for row in rows if row[0] in event_teams]
+
+    def generate():
+        for row in rows:
+            yield json.dumps(
+                {
+                    "subjectTeamId": row[0],
+                    "autoPerformance": row[1] or "",
+                    "teleopPerformance": row[2] or "",
+                    "generalNotes": row[3] or "",
+                    "updatedAt": row[4],
+                }
+            ) + "\n"
+
+    return Response(generate(), mimetype="application/x-ndjson", headers=headers)
+
+
+SEARCH_MAX_TERMS = 16
+SEARCH_MAX_LIMIT = 100
+
+
+def notes_search_query(team_id: int, text: str) -> str | None:
+    # every word must appear in one of the note fields; the last one may be partial, so
+    # results show up while typing. Words are quoted, so FTS5 syntax in text is matched literally
+    terms = re.findall(r"\w+", text)[:SEARCH_MAX_TERMS]
+    if not terms:
+        return None
+    phrases = " ".join(f'"{term}"' for term in terms) + "*"
+    return f'team_id : "{team_id}" AND {{auto_performance teleop_performance general_notes}} : ({phrases})'
+
+
+def highlight_note(text: str) -> str:
+    # highlight() marks matches with \x02 and \x03 so the note itself can be escaped first
+    return html.escape(text or "").replace("\x02", "<mark>").replace("\x03", "</mark>")
+
+
+@app.route("/api/v1/notes/search", methods=["GET"])
+@require_auth
+def _api_v1_notes_search():
+    team_id = g.token_payload.get("id")
+    query = notes_search_query(team_id, request.args.get("q", ""))
+    if query is None:
+        return {"status": "fuck", "error": "q required"}, 400
+
+    try:
+        limit = min(SEARCH_MAX_LIMIT, max(1, int(request.args.get("limit", 20))))
+    except ValueError:
+        return {"status": "fuck", "error": "limit must be int"}, 400
+
+    try:
+        db = get_db()
+        cursor = db.cursor()
+        # team_id is weighted 0 so it matches without adding to the score
+        cursor.execute(
+            """SELECT notes.subject_team_id, notes.updated_at,
+                      bm25(notes_fts, 0, 1, 1, 1) AS score,
+                      highlight(notes_fts, 1, char(2), char(3)),
+                      highlight(notes_fts, 2, char(2), char(3)),
+                      highlight(notes_fts, 3, char(2), char(3))
+               FROM notes_fts JOIN notes ON notes.id = notes_fts.rowid
+               WHERE notes_fts MATCH ?
+               ORDER BY score
+               LIMIT ?""",
+            (query, limit),
+        )
+        rows = cursor.fetchall()
+        cursor.close()
+        db.close()
+
+        results = [
+            {
+                "subjectTeamId": row[0],
+                "updatedAt": row[1],
+                "score": round(-row[2], 3),
+                "autoPerformance": highlight_note(row[3]),
+                "teleopPerformance": highlight_note(row[4]),
+                "generalNotes": highlight_note(row[5]),
+            }
+            for row in rows
+        ]
+
+        return {"status": "success", "results": results}, 200
+    except Exception as e:
+        print(e)
+        return {"status": "fuck", "error": "idk"}, 500
+
+
+@app.route("/api/v1/strategy/event/<event_code>", methods=["GET"])
+@require_auth
+def _api_v1_strategy_event(event_code):
+    # every saved phase of the caller's boards at an event; pass the returned cursor as
+    # updatedSince to get only boards saved since (inclusive, as updated_at has 1 s resolution)
+    team_id = g.token_payload.get("id")
+    compact = request.args.get("format") == "compact"
+
+    try:
+        updated_since = int(request.args.get("updatedSince", 0))
+    except ValueError:
+        return {"status": "fuck", "error": "updatedSince must be int"}, 400
+
+    try:
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute(
+            """SELECT match_number, match_description, phase, strokes, stroke_data, stroke_count, robots_data, updated_at
+               FROM strategy WHERE team_id = ? AND event_code = ? AND updated_at >= ?
+               ORDER BY updated_at""",
+            (team_id, event_code, updated_since),
+        )
+        rows = cursor.fetchall()
+        cursor.close()
+        db.close()
+    except Exception as e:
+        print(e)
+        return {"status": "fuck", "error": "idk"}, 500
+
+    next_cursor = rows[-1][7] if rows else updated_since
+
+    def generate():
+        # boards are decoded one at a time as the response is written
+        yield f'{{"status": "success", "eventCode": {json.dumps(event_code)}, "cursor": {next_cursor}, "strategies": ['
+        for index, row in enumerate(rows):
+            entry = {
+                "matchNumber": row[0],
+                "matchDescription": row[1],
+                "phase": row[2],
+            } | strategy_payload(row[3:], compact)
+            yield ("," if index else "") + json.dumps(entry)
+        yield "]}"
+
+    return Response(generate(), mimetype="application/json")
+
+
+@app.route("/api/v1/strategy", methods=["POST"])
+@require_auth
+def _api_v1_strategy_post():
+    team_id = g.token_payload.get("id")
+
+    data = request.json
+    if not data:
+        return {"status": "fuck", "error": "missing request body"}, 400
+
+    try:
+        event_code = data.get("eventCode")
+        match_number = int(data.get("matchNumber"))
+        match_description = data.get("matchDescription")
+        phase = data.get("phase")
+        strokes = data.get("strokes")
+        robots_data = data.get("robotsData")
+    except (ValueError, TypeError) as e:
+        print(f"Invalid strategy data: {e}")
+        return {"status": "fuck", "error": "invalid request data"}, 400
+
+    if not event_code or not match_description or not phase:
+        return {"status": "fuck", "error": "missing required fields"}, 400
+
+    if phase not in ("auto", "teleop", "endgame"):
+        return {"status": "fuck", "error": "invalid phase"}, 400
+
+    try:
+        stroke_data = pack_strokes(encode_strokes(strokes or []))
+        stroke_count = len(strokes or [])
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        print(f"Invalid strategy strokes: {e}")
+        return {"status": "fuck", "error": "invalid strokes"}, 400
+
+    try:
+        updated_at = int(datetime.now().timestamp())
+
+        updated_at = write_upsert(
+            ("strategy", team_id, event_code, match_description, phase),
+            """INSERT INTO strategy (team_id, event_code, match_number, match_description, phase, strokes, stroke_data, stroke_count, robots_data, updated_at)
+               VALUES (?, ?, ?, ?, ?, NULL, ?, ?, ?, ?)
+               ON CONFLICT(team_id, event_code, match_description, phase)
+               DO UPDATE SET strokes=NULL, stroke_data=?, stroke_count=?, robots_data=?, updated_at=?""",
+            (
+                team_id,
+                event_code,
+                match_number,
+                match_description,
+                phase,
+                stroke_data,
+                stroke_count,
+                robots_data,
+                updated_at,
+                stroke_data,
+                stroke_count,
+                robots_data,
+                updated_at,
+            ),
+            updated_at,
+        )
 
         return {
             "status": "success",
-            "strategy": {
-                "strokes": row[0],
-                "robotsData": row[1],
-                "updatedAt": row[2],
-            },
+            "updatedAt": updated_at,
+            "strokeCount": stroke_count,
         }, 200
     except Exception as e:
         print(e)
         return {"status": "fuck", "error": "idk"}, 500
 
 
-@app.route("/api/v1/strategy", methods=["POST"])
-def _api_v1_strategy_post():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        team_id = payload.get("id")
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
+@app.route("/api/v1/strategy", methods=["PATCH"])
+@require_auth
+def _api_v1_strategy_patch():
+    # erases the last `erase` strokes and appends `append`, if the board still has baseCount strokes
+    team_id = g.token_payload.get("id")
 
     data = request.json
     if not data:
@@ -1312,10 +3158,12 @@ def _api_v1_strategy_post():
         match_number = int(data.get("matchNumber"))
         match_description = data.get("matchDescription")
         phase = data.get("phase")
-        strokes = data.get("strokes")
-        robots_data = data.get("robotsData")
-    except (ValueError, TypeError) as e:
-        print(f"Invalid strategy data: {e}")
+        base_count = int(data.get("baseCount"))
+        erase = int(data.get("erase", 0))
+        appended = data.get("append") or []
+        appended_records = encode_strokes(appended)
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        print(f"Invalid strategy patch: {e}")
         return {"status": "fuck", "error": "invalid request data"}, 400
 
     if not event_code or not match_description or not phase:
@@ -1324,30 +3172,59 @@ def _api_v1_strategy_post():
     if phase not in ("auto", "teleop", "endgame"):
         return {"status": "fuck", "error": "invalid phase"}, 400
 
-    import json
-
-    strokes_str = json.dumps(strokes) if strokes else None
+    if erase < 0 or erase > base_count:
+        return {"status": "fuck", "error": "invalid erase count"}, 400
 
+    key = ("strategy", team_id, event_code, match_description, phase)
     try:
+        if write_queue is not None:
+            write_queue.wait(key)
+
         db = get_db()
         cursor = db.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(
+            """SELECT strokes, stroke_data, stroke_count, robots_data
+               FROM strategy WHERE team_id = ? AND event_code = ? AND match_description = ? AND phase = ?""",
+            (team_id, event_code, match_description, phase),
+        )
+        row = cursor.fetchone()
+        stroke_count = row[2] if row else 0
+        if stroke_count != base_count:
+            cursor.close()
+            db.close()
+            return {
+                "status": "fuck",
+                "error": "strokes changed",
+                "strokeCount": stroke_count,
+            }, 409
+
+        records = unpack_strokes(row[1], row[0]) if row else b""
+        if erase:
+            records = b"".join(split_strokes(records)[: stroke_count - erase])
+        records += appended_records
+        stroke_count = stroke_count - erase + len(appended)
+        robots_data = data["robotsData"] if "robotsData" in data else (row[3] if row else None)
+        stroke_data = pack_strokes(records)
         updated_at = int(datetime.now().timestamp())
 
         cursor.execute(
-            """INSERT INTO strategy (team_id, event_code, match_number, match_description, phase, strokes, robots_data, updated_at)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """INSERT INTO strategy (team_id, event_code, match_number, match_description, phase, strokes, stroke_data, stroke_count, robots_data, updated_at)
+               VALUES (?, ?, ?, ?, ?, NULL, ?, ?, ?, ?)
                ON CONFLICT(team_id, event_code, match_description, phase)
-               DO UPDATE SET strokes=?, robots_data=?, updated_at=?""",
+               DO UPDATE SET strokes=NULL, stroke_data=?, stroke_count=?, robots_data=?, updated_at=?""",
             (
                 team_id,
                 event_code,
                 match_number,
                 match_description,
                 phase,
-                strokes_str,
+                stroke_data,
+                stroke_count,
                 robots_data,
                 updated_at,
-                strokes_str,
+                stroke_data,
+                stroke_count,
                 robots_data,
                 updated_at,
             ),
@@ -1356,26 +3233,20 @@ def _api_v1_strategy_post():
         cursor.close()
         db.close()
 
-        return {"status": "success", "updatedAt": updated_at}, 200
+        return {
+            "status": "success",
+            "updatedAt": updated_at,
+            "strokeCount": stroke_count,
+        }, 200
     except Exception as e:
         print(e)
         return {"status": "fuck", "error": "idk"}, 500
 
 
 @app.route("/api/v1/admin/self", methods=["GET"])
+@require_auth
 def _api_v1_admin_teams():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        team_id = payload.get("id")
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
+    team_id = g.token_payload.get("id")
 
     if team_id in ADMIN_TEAMS:
         return {"status": "success", "message": "you're chill"}, 200
@@ -1384,19 +3255,9 @@ def _api_v1_admin_teams():
 
 
 @app.route("/api/v1/admin/login", methods=["GET"])
+@require_auth
 def _api_v1_admin_login():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        team_id = payload.get("id")
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
+    team_id = g.token_payload.get("id")
 
     if team_id not in ADMIN_TEAMS:
         return {"status": "fuck", "error": "unauthorized"}, 403
@@ -1413,49 +3274,53 @@ def _api_v1_admin_login():
     if not totp.verify(otp, valid_window=1):
         return {"status": "fuck", "error": "unauthorized"}, 403
 
-    token = jwt.encode(
+    token = signing_keys.sign(
         {
             "id": team_id,
             "scope": ["user", "admin"],
             "exp": int((datetime.now() + timedelta(hours=24)).timestamp()),
-        },
-        RSA_PRIVATE_KEY,
-        algorithm="RS256",
+        }
     )
     return {"status": "success!", "token": token}, 200
 
 
 @app.route("/api/v1/admin/stats", methods=["GET"])
+@require_auth(admin=True)
 def _api_v1_admin_stats():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        if "admin" not in payload.get("scope", []):
-            return {"status": "fuck", "error": "unauthorized"}, 403
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
     try:
         db = get_db()
         cursor = db.cursor()
 
-        cursor.execute("SELECT COUNT(*) FROM users")
-        total_users = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM notes")
-        total_notes = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM notifications")
-        total_notifications = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM registrations WHERE status = 'pending'")
-        pending_registrations = cursor.fetchone()[0]
+        # kept by triggers (see add_stats_counters in migrations.py) instead of counting rows
+        cursor.execute("SELECT name, value, inserts, updates, deletes FROM stats_counters")
+        counts = {row[0]: row[1:] for row in cursor.fetchall()}
+
+        now = int(time.time())
+        tables = {}
+        for name, (value, inserts, updates, deletes) in counts.items():
+            tables[name] = {
+                "rows": value,
+                "inserts": inserts,
+                "updates": updates,
+                "deletes": deletes,
+            }
+            # rates against the newest snapshot at least an hour / a day old; None until one exists
+            for key, window in (("PerHour", 3600), ("PerDay", 86400)):
+                cursor.execute(
+                    """SELECT taken_at, value, writes FROM stats_snapshots
+                       WHERE name = ? AND taken_at <= ? ORDER BY taken_at DESC LIMIT 1""",
+                    (name, now - window),
+                )
+                snapshot = cursor.fetchone()
+                if snapshot is None:
+                    tables[name]["growth" + key] = None
+                    tables[name]["writes" + key] = None
+                    continue
+                scale = window / (now - snapshot[0])
+                tables[name]["growth" + key] = round((value - snapshot[1]) * scale, 1)
+                tables[name]["writes" + key] = round(
+                    (inserts + updates + deletes - snapshot[2]) * scale, 1
+                )
 
         cursor.execute(
             "SELECT page_count * page_size FROM pragma_page_count(), pragma_page_size()"
@@ -1465,14 +3330,40 @@ def _api_v1_admin_stats():
         cursor.close()
         db.close()
 
+        counters = read_metrics("db.")
+        checkouts = counters.get("db.checkouts", 0)
+        waits = counters.get("db.waits", 0)
+        queued = read_metrics("write_queue.")
+
         return {
             "status": "success",
             "stats": {
-                "totalUsers": total_users,
-                "totalNotes": total_notes,
-                "totalNotifications": total_notifications,
+                "totalUsers": counts["users"][0],
+                "totalNotes": counts["notes"][0],
+                "totalNotifications": counts["notifications"][0],
                 "databaseSize": db_size,
-                "pendingRegistrations": pending_registrations,
+                "pendingRegistrations": counts["pending_registrations"][0],
+                "tables": tables,
+                "connections": {
+                    "poolSize": DB_POOL_SIZE,
+                    "opened": counters.get("db.connections_opened", 0),
+                    "checkouts": checkouts,
+                    "waits": waits,
+                    "averageWaitMs": round(counters.get("db.wait_ms", 0) / waits, 1)
+                    if waits
+                    else 0,
+                    "poolExhausted": counters.get("db.pool_exhausted", 0),
+                    "lockedRetries": counters.get("db.locked_retries", 0),
+                    "lockedErrors": counters.get("db.locked_errors", 0),
+                    "commits": counters.get("db.commits", 0),
+                },
+                "writeQueue": {
+                    "enabled": WRITE_QUEUE_ENABLED,
+                    "writes": queued.get("write_queue.writes", 0),
+                    "coalesced": queued.get("write_queue.coalesced", 0),
+                    "batches": queued.get("write_queue.batches", 0),
+                    "rows": queued.get("write_queue.rows", 0),
+                },
             },
         }, 200
     except Exception as e:
@@ -1480,53 +3371,226 @@ def _api_v1_admin_stats():
         return {"status": "fuck", "error": "idk"}, 500
 
 
-@app.route("/api/v1/admin/users", methods=["GET"])
-def _api_v1_admin_users():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
+@app.route("/api/v1/admin/cache", methods=["GET"])
+@require_auth(admin=True)
+def _api_v1_admin_cache():
+    try:
+        counters = read_metrics("upstream_cache.")
+        hits = counters.get("upstream_cache.hit", 0)
+        misses = counters.get("upstream_cache.miss", 0)
+
+        cache_db = get_cache_db()
+        cursor = cache_db.cursor()
+        cursor.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM upstream_cache WHERE expires_at > ?",
+            (time.time(),),
+        )
+        entries, cached_bytes = cursor.fetchone()
+        cursor.execute("SELECT state, failures, opened_at FROM upstream_breaker WHERE id = 1")
+        breaker_state, breaker_failures, breaker_opened_at = cursor.fetchone()
+        cursor.execute("SELECT tokens, updated_at FROM upstream_budget WHERE id = 1")
+        budget_tokens, budget_updated_at = cursor.fetchone()
+        cursor.close()
+        cache_db.close()
+
+        auth_counters = read_metrics("auth_cache.")
+        auth_hits = auth_counters.get("auth_cache.hit", 0)
+        auth_misses = auth_counters.get("auth_cache.miss", 0)
+
+        budget_counters = read_metrics("upstream_budget.")
+        budget_classes = {}
+        for priority in UPSTREAM_PRIORITY_RESERVE:
+            waits = budget_counters.get(f"upstream_budget.waits.{priority}", 0)
+            wait_ms = budget_counters.get(f"upstream_budget.wait_ms.{priority}", 0)
+            budget_classes[priority] = {
+                "granted": budget_counters.get(f"upstream_budget.granted.{priority}", 0),
+                "queued": budget_counters.get(f"upstream_budget.queued.{priority}", 0),
+                "waits": waits,
+                "avgWaitMs": wait_ms / waits if waits else 0,
+                "deferred": budget_counters.get(f"upstream_budget.deferred.{priority}", 0),
+                "rejected": budget_counters.get(f"upstream_budget.rejected.{priority}", 0),
+            }
+
+        return {
+            "status": "success",
+            "cache": {
+                "hits": hits,
+                "misses": misses,
+                "hitRate": hits / (hits + misses) if hits + misses else 0,
+                "entries": entries,
+                "bytes": cached_bytes,
+                "ttls": UPSTREAM_CACHE_TTLS,
+                "staleServed": counters.get("upstream_cache.stale_served", 0),
+            },
+            "breaker": {
+                "state": breaker_state,
+                "failures": breaker_failures,
+                "openedAt": breaker_opened_at,
+            },
+            "budget": {
+                "tokens": min(
+                    UPSTREAM_BURST,
+                    budget_tokens + max(0, time.time() - budget_updated_at) * UPSTREAM_RATE,
+                ),
+                "ratePerSecond": UPSTREAM_RATE,
+                "burst": UPSTREAM_BURST,
+                "classes": budget_classes,
+            },
+            "auth": {
+                "hits": auth_hits,
+                "misses": auth_misses,
+                "hitRate": auth_hits / (auth_hits + auth_misses) if auth_hits + auth_misses else 0,
+                # entries are per worker; this is the one that answered
+                "entries": len(verified_tokens),
+                "capacity": AUTH_CACHE_SIZE,
+            },
+        }, 200
+    except Exception as e:
+        print(e)
+        return {"status": "fuck", "error": "idk"}, 500
+
 
-    token = auth_header.split(" ")[1]
+@app.route("/api/v1/admin/cache", methods=["DELETE"])
+@require_auth(admin=True)
+def _api_v1_admin_clear_cache():
     try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        if "admin" not in payload.get("scope", []):
-            return {"status": "fuck", "error": "unauthorized"}, 403
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
+        cache_db = get_cache_db()
+        cache_db.execute("DELETE FROM upstream_cache")
+        cache_db.commit()
+        cache_db.close()
+
+        return {"status": "success"}, 200
+    except Exception as e:
+        print(e)
+        return {"status": "fuck", "error": "idk"}, 500
+
+
+ADMIN_PAGE_SIZE = 100
+ADMIN_PAGE_MAX = 1000
+
+
+def int_filters(names: dict[str, str]) -> tuple[list[str], list]:
+    # query arguments that filter an admin list, as SQL conditions; raises ValueError for non-integers
+    conditions = []
+    parameters = []
+    for argument, column in names.items():
+        value = request.args.get(argument)
+        if value:
+            conditions.append(f"{column} = ?")
+            parameters.append(int(value))
+    return conditions, parameters
+
+
+def fetch_page(
+    select: str,
+    key_columns: list[str],
+    descending: bool,
+    conditions: list[str],
+    parameters: list,
+    after: tuple | None,
+    limit: int,
+) -> list[tuple]:
+    # keyset pagination: rows strictly past after in key order, so each page is an index range scan
+    if after is not None:
+        placeholders = ", ".join("?" for _ in after)
+        operator = "<" if descending else ">"
+        conditions = conditions + [f"({', '.join(key_columns)}) {operator} ({placeholders})"]
+        parameters = parameters + list(after)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    direction = "DESC" if descending else "ASC"
+    order = ", ".join(f"{column} {direction}" for column in key_columns)
 
+    db = get_db()
     try:
-        db = get_db()
         cursor = db.cursor()
-        cursor.execute("SELECT id FROM users ORDER BY id ASC")
+        cursor.execute(f"{select}{where} ORDER BY {order} LIMIT ?", parameters + [limit])
         rows = cursor.fetchall()
         cursor.close()
+        return rows
+    finally:
         db.close()
 
-        users = [{"id": row[0]} for row in rows]
-        return {"status": "success", "users": users}, 200
+
+def admin_list(
+    name: str,
+    select: str,
+    key_columns: list[str],
+    key_positions: list[int],
+    descending: bool,
+    conditions: list[str],
+    parameters: list,
+    serialize,
+):
+    # ?limit=&after= pages as JSON with a next cursor; ?format=ndjson streams every row after after,
+    # a page at a time, so neither holds the whole table or a connection while the client reads
+    try:
+        limit = min(ADMIN_PAGE_MAX, max(1, int(request.args.get("limit", ADMIN_PAGE_SIZE))))
+        after = request.args.get("after")
+        after = tuple(int(part) for part in after.split(",")) if after else None
+        if after is not None and len(after) != len(key_columns):
+            raise ValueError("wrong number of cursor parts")
+    except ValueError:
+        return {"status": "fuck", "error": "invalid limit or after"}, 400
+
+    key = lambda row: tuple(row[position] for position in key_positions)
+
+    if request.args.get("format") == "ndjson":
+
+        def generate():
+            page_after = after
+            while True:
+                rows = fetch_page(
+                    select, key_columns, descending, conditions, parameters, page_after, ADMIN_PAGE_MAX
+                )
+                for row in rows:
+                    yield json.dumps(serialize(row)) + "\n"
+                if len(rows) < ADMIN_PAGE_MAX:
+                    return
+                page_after = key(rows[-1])
+
+        return Response(generate(), mimetype="application/x-ndjson")
+
+    try:
+        # one extra row tells whether there is a next page
+        rows = fetch_page(select, key_columns, descending, conditions, parameters, after, limit + 1)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = ",".join(str(part) for part in key(rows[-1]))
+
+        return {
+            "status": "success",
+            name: [serialize(row) for row in rows],
+            "next": next_cursor,
+        }, 200
     except Exception as e:
         print(e)
         return {"status": "fuck", "error": "idk"}, 500
 
 
-@app.route("/api/v1/admin/users", methods=["POST"])
-def _api_v1_admin_create_user():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
+@app.route("/api/v1/admin/users", methods=["GET"])
+@require_auth(admin=True)
+def _api_v1_admin_users():
     try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        if "admin" not in payload.get("scope", []):
-            return {"status": "fuck", "error": "unauthorized"}, 403
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
+        conditions, parameters = int_filters({"team": "id"})
+    except ValueError:
+        return {"status": "fuck", "error": "team must be int"}, 400
+
+    return admin_list(
+        "users",
+        "SELECT id FROM users",
+        ["id"],
+        [0],
+        False,
+        conditions,
+        parameters,
+        lambda row: {"id": row[0]},
+    )
+
 
+@app.route("/api/v1/admin/users", methods=["POST"])
+@require_auth(admin=True)
+def _api_v1_admin_create_user():
     data = request.json
     team_id = data.get("id")
     password = data.get("password")
@@ -1540,7 +3604,7 @@ def _api_v1_admin_create_user():
         return {"status": "fuck", "error": "id must be int"}, 400
 
     try:
-        hash = ph.hash(password)
+        hash = hash_password(password)
         db = get_db()
         cursor = db.cursor()
 
@@ -1556,31 +3620,21 @@ def _api_v1_admin_create_user():
         db.close()
 
         return {"status": "success"}, 201
+    except PasswordHasherBusy:
+        return {"status": "fuck", "error": "server busy"}, 503
     except Exception as e:
         print(e)
         return {"status": "fuck", "error": "idk"}, 500
 
 
 @app.route("/api/v1/admin/users/<int:user_id>", methods=["DELETE"])
+@require_auth(admin=True)
 def _api_v1_admin_delete_user(user_id):
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        if "admin" not in payload.get("scope", []):
-            return {"status": "fuck", "error": "unauthorized"}, 403
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
     try:
         db = get_db()
         cursor = db.cursor()
         cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
+        revoke_refresh_tokens(cursor, user_id)
         db.commit()
         cursor.close()
         db.close()
@@ -1592,21 +3646,8 @@ def _api_v1_admin_delete_user(user_id):
 
 
 @app.route("/api/v1/admin/users/<int:user_id>/password", methods=["PUT"])
+@require_auth(admin=True)
 def _api_v1_admin_reset_password(user_id):
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        if "admin" not in payload.get("scope", []):
-            return {"status": "fuck", "error": "unauthorized"}, 403
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
     data = request.json
     password = data.get("password")
 
@@ -1614,83 +3655,58 @@ def _api_v1_admin_reset_password(user_id):
         return {"status": "fuck", "error": "missing password"}, 400
 
     try:
-        hash = ph.hash(password)
+        hash = hash_password(password)
         db = get_db()
         cursor = db.cursor()
         cursor.execute("UPDATE users SET password = ? WHERE id = ?", (hash, user_id))
+        revoke_refresh_tokens(cursor, user_id)
         db.commit()
         cursor.close()
         db.close()
 
         return {"status": "success"}, 200
+    except PasswordHasherBusy:
+        return {"status": "fuck", "error": "server busy"}, 503
     except Exception as e:
         print(e)
         return {"status": "fuck", "error": "idk"}, 500
 
 
 @app.route("/api/v1/admin/notes", methods=["GET"])
+@require_auth(admin=True)
 def _api_v1_admin_notes():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        if "admin" not in payload.get("scope", []):
-            return {"status": "fuck", "error": "unauthorized"}, 403
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
+    # newest first; after is "updated_at,id" of the last note on the previous page
     try:
-        db = get_db()
-        cursor = db.cursor()
-        cursor.execute("""
-            SELECT id, team_id, subject_team_id, auto_performance, teleop_performance, general_notes, updated_at 
-            FROM notes 
-            ORDER BY updated_at DESC
-        """)
-        rows = cursor.fetchall()
-        cursor.close()
-        db.close()
-
-        notes = [
-            {
-                "id": row[0],
-                "teamId": row[1],
-                "subjectTeamId": row[2],
-                "autoPerformance": row[3] or "",
-                "teleopPerformance": row[4] or "",
-                "generalNotes": row[5] or "",
-                "updatedAt": row[6],
-            }
-            for row in rows
-        ]
-
-        return {"status": "success", "notes": notes}, 200
-    except Exception as e:
-        print(e)
-        return {"status": "fuck", "error": "idk"}, 500
+        conditions, parameters = int_filters(
+            {"team": "team_id", "subjectTeam": "subject_team_id"}
+        )
+    except ValueError:
+        return {"status": "fuck", "error": "team and subjectTeam must be int"}, 400
+
+    return admin_list(
+        "notes",
+        """SELECT id, team_id, subject_team_id, auto_performance, teleop_performance, general_notes, updated_at
+           FROM notes""",
+        ["updated_at", "id"],
+        [6, 0],
+        True,
+        conditions,
+        parameters,
+        lambda row: {
+            "id": row[0],
+            "teamId": row[1],
+            "subjectTeamId": row[2],
+            "autoPerformance": row[3] or "",
+            "teleopPerformance": row[4] or "",
+            "generalNotes": row[5] or "",
+            "updatedAt": row[6],
+        },
+    )
 
 
 @app.route("/api/v1/admin/notes/<int:note_id>", methods=["DELETE"])
+@require_auth(admin=True)
 def _api_v1_admin_delete_note(note_id):
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        if "admin" not in payload.get("scope", []):
-            return {"status": "fuck", "error": "unauthorized"}, 403
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
     try:
         db = get_db()
         cursor = db.cursor()
@@ -1706,21 +3722,8 @@ def _api_v1_admin_delete_note(note_id):
 
 
 @app.route("/api/v1/admin/notifications", methods=["GET"])
+@require_auth(admin=True)
 def _api_v1_admin_notifications():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        if "admin" not in payload.get("scope", []):
-            return {"status": "fuck", "error": "unauthorized"}, 403
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
     try:
         db = get_db()
         cursor = db.cursor()
@@ -1752,70 +3755,44 @@ def _api_v1_admin_notifications():
 
 
 @app.route("/api/v1/admin/registrations", methods=["GET"])
+@require_auth(admin=True)
 def _api_v1_admin_registrations():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        if "admin" not in payload.get("scope", []):
-            return {"status": "fuck", "error": "unauthorized"}, 403
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
+    # newest first; after is "submitted_at,id" of the last registration on the previous page
     try:
-        db = get_db()
-        cursor = db.cursor()
-        cursor.execute(
-            """SELECT id, team_number, email, image_link, status, submitted_at, reviewed_at
-               FROM registrations
-               ORDER BY submitted_at DESC"""
-        )
-        rows = cursor.fetchall()
-        cursor.close()
-        db.close()
-
-        registrations = [
-            {
-                "id": row[0],
-                "teamNumber": row[1],
-                "email": row[2],
-                "imageLink": row[3],
-                "status": row[4],
-                "submittedAt": row[5],
-                "reviewedAt": row[6],
-            }
-            for row in rows
-        ]
-
-        return {"status": "success", "registrations": registrations}, 200
-    except Exception as e:
-        print(e)
-        return {"status": "fuck", "error": "idk"}, 500
+        conditions, parameters = int_filters({"team": "team_number"})
+    except ValueError:
+        return {"status": "fuck", "error": "team must be int"}, 400
+    status = request.args.get("status")
+    if status:
+        conditions.append("status = ?")
+        parameters.append(status)
+
+    return admin_list(
+        "registrations",
+        """SELECT id, team_number, email, image_link, status, submitted_at, reviewed_at
+           FROM registrations""",
+        ["submitted_at", "id"],
+        [5, 0],
+        True,
+        conditions,
+        parameters,
+        lambda row: {
+            "id": row[0],
+            "teamNumber": row[1],
+            "email": row[2],
+            "imageLink": row[3],
+            "status": row[4],
+            "submittedAt": row[5],
+            "reviewedAt": row[6],
+        },
+    )
 
 
 @app.route(
     "/api/v1/admin/registrations/<int:registration_id>/approve", methods=["POST"]
 )
+@require_auth(admin=True)
 def _api_v1_admin_approve_registration(registration_id):
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        if "admin" not in payload.get("scope", []):
-            return {"status": "fuck", "error": "unauthorized"}, 403
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
     reviewed_at = int(datetime.now().timestamp())
 
     try:
@@ -1843,17 +3820,33 @@ def _api_v1_admin_approve_registration(registration_id):
             cursor.close()
             db.close()
             return {"status": "fuck", "error": "team already registered"}, 409
+        cursor.close()
+        db.close()
 
+        # hashing waits on the password pool, so it runs without a pooled connection checked out
         password = secrets.token_urlsafe(9)
-        hash = ph.hash(password)
+        hash = hash_password(password)
 
+        db = get_db()
+        cursor = db.cursor()
+        # another admin may have reviewed it while the password was hashed
         cursor.execute(
-            "INSERT INTO users (id, password) VALUES (?, ?)", (team_number, hash)
-        )
-        cursor.execute(
-            """UPDATE registrations SET status = 'approved', reviewed_at = ? WHERE id = ?""",
+            """UPDATE registrations SET status = 'approved', reviewed_at = ?
+               WHERE id = ? AND status = 'pending'""",
             (reviewed_at, registration_id),
         )
+        if cursor.rowcount == 0:
+            cursor.close()
+            db.close()
+            return {"status": "fuck", "error": "already reviewed"}, 409
+        try:
+            cursor.execute(
+                "INSERT INTO users (id, password) VALUES (?, ?)", (team_number, hash)
+            )
+        except sqlite3.IntegrityError:
+            cursor.close()
+            db.close()
+            return {"status": "fuck", "error": "team already registered"}, 409
         db.commit()
         cursor.close()
         db.close()
@@ -1862,27 +3855,16 @@ def _api_v1_admin_approve_registration(registration_id):
             "teamNumber": team_number,
             "password": password,
         }, 200
+    except PasswordHasherBusy:
+        return {"status": "fuck", "error": "server busy"}, 503
     except Exception as e:
         print(e)
         return {"status": "fuck", "error": "idk"}, 500
 
 
 @app.route("/api/v1/admin/registrations/<int:registration_id>/deny", methods=["POST"])
+@require_auth(admin=True)
 def _api_v1_admin_deny_registration(registration_id):
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        if "admin" not in payload.get("scope", []):
-            return {"status": "fuck", "error": "unauthorized"}, 403
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
     reviewed_at = int(datetime.now().timestamp())
 
     try:
@@ -1915,21 +3897,8 @@ def _api_v1_admin_deny_registration(registration_id):
 
 
 @app.route("/api/v1/admin/notifications", methods=["POST"])
+@require_auth(admin=True)
 def _api_v1_admin_send_notification():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        if "admin" not in payload.get("scope", []):
-            return {"status": "fuck", "error": "unauthorized"}, 403
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
     data = request.json
     team_id = data.get("teamId")
     title = data.get("title")
@@ -1954,21 +3923,8 @@ def _api_v1_admin_send_notification():
 
 
 @app.route("/api/v1/admin/notifications/clear", methods=["DELETE"])
+@require_auth(admin=True)
 def _api_v1_admin_clear_notifications():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
-
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        if "admin" not in payload.get("scope", []):
-            return {"status": "fuck", "error": "unauthorized"}, 403
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
-
     try:
         db = get_db()
         cursor = db.cursor()
@@ -1984,30 +3940,116 @@ def _api_v1_admin_clear_notifications():
 
 
 @app.route("/api/v1/admin/database/vacuum", methods=["POST"])
+@require_auth(admin=True)
 def _api_v1_admin_vacuum():
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return {"status": "fuck", "error": "no auth"}, 401
+    # one maintenance pass now; a full VACUUM would lock out every save while it rewrote the file
+    try:
+        owner = secrets.token_hex(8)
+        if not acquire_maintenance_lease(owner):
+            return {"status": "fuck", "error": "maintenance running"}, 409
+        try:
+            return {"status": "success", "maintenance": run_maintenance(owner)}, 200
+        finally:
+            release_maintenance_lease(owner)
+    except Exception as e:
+        print(e)
+        return {"status": "fuck", "error": "idk"}, 500
 
-    token = auth_header.split(" ")[1]
+
+@app.route("/api/v1/admin/database/backup", methods=["POST"])
+@require_auth(admin=True)
+def _api_v1_admin_backup():
     try:
-        payload = jwt.decode(token, RSA_PUBLIC_KEY, algorithms=["RS256"])
-        if "admin" not in payload.get("scope", []):
-            return {"status": "fuck", "error": "unauthorized"}, 403
-    except jwt.ExpiredSignatureError:
-        return {"status": "fuck", "error": "token expired"}, 401
-    except jwt.InvalidTokenError:
-        return {"status": "fuck", "error": "invalid token"}, 401
+        backup_id = claim_backup(0)
+        if backup_id is None:
+            return {"status": "fuck", "error": "backup running"}, 409
+
+        # a large database takes minutes to copy at the configured pace
+        threading.Thread(target=run_backup, args=(backup_id,), daemon=True).start()
+        return {"status": "success", "backup": {"id": backup_id}}, 202
+    except Exception as e:
+        print(e)
+        return {"status": "fuck", "error": "idk"}, 500
+
+
+@app.route("/api/v1/admin/database/backups", methods=["GET"])
+@require_auth(admin=True)
+def _api_v1_admin_backups():
+    try:
+        cache_db = get_cache_db()
+        cursor = cache_db.cursor()
+        cursor.execute(
+            """SELECT id, started_at, finished_at, path, pages, bytes, error
+               FROM backups ORDER BY id DESC LIMIT 20"""
+        )
+        rows = cursor.fetchall()
+        cursor.close()
+        cache_db.close()
+
+        backups = [
+            {
+                "id": row[0],
+                "startedAt": row[1],
+                "finishedAt": row[2],
+                "path": row[3],
+                "pages": row[4],
+                "bytes": row[5],
+                "error": row[6],
+            }
+            for row in rows
+        ]
+
+        return {"status": "success", "backups": backups}, 200
+    except Exception as e:
+        print(e)
+        return {"status": "fuck", "error": "idk"}, 500
+
 
+@app.route("/api/v1/admin/database/maintenance", methods=["GET"])
+@require_auth(admin=True)
+def _api_v1_admin_maintenance():
     try:
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("VACUUM")
-        db.commit()
+        cursor.execute("PRAGMA auto_vacuum")
+        auto_vacuum = cursor.fetchone()[0]
+        cursor.execute("PRAGMA freelist_count")
+        free_pages = cursor.fetchone()[0]
         cursor.close()
         db.close()
 
-        return {"status": "success"}, 200
+        cache_db = get_cache_db()
+        cursor = cache_db.cursor()
+        cursor.execute(
+            """SELECT started_at, finished_at, deleted, freed_pages, bytes_reclaimed
+               FROM maintenance_runs ORDER BY id DESC LIMIT 20"""
+        )
+        rows = cursor.fetchall()
+        cursor.close()
+        cache_db.close()
+
+        runs = [
+            {
+                "startedAt": row[0],
+                "finishedAt": row[1],
+                "deleted": json.loads(row[2]) if row[2] else {},
+                "freedPages": row[3],
+                "bytesReclaimed": row[4],
+            }
+            for row in rows
+        ]
+
+        return {
+            "status": "success",
+            "maintenance": {
+                "autoVacuum": {0: "none", 1: "full", 2: "incremental"}.get(auto_vacuum),
+                "freePages": free_pages,
+                "interval": MAINTENANCE_INTERVAL,
+                "vacuumPages": MAINTENANCE_VACUUM_PAGES,
+                "retentionDays": RETENTION_DAYS,
+                "runs": runs,
+            },
+        }, 200
     except Exception as e:
         print(e)
         return {"status": "fuck", "error": "idk"}, 500
@@ -0,0 +1,542 @@
+"""
+Schema migrations for data/default.db and the cache database, tracked with
+PRAGMA user_version. gunicorn.conf.py runs them once in the master before the
+workers fork; main.py calls migrate_databases() again on import, which is only
+a version check unless it is run without gunicorn.
+
+To change the schema, append a function to DEFAULT_DB_MIGRATIONS (or
+CACHE_DB_MIGRATIONS). It runs once, in its own transaction, and must not
+rewrite an earlier migration.
+"""
+
+import fcntl
+import sqlite3
+import time
+import tomllib
+
+DEFAULT_DB_PATH = "data/default.db"
+
+
+def create_default_schema(cursor: sqlite3.Cursor):
+    # everything before versioned migrations; idempotent so it can bring any older database up to date
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, password TEXT)"
+    )
+
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS registrations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            team_number INTEGER NOT NULL,
+            email TEXT NOT NULL,
+            image_link TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            submitted_at INTEGER NOT NULL,
+            reviewed_at INTEGER
+        )"""
+    )
+
+    cursor.execute("""CREATE TABLE IF NOT EXISTS refresh_tokens (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        team_id INTEGER NOT NULL,
+        token_hash TEXT NOT NULL UNIQUE,
+        created_at INTEGER NOT NULL,
+        expires_at INTEGER NOT NULL,
+        revoked_at INTEGER
+    )""")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_refresh_tokens_team_id ON refresh_tokens(team_id)"
+    )
+    cursor.execute("""CREATE TABLE IF NOT EXISTS notes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        team_id INTEGER NOT NULL,
+        subject_team_id INTEGER NOT NULL,
+        auto_performance TEXT,
+        teleop_performance TEXT,
+        general_notes TEXT,
+        updated_at INTEGER NOT NULL,
+        UNIQUE(team_id, subject_team_id)
+    )""")
+    cursor.execute("""CREATE TABLE IF NOT EXISTS notifications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        team_id INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        message TEXT NOT NULL,
+        sent_at INTEGER NOT NULL,
+        UNIQUE(team_id, title, message)
+    )""")
+    cursor.execute("""CREATE TABLE IF NOT EXISTS strategy (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        team_id INTEGER NOT NULL,
+        event_code TEXT NOT NULL,
+        match_number INTEGER NOT NULL,
+        match_description TEXT NOT NULL,
+        phase TEXT NOT NULL,
+        strokes TEXT,
+        robots_data TEXT,
+        updated_at INTEGER NOT NULL,
+        UNIQUE(team_id, event_code, match_description, phase)
+    )""")
+    # Migration: add match_description column if it doesn't exist
+    cursor.execute("PRAGMA table_info(strategy)")
+    columns = [col[1] for col in cursor.fetchall()]
+    if "match_description" not in columns:
+        print("Migrating strategy table: adding match_description column")
+        cursor.execute("ALTER TABLE strategy ADD COLUMN match_description TEXT DEFAULT ''")
+        cursor.execute(
+            "UPDATE strategy SET match_description = 'Match ' || match_number WHERE match_description = ''"
+        )
+
+    # Migration: fix UNIQUE constraint to include match_description
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='strategy'")
+    strategy_sql = cursor.fetchone()
+    if (
+        strategy_sql
+        and "UNIQUE(team_id, event_code, match_description, phase)" not in strategy_sql[0]
+    ):
+        print("Migrating strategy table: fixing UNIQUE constraint")
+        cursor.execute("ALTER TABLE strategy RENAME TO strategy_old")
+        cursor.execute("""CREATE TABLE strategy (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            team_id INTEGER NOT NULL,
+            event_code TEXT NOT NULL,
+            match_number INTEGER NOT NULL,
+            match_description TEXT NOT NULL,
+            phase TEXT NOT NULL,
+            drawing_data TEXT,
+            robots_data TEXT,
+            updated_at INTEGER NOT NULL,
+            UNIQUE(team_id, event_code, match_description, phase)
+        )""")
+        cursor.execute("""INSERT INTO strategy (id, team_id, event_code, match_number, match_description, phase, drawing_data, robots_data, updated_at)
+            SELECT id, team_id, event_code, match_number, COALESCE(match_description, 'Match ' || match_number), phase, drawing_data, robots_data, updated_at
+            FROM strategy_old""")
+        cursor.execute("DROP TABLE strategy_old")
+
+    # Migration: add strokes column if it doesn't exist
+    cursor.execute("PRAGMA table_info(strategy)")
+    strategy_columns = [col[1] for col in cursor.fetchall()]
+    if "strokes" not in strategy_columns:
+        print("Migrating strategy table: adding strokes column")
+        cursor.execute("ALTER TABLE strategy ADD COLUMN strokes TEXT")
+
+    # Migration: convert schedule_offsets to event-scoped keys
+    cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schedule_offsets'"
+    )
+    schedule_offsets_exists = cursor.fetchone() is not None
+
+    if not schedule_offsets_exists:
+        cursor.execute("""CREATE TABLE schedule_offsets (
+            team_id INTEGER NOT NULL,
+            event_code TEXT NOT NULL,
+            time_offset_minutes INTEGER NOT NULL DEFAULT 0,
+            updated_at INTEGER NOT NULL,
+            PRIMARY KEY(team_id, event_code)
+        )""")
+        return
+
+    cursor.execute("PRAGMA table_info(schedule_offsets)")
+    team_schedule_columns = cursor.fetchall()
+    team_schedule_column_names = [col[1] for col in team_schedule_columns]
+    team_id_pk_position = next(
+        (col[5] for col in team_schedule_columns if col[1] == "team_id"), 0
+    )
+    event_code_pk_position = next(
+        (col[5] for col in team_schedule_columns if col[1] == "event_code"), 0
+    )
+    has_event_scoped_pk = team_id_pk_position == 1 and event_code_pk_position == 2
+
+    if "event_code" not in team_schedule_column_names or not has_event_scoped_pk:
+        print("Migrating schedule_offsets table to event-scoped offsets")
+        cursor.execute("ALTER TABLE schedule_offsets RENAME TO schedule_offsets_legacy")
+        cursor.execute("""CREATE TABLE schedule_offsets (
+            team_id INTEGER NOT NULL,
+            event_code TEXT NOT NULL,
+            time_offset_minutes INTEGER NOT NULL DEFAULT 0,
+            updated_at INTEGER NOT NULL,
+            PRIMARY KEY(team_id, event_code)
+        )""")
+
+        cursor.execute("PRAGMA table_info(schedule_offsets_legacy)")
+        legacy_columns = [col[1] for col in cursor.fetchall()]
+        if "event_code" in legacy_columns:
+            cursor.execute(
+                """INSERT OR REPLACE INTO schedule_offsets (team_id, event_code, time_offset_minutes, updated_at)
+                   SELECT team_id,
+                          COALESCE(NULLIF(UPPER(TRIM(event_code)), ''), '__LEGACY__'),
+                          time_offset_minutes,
+                          updated_at
+                   FROM schedule_offsets_legacy"""
+            )
+        else:
+            cursor.execute(
+                """INSERT OR REPLACE INTO schedule_offsets (team_id, event_code, time_offset_minutes, updated_at)
+                   SELECT team_id,
+                          '__LEGACY__',
+                          time_offset_minutes,
+                          updated_at
+                   FROM schedule_offsets_legacy"""
+            )
+        cursor.execute("DROP TABLE schedule_offsets_legacy")
+
+
+def create_cache_schema(cursor: sqlite3.Cursor):
+    cursor.execute("""CREATE TABLE IF NOT EXISTS upstream_cache (
+        url TEXT PRIMARY KEY,
+        status_code INTEGER NOT NULL,
+        body BLOB NOT NULL,
+        fetched_at REAL NOT NULL,
+        expires_at REAL NOT NULL,
+        last_modified TEXT,
+        etag TEXT
+    )""")
+    # Migration: add revalidation columns if they don't exist
+    cursor.execute("PRAGMA table_info(upstream_cache)")
+    upstream_cache_columns = [col[1] for col in cursor.fetchall()]
+    if "last_modified" not in upstream_cache_columns:
+        cursor.execute("ALTER TABLE upstream_cache ADD COLUMN last_modified TEXT")
+    if "etag" not in upstream_cache_columns:
+        cursor.execute("ALTER TABLE upstream_cache ADD COLUMN etag TEXT")
+    cursor.execute("""CREATE TABLE IF NOT EXISTS upstream_leases (
+        url TEXT PRIMARY KEY,
+        owner TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    )""")
+    cursor.execute("""CREATE TABLE IF NOT EXISTS upstream_breaker (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        state TEXT NOT NULL,
+        failures INTEGER NOT NULL,
+        opened_at REAL NOT NULL
+    )""")
+    cursor.execute(
+        "INSERT OR IGNORE INTO upstream_breaker (id, state, failures, opened_at) VALUES (1, 'closed', 0, 0)"
+    )
+    # an updated_at of 0 makes the first request refill the bucket to its burst size
+    cursor.execute("""CREATE TABLE IF NOT EXISTS upstream_budget (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        tokens REAL NOT NULL,
+        updated_at REAL NOT NULL
+    )""")
+    cursor.execute(
+        "INSERT OR IGNORE INTO upstream_budget (id, tokens, updated_at) VALUES (1, 0, 0)"
+    )
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS metrics (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+    )
+
+
+def add_maintenance_runs(cursor: sqlite3.Cursor):
+    # one row per database maintenance pass (run_maintenance in main.py); deleted is a JSON
+    # object of rows pruned per retention rule
+    cursor.execute("""CREATE TABLE IF NOT EXISTS maintenance_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        started_at REAL NOT NULL,
+        finished_at REAL,
+        deleted TEXT,
+        freed_pages INTEGER,
+        bytes_reclaimed INTEGER
+    )""")
+
+
+def add_backups(cursor: sqlite3.Cursor):
+    # one row per snapshot of default.db (run_backup in main.py); finished_at is NULL while it runs
+    cursor.execute("""CREATE TABLE IF NOT EXISTS backups (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        started_at REAL NOT NULL,
+        finished_at REAL,
+        path TEXT,
+        pages INTEGER,
+        bytes INTEGER,
+        error TEXT
+    )""")
+
+
+def has_column(cursor: sqlite3.Cursor, table: str, column: str) -> bool:
+    # lets a migration that adds columns rerun on a database whose user_version was reset
+    return any(row[1] == column for row in cursor.execute(f"PRAGMA table_info({table})"))
+
+
+def add_strategy_stroke_data(cursor: sqlite3.Cursor):
+    # compact stroke encoding (see encode_strokes in main.py); the JSON in strokes is
+    # converted the next time its board is saved
+    if not has_column(cursor, "strategy", "stroke_data"):
+        cursor.execute("ALTER TABLE strategy ADD COLUMN stroke_data BLOB")
+    if not has_column(cursor, "strategy", "stroke_count"):
+        cursor.execute(
+            "ALTER TABLE strategy ADD COLUMN stroke_count INTEGER NOT NULL DEFAULT 0"
+        )
+    cursor.execute(
+        """UPDATE strategy SET stroke_count = json_array_length(strokes)
+           WHERE strokes IS NOT NULL AND json_valid(strokes)"""
+    )
+
+
+def add_strategy_event_index(cursor: sqlite3.Cursor):
+    # GET /api/v1/strategy/event/<code>?updatedSince=
+    cursor.execute(
+        """CREATE INDEX IF NOT EXISTS idx_strategy_team_event_updated
+           ON strategy(team_id, event_code, updated_at)"""
+    )
+
+
+def add_notes_search(cursor: sqlite3.Cursor):
+    # GET /api/v1/notes/search; team_id is indexed too so a search is one FTS5 query
+    # (team_id:N AND ...) instead of ranking every team's matches and filtering after
+    cursor.execute(
+        """CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+            team_id, auto_performance, teleop_performance, general_notes,
+            content='notes', content_rowid='id',
+            tokenize='porter unicode61 remove_diacritics 2'
+        )"""
+    )
+    cursor.execute(
+        """CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+            INSERT INTO notes_fts (rowid, team_id, auto_performance, teleop_performance, general_notes)
+            VALUES (new.id, new.team_id, new.auto_performance, new.teleop_performance, new.general_notes);
+        END"""
+    )
+    cursor.execute(
+        """CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN
+            INSERT INTO notes_fts (notes_fts, rowid, team_id, auto_performance, teleop_performance, general_notes)
+            VALUES ('delete', old.id, old.team_id, old.auto_performance, old.teleop_performance, old.general_notes);
+        END"""
+    )
+    cursor.execute(
+        """CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE ON notes BEGIN
+            INSERT INTO notes_fts (notes_fts, rowid, team_id, auto_performance, teleop_performance, general_notes)
+            VALUES ('delete', old.id, old.team_id, old.auto_performance, old.teleop_performance, old.general_notes);
+            INSERT INTO notes_fts (rowid, team_id, auto_performance, teleop_performance, general_notes)
+            VALUES (new.id, new.team_id, new.auto_performance, new.teleop_performance, new.general_notes);
+        END"""
+    )
+    cursor.execute("INSERT INTO notes_fts (notes_fts) VALUES ('rebuild')")
+
+
+STATS_TABLES = ["users", "notes", "notifications", "registrations", "strategy"]
+
+
+def add_stats_counters(cursor: sqlite3.Cursor):
+    # row counts for the admin dashboard kept by triggers, so reading them never scans a table;
+    # pending_registrations counts registrations whose status is 'pending'
+    cursor.execute("""CREATE TABLE IF NOT EXISTS stats_counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL,
+        inserts INTEGER NOT NULL DEFAULT 0,
+        updates INTEGER NOT NULL DEFAULT 0,
+        deletes INTEGER NOT NULL DEFAULT 0
+    )""")
+    # copies of stats_counters taken by each maintenance pass, for growth and write rates
+    cursor.execute("""CREATE TABLE IF NOT EXISTS stats_snapshots (
+        name TEXT NOT NULL,
+        taken_at INTEGER NOT NULL,
+        value INTEGER NOT NULL,
+        writes INTEGER NOT NULL,
+        PRIMARY KEY(name, taken_at)
+    )""")
+
+    for table in STATS_TABLES:
+        cursor.execute(
+            f"INSERT OR REPLACE INTO stats_counters (name, value) SELECT '{table}', COUNT(*) FROM {table}"
+        )
+        cursor.execute(
+            f"""CREATE TRIGGER IF NOT EXISTS stats_{table}_insert AFTER INSERT ON {table} BEGIN
+                UPDATE stats_counters SET value = value + 1, inserts = inserts + 1 WHERE name = '{table}';
+            END"""
+        )
+        cursor.execute(
+            f"""CREATE TRIGGER IF NOT EXISTS stats_{table}_update AFTER UPDATE ON {table} BEGIN
+                UPDATE stats_counters SET updates = updates + 1 WHERE name = '{table}';
+            END"""
+        )
+        cursor.execute(
+            f"""CREATE TRIGGER IF NOT EXISTS stats_{table}_delete AFTER DELETE ON {table} BEGIN
+                UPDATE stats_counters SET value = value - 1, deletes = deletes + 1 WHERE name = '{table}';
+            END"""
+        )
+
+    cursor.execute(
+        """INSERT OR REPLACE INTO stats_counters (name, value)
+           SELECT 'pending_registrations', COUNT(*) FROM registrations WHERE status = 'pending'"""
+    )
+    cursor.execute(
+        """CREATE TRIGGER IF NOT EXISTS stats_pending_registrations_insert AFTER INSERT ON registrations BEGIN
+            UPDATE stats_counters SET value = value + (new.status = 'pending') WHERE name = 'pending_registrations';
+        END"""
+    )
+    cursor.execute(
+        """CREATE TRIGGER IF NOT EXISTS stats_pending_registrations_update AFTER UPDATE OF status ON registrations BEGIN
+            UPDATE stats_counters SET value = value + (new.status = 'pending') - (old.status = 'pending')
+            WHERE name = 'pending_registrations';
+        END"""
+    )
+    cursor.execute(
+        """CREATE TRIGGER IF NOT EXISTS stats_pending_registrations_delete AFTER DELETE ON registrations BEGIN
+            UPDATE stats_counters SET value = value - (old.status = 'pending') WHERE name = 'pending_registrations';
+        END"""
+    )
+
+
+def add_admin_list_indexes(cursor: sqlite3.Cursor):
+    # keyset pages of the admin lists (fetch_page in main.py), unfiltered and with each filter;
+    # the rowid at the end of every index orders ties by id
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_notes_updated ON notes(updated_at)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_notes_team_updated ON notes(team_id, updated_at)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_notes_subject_updated ON notes(subject_team_id, updated_at)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_registrations_submitted ON registrations(submitted_at)"
+    )
+    cursor.execute(
+        """CREATE INDEX IF NOT EXISTS idx_registrations_status_submitted
+           ON registrations(status, submitted_at)"""
+    )
+    cursor.execute(
+        """CREATE INDEX IF NOT EXISTS idx_registrations_team_submitted
+           ON registrations(team_number, submitted_at)"""
+    )
+
+
+def add_notifications_sent_index(cursor: sqlite3.Cursor):
+    # GET /api/v1/admin/notifications lists the newest 100, and the notifications retention rule
+    # deletes by age; both scanned the table
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_notifications_sent ON notifications(sent_at)"
+    )
+
+
+def add_refresh_token_rotation(cursor: sqlite3.Cursor):
+    # /api/v1/token/refresh replaces the token it is given (rotated = 1) with one in the same
+    # family; a replaced token coming back revokes the family. The expiry and revocation
+    # indexes serve the refresh_tokens retention rule in main.py
+    if not has_column(cursor, "refresh_tokens", "family_id"):
+        cursor.execute("ALTER TABLE refresh_tokens ADD COLUMN family_id INTEGER")
+    if not has_column(cursor, "refresh_tokens", "rotated"):
+        cursor.execute(
+            "ALTER TABLE refresh_tokens ADD COLUMN rotated INTEGER NOT NULL DEFAULT 0"
+        )
+    cursor.execute("UPDATE refresh_tokens SET family_id = id WHERE family_id IS NULL")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_refresh_tokens_family ON refresh_tokens(family_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_refresh_tokens_expires ON refresh_tokens(expires_at)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_refresh_tokens_revoked ON refresh_tokens(revoked_at)"
+    )
+
+
+def add_maintenance_lease(cursor: sqlite3.Cursor):
+    # the worker running a maintenance pass (maintenance_loop or the vacuum endpoint in main.py);
+    # owner is NULL when none is
+    cursor.execute("""CREATE TABLE IF NOT EXISTS maintenance_lease (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        owner TEXT,
+        expires_at REAL NOT NULL
+    )""")
+    cursor.execute("INSERT OR IGNORE INTO maintenance_lease (id, owner, expires_at) VALUES (1, NULL, 0)")
+
+
+# position in the list is the user_version a database has once the migration ran
+DEFAULT_DB_MIGRATIONS = [
+    create_default_schema,
+    add_strategy_stroke_data,
+    add_strategy_event_index,
+    add_notes_search,
+    add_stats_counters,
+    add_admin_list_indexes,
+    add_notifications_sent_index,
+    add_refresh_token_rotation,
+]
+CACHE_DB_MIGRATIONS = [
+    create_cache_schema,
+    add_maintenance_runs,
+    add_backups,
+    add_maintenance_lease,
+]
+
+
+def schema_version(path: str) -> int:
+    db = sqlite3.connect(path)
+    version = db.execute("PRAGMA user_version").fetchone()[0]
+    db.close()
+    return version
+
+
+def migrate(path: str, migrations: list) -> int:
+    # returns how many migrations ran; 0 is the common case of an up-to-date database
+    if schema_version(path) >= len(migrations):
+        return 0
+
+    # the file lock keeps a second process from starting the same migrations;
+    # BEGIN IMMEDIATE below would only make it wait and fail on busy_timeout
+    with open(path + ".migrate.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        db = sqlite3.connect(path, isolation_level=None, timeout=30)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            version = db.execute("PRAGMA user_version").fetchone()[0]
+            for number, migration in enumerate(migrations[version:], version + 1):
+                started = time.perf_counter()
+                cursor = db.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                try:
+                    migration(cursor)
+                    cursor.execute(f"PRAGMA user_version = {number}")
+                    cursor.execute("COMMIT")
+                except BaseException:
+                    cursor.execute("ROLLBACK")
+                    raise
+                cursor.close()
+                print(
+                    f"Migrated {path} to version {number} ({migration.__name__}, "
+                    f"{(time.perf_counter() - started) * 1000:.0f} ms)"
+                )
+            return len(migrations) - version
+        finally:
+            db.close()
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def enable_incremental_vacuum(path: str) -> bool:
+    # auto_vacuum can only change with a full VACUUM, so an existing database is rewritten
+    # once here, before the workers start, instead of ever again while serving requests
+    db = sqlite3.connect(path, isolation_level=None, timeout=30)
+    try:
+        if db.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return False
+        with open(path + ".migrate.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if db.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                    return False
+                started = time.perf_counter()
+                db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                db.execute("VACUUM")
+                print(
+                    f"Enabled incremental vacuum on {path} "
+                    f"({(time.perf_counter() - started) * 1000:.0f} ms)"
+                )
+                return True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    finally:
+        db.close()
+
+
+def migrate_databases(db_path: str = DEFAULT_DB_PATH, cache_db_path: str | None = None):
+    if cache_db_path is None:
+        with open("data/settings.toml", "rb") as f:
+            settings = tomllib.load(f)
+        cache_db_path = settings.get("cache", {}).get("path", "data/cache.db")
+
+    migrate(db_path, DEFAULT_DB_MIGRATIONS)
+    enable_incremental_vacuum(db_path)
+    migrate(cache_db_path, CACHE_DB_MIGRATIONS)
+
+
+if __name__ == "__main__":
+    migrate_databases()
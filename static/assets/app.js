@@ -50,52 +50,6 @@ function setupNativeMobileSafeAreaHandling() {
     window.visualViewport?.addEventListener("scroll", updateNativeViewportInsets);
 }
 setupNativeMobileSafeAreaHandling();
-const CAPACITOR_REF = window.Capacitor;
-const CAPACITOR_PLATFORM = typeof CAPACITOR_REF?.getPlatform === "function"
-    ? CAPACITOR_REF.getPlatform()
-    : CAPACITOR_REF?.platform;
-const IS_NATIVE = typeof CAPACITOR_PLATFORM === "string" && CAPACITOR_PLATFORM !== "web";
-const IS_NATIVE_MOBILE = CAPACITOR_PLATFORM === "ios" || CAPACITOR_PLATFORM === "android";
-const BASE_URL = IS_NATIVE ? "https://ftcvanguard.org" : "";
-let nativeViewportListenersAttached = false;
-function updateNativeViewportInsets() {
-    if (!IS_NATIVE_MOBILE)
-        return;
-    const body = document.body;
-    if (!body)
-        return;
-    const viewport = window.visualViewport;
-    if (!viewport) {
-        body.style.setProperty("--native-viewport-offset-top", "0px");
-        body.style.setProperty("--native-viewport-offset-bottom", "0px");
-        return;
-    }
-    const topInset = Math.min(90, Math.max(0, Math.round(viewport.offsetTop)));
-    const viewportHeight = Math.round(viewport.height);
-    const windowHeight = Math.round(window.innerHeight);
-    const rawBottomInset = Math.max(0, windowHeight - viewportHeight - topInset);
-    const bottomInset = rawBottomInset > 120 ? 0 : rawBottomInset;
-    body.style.setProperty("--native-viewport-offset-top", `${topInset}px`);
-    body.style.setProperty("--native-viewport-offset-bottom", `${bottomInset}px`);
-}
-function setupNativeMobileSafeAreaHandling() {
-    if (!IS_NATIVE_MOBILE)
-        return;
-    const body = document.body;
-    if (!body)
-        return;
-    body.classList.add("native-mobile");
-    body.dataset.nativePlatform = CAPACITOR_PLATFORM;
-    updateNativeViewportInsets();
-    if (nativeViewportListenersAttached)
-        return;
-    nativeViewportListenersAttached = true;
-    window.addEventListener("resize", updateNativeViewportInsets);
-    window.addEventListener("orientationchange", updateNativeViewportInsets);
-    window.visualViewport?.addEventListener("resize", updateNativeViewportInsets);
-    window.visualViewport?.addEventListener("scroll", updateNativeViewportInsets);
-}
-setupNativeMobileSafeAreaHandling();
 const tabs = [
     { buttonId: "button-schedule", viewId: "view-schedule" },
     { buttonId: "button-rankings", viewId: "view-rankings" },
@@ -145,6 +99,11 @@ let isScheduleLoadInProgress = false;
 let currentScheduleSnapshot = "";
 let currentRankingsSnapshot = "";
 let currentScoresSnapshot = "";
+let eventBundleEventCode = "";
+let eventBundleSections = {};
+let realtimeEventStream = null;
+let realtimeEventStreamCode = "";
+let realtimeEventStreamOpen = false;
 let currentRankingSortColumn = "rankingScore";
 let currentRankingSortDirection = "desc";
 function getViewNameFromId(viewId) {
@@ -224,11 +183,70 @@ function buildApiUrl(path) {
     }
     return path.startsWith("/") ? `${BASE_URL}${path}` : `${BASE_URL}/${path}`;
 }
+let accessTokenRefresh = null;
+// Access tokens are short-lived; concurrent callers share one refresh request
+function refreshAccessToken() {
+    if (accessTokenRefresh)
+        return accessTokenRefresh;
+    accessTokenRefresh = (async () => {
+        let refreshToken = localStorage.getItem("refreshToken");
+        if (!refreshToken)
+            return null;
+        try {
+            // Each refresh replaces the refresh token, so another tab may have just used this one
+            for (let attempt = 0; attempt < 2; attempt++) {
+                const response = await fetch(buildApiUrl("/api/v1/token/refresh"), {
+                    method: "POST",
+                    headers: {
+                        "Content-Type": "application/json"
+                    },
+                    body: JSON.stringify({ refreshToken })
+                });
+                if (response.ok) {
+                    const data = await response.json();
+                    localStorage.setItem("token", data.token);
+                    if (data.refreshToken) {
+                        localStorage.setItem("refreshToken", data.refreshToken);
+                    }
+                    return data.token;
+                }
+                if (response.status !== 401)
+                    return null;
+                const current = localStorage.getItem("refreshToken");
+                if (current === refreshToken) {
+                    localStorage.removeItem("refreshToken");
+                    return null;
+                }
+                if (!current)
+                    return null;
+                refreshToken = current;
+            }
+            return null;
+        }
+        catch (error) {
+            console.error("Token refresh failed:", error);
+            return null;
+        }
+        finally {
+            accessTokenRefresh = null;
+        }
+    })();
+    return accessTokenRefresh;
+}
 async function authFetch(input, init) {
-    const url = typeof input === "string" ? `${BASE_URL}${input}` : input;
-    const res = await fetch(url, init);
     const url = typeof input === "string" ? buildApiUrl(input) : input;
-    const res = await fetch(url, init);
+    let res = await fetch(url, init);
+    if (res.status === 401 && localStorage.getItem("refreshToken")) {
+        const payload = await res.clone().json().catch(() => null);
+        if (payload && payload.error === "token expired") {
+            const token = await refreshAccessToken();
+            if (token) {
+                const headers = new Headers(init?.headers);
+                headers.set("Authorization", `Bearer ${token}`);
+                res = await fetch(url, { ...init, headers });
+            }
+        }
+    }
     return assertAuthorized(res);
 }
 const DAY_IN_MS = 24 * 60 * 60 * 1000;
@@ -544,19 +562,161 @@ function startRealtimeEventSync() {
         window.clearInterval(realtimeEventSyncInterval);
     }
     realtimeEventSyncInterval = window.setInterval(() => {
+        // Polling is only the fallback for when the event stream is unavailable
+        if (ensureRealtimeEventStream())
+            return;
         void pollRealtimeEventUpdates();
     }, REALTIME_POLL_INTERVAL_MS);
+    ensureRealtimeEventStream();
 }
 function stopRealtimeEventSync() {
     if (realtimeEventSyncInterval !== null) {
         window.clearInterval(realtimeEventSyncInterval);
         realtimeEventSyncInterval = null;
     }
+    closeRealtimeEventStream();
     realtimeEventSyncInFlight = false;
     currentScheduleSnapshot = "";
     currentRankingsSnapshot = "";
     currentScoresSnapshot = "";
 }
+async function fetchEventBundle(eventCode, token, incremental = false) {
+    const normalizedEventCode = normalizeEventCode(eventCode);
+    if (eventBundleEventCode !== normalizedEventCode) {
+        eventBundleEventCode = normalizedEventCode;
+        eventBundleSections = {};
+    }
+    // Sections we already hold come back without data when their version is unchanged
+    const since = incremental ? Object.values(eventBundleSections).map(section => section.version).join(",") : "";
+    const query = since ? `?since=${encodeURIComponent(since)}` : "";
+    const response = await authFetch(`/api/v1/event/${encodeURIComponent(normalizedEventCode)}/bundle${query}`, {
+        headers: { "Authorization": `Bearer ${token}` }
+    });
+    if (!response.ok)
+        return null;
+    const bundle = await response.json();
+    if (eventBundleEventCode !== normalizedEventCode)
+        return null;
+    storeEventBundleSections(bundle.sections);
+    return getEventBundleData();
+}
+function storeEventBundleSections(sections) {
+    for (const [name, section] of Object.entries(sections)) {
+        if (section.data !== undefined) {
+            eventBundleSections[name] = section;
+        }
+    }
+}
+function getEventBundleData() {
+    const sectionData = {};
+    for (const [name, section] of Object.entries(eventBundleSections)) {
+        sectionData[name] = section.status === 200 ? structuredClone(section.data) : null;
+    }
+    return sectionData;
+}
+function closeRealtimeEventStream() {
+    if (realtimeEventStream !== null) {
+        realtimeEventStream.abort();
+        realtimeEventStream = null;
+    }
+    realtimeEventStreamCode = "";
+    realtimeEventStreamOpen = false;
+}
+function ensureRealtimeEventStream() {
+    if (typeof ReadableStream === "undefined" || typeof TextDecoder === "undefined")
+        return false;
+    const token = localStorage.getItem("token");
+    const eventCode = normalizeEventCode(currentEventCode);
+    if (!token || !eventCode || !isCurrentEventActive()) {
+        closeRealtimeEventStream();
+        return false;
+    }
+    if (realtimeEventStream !== null && realtimeEventStreamCode === eventCode) {
+        return realtimeEventStreamOpen;
+    }
+    closeRealtimeEventStream();
+    const since = eventBundleEventCode === eventCode ? Object.values(eventBundleSections).map(section => section.version).join(",") : "";
+    const controller = new AbortController();
+    realtimeEventStream = controller;
+    realtimeEventStreamCode = eventCode;
+    void readRealtimeEventStream(eventCode, since, token, controller);
+    return false;
+}
+// Read with fetch rather than EventSource so the token goes in the Authorization header, not the URL.
+// The server ends the stream when the access token expires; the next sync tick reconnects, and
+// authFetch refreshes the token on the way
+async function readRealtimeEventStream(eventCode, since, token, controller) {
+    try {
+        const response = await authFetch(`/api/v1/event/${encodeURIComponent(eventCode)}/stream?since=${encodeURIComponent(since)}`, {
+            headers: {
+                "Authorization": `Bearer ${token}`,
+                "Accept": "text/event-stream"
+            },
+            signal: controller.signal
+        });
+        if (!response.ok || !response.body)
+            return;
+        if (realtimeEventStream === controller)
+            realtimeEventStreamOpen = true;
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done)
+                break;
+            buffer += decoder.decode(value, { stream: true });
+            let boundary;
+            while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+                const message = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                let eventName = "message";
+                const data = [];
+                for (const line of message.split("\n")) {
+                    if (line.startsWith("event:"))
+                        eventName = line.slice(6).trim();
+                    else if (line.startsWith("data:"))
+                        data.push(line.slice(5).replace(/^ /, ""));
+                }
+                if (eventName !== "sections" || data.length === 0 || eventBundleEventCode !== eventCode)
+                    continue;
+                storeEventBundleSections(JSON.parse(data.join("\n")));
+                void applyStreamedEventBundle(eventCode);
+            }
+        }
+    }
+    catch (error) {
+        if (!controller.signal.aborted) {
+            console.error("Realtime stream failed:", error);
+        }
+    }
+    finally {
+        if (realtimeEventStream === controller) {
+            realtimeEventStream = null;
+            realtimeEventStreamOpen = false;
+        }
+    }
+}
+async function applyStreamedEventBundle(eventCode) {
+    if (normalizeEventCode(currentEventCode) !== eventCode)
+        return;
+    if (realtimeEventSyncInFlight || isScheduleLoadInProgress) {
+        window.setTimeout(() => {
+            void applyStreamedEventBundle(eventCode);
+        }, REALTIME_UI_FLASH_MS);
+        return;
+    }
+    realtimeEventSyncInFlight = true;
+    try {
+        await applyRealtimeEventBundle(getEventBundleData());
+    }
+    catch (error) {
+        console.error("Realtime stream update failed:", error);
+    }
+    finally {
+        realtimeEventSyncInFlight = false;
+    }
+}
 async function pollRealtimeEventUpdates() {
     if (realtimeEventSyncInFlight || isScheduleLoadInProgress) {
         return;
@@ -569,104 +729,103 @@ async function pollRealtimeEventUpdates() {
         return;
     realtimeEventSyncInFlight = true;
     try {
-        const previousRankings = currentRankings;
-        const previousSelectedMatch = currentSelectedMatch !== null
-            ? currentMatches.find(match => match.matchNumber === currentSelectedMatch) || null
-            : null;
-        const previousSelectedMatchSnapshot = previousSelectedMatch ? buildMatchSnapshot(previousSelectedMatch) : "";
-        const previousSelectedScoreSnapshot = buildSelectedScoreSnapshot(previousSelectedMatch, currentScoreMatches);
-        const previousSelectedTeamsSnapshot = previousSelectedMatch ? buildTeamSnapshot(previousSelectedMatch.teams || []) : "";
-        const headers = { "Authorization": `Bearer ${token}` };
-        const [scheduleRes, rankingsRes, qualScoresRes, playoffScoresRes] = await Promise.all([
-            authFetch(`/api/v1/schedule?event=${currentEventCode}`, { headers }),
-            authFetch(`/api/v1/rankings?event=${currentEventCode}`, { headers }),
-            authFetch(`/api/v1/scores/${currentEventCode}/qual`, { headers }),
-            authFetch(`/api/v1/scores/${currentEventCode}/playoff`, { headers })
-        ]);
-        if (!scheduleRes.ok) {
-            return;
+        const bundle = await fetchEventBundle(currentEventCode, token, true);
+        if (bundle) {
+            await applyRealtimeEventBundle(bundle);
         }
-        const scheduleData = await scheduleRes.json();
-        const rankingsData = rankingsRes.ok ? await rankingsRes.json() : { rankings: [] };
-        const qualScoresData = qualScoresRes.ok ? await qualScoresRes.json() : { matchScores: [] };
-        const playoffScoresData = playoffScoresRes.ok ? await playoffScoresRes.json() : { matchScores: [] };
-        const nextMatches = scheduleData.schedule || [];
-        nextMatches.sort((a, b) => getMatchStartTimestamp(a) - getMatchStartTimestamp(b));
-        const nextRankings = rankingsData.rankings || [];
-        const nextScoreMatches = [...(qualScoresData.matchScores || []), ...(playoffScoresData.matchScores || [])];
-        mergeScoresIntoScheduleMatches(nextMatches, nextScoreMatches);
-        const nextScheduleSnapshot = buildScheduleSnapshot(nextMatches);
-        const nextRankingsSnapshot = buildRankingsSnapshot(nextRankings);
-        const nextScoresSnapshot = buildScoresSnapshot(nextScoreMatches);
-        const scheduleChanged = nextScheduleSnapshot !== currentScheduleSnapshot;
-        const rankingsChanged = nextRankingsSnapshot !== currentRankingsSnapshot;
-        const scoresChanged = nextScoresSnapshot !== currentScoresSnapshot;
-        if (!scheduleChanged && !rankingsChanged && !scoresChanged) {
-            return;
-        }
-        currentMatches = nextMatches;
-        currentRankings = nextRankings;
-        currentScoreMatches = nextScoreMatches;
-        currentScheduleSnapshot = nextScheduleSnapshot;
-        currentRankingsSnapshot = nextRankingsSnapshot;
-        currentScoresSnapshot = nextScoresSnapshot;
-        if (scheduleChanged) {
-            applyRealtimeScheduleUpdates(currentMatches, currentRankings, currentTeams);
-        }
-        if (rankingsChanged) {
-            renderCurrentRankings();
-            hydrateMissingOPRData();
-        }
-        if (scheduleChanged && activeViewId === "view-strategy") {
-            renderStrategyMatchList();
+    }
+    catch (error) {
+        console.error("Realtime refresh failed:", error);
+    }
+    finally {
+        realtimeEventSyncInFlight = false;
+    }
+}
+async function applyRealtimeEventBundle(bundle) {
+    if (!bundle.schedule) {
+        return;
+    }
+    const previousRankings = currentRankings;
+    const previousSelectedMatch = currentSelectedMatch !== null
+        ? currentMatches.find(match => match.matchNumber === currentSelectedMatch) || null
+        : null;
+    const previousSelectedMatchSnapshot = previousSelectedMatch ? buildMatchSnapshot(previousSelectedMatch) : "";
+    const previousSelectedScoreSnapshot = buildSelectedScoreSnapshot(previousSelectedMatch, currentScoreMatches);
+    const previousSelectedTeamsSnapshot = previousSelectedMatch ? buildTeamSnapshot(previousSelectedMatch.teams || []) : "";
+    const scheduleData = bundle.schedule;
+    const rankingsData = bundle.rankings || { rankings: [] };
+    const qualScoresData = bundle.qualScores || { matchScores: [] };
+    const playoffScoresData = bundle.playoffScores || { matchScores: [] };
+    const nextMatches = scheduleData.schedule || [];
+    nextMatches.sort((a, b) => getMatchStartTimestamp(a) - getMatchStartTimestamp(b));
+    const nextRankings = rankingsData.rankings || [];
+    const nextScoreMatches = [...(qualScoresData.matchScores || []), ...(playoffScoresData.matchScores || [])];
+    mergeScoresIntoScheduleMatches(nextMatches, nextScoreMatches);
+    const nextScheduleSnapshot = buildScheduleSnapshot(nextMatches);
+    const nextRankingsSnapshot = buildRankingsSnapshot(nextRankings);
+    const nextScoresSnapshot = buildScoresSnapshot(nextScoreMatches);
+    const scheduleChanged = nextScheduleSnapshot !== currentScheduleSnapshot;
+    const rankingsChanged = nextRankingsSnapshot !== currentRankingsSnapshot;
+    const scoresChanged = nextScoresSnapshot !== currentScoresSnapshot;
+    if (!scheduleChanged && !rankingsChanged && !scoresChanged) {
+        return;
+    }
+    currentMatches = nextMatches;
+    currentRankings = nextRankings;
+    currentScoreMatches = nextScoreMatches;
+    currentScheduleSnapshot = nextScheduleSnapshot;
+    currentRankingsSnapshot = nextRankingsSnapshot;
+    currentScoresSnapshot = nextScoresSnapshot;
+    if (scheduleChanged) {
+        applyRealtimeScheduleUpdates(currentMatches, currentRankings, currentTeams);
+    }
+    if (rankingsChanged) {
+        renderCurrentRankings();
+        hydrateMissingOPRData();
+    }
+    if (scheduleChanged && activeViewId === "view-strategy") {
+        renderStrategyMatchList();
+    }
+    if (currentSelectedMatch !== null) {
+        const selectedMatch = currentMatches.find(match => match.matchNumber === currentSelectedMatch) || null;
+        if (!selectedMatch) {
+            currentSelectedMatch = null;
+            const detailsContainer = document.getElementById("schedule-details");
+            if (detailsContainer) {
+                detailsContainer.innerHTML = '<div class="empty-state">Select a match to view details</div>';
+            }
+            document.querySelectorAll(".match-item").forEach(item => item.classList.remove("active"));
         }
-        if (currentSelectedMatch !== null) {
-            const selectedMatch = currentMatches.find(match => match.matchNumber === currentSelectedMatch) || null;
-            if (!selectedMatch) {
-                currentSelectedMatch = null;
+        else {
+            const selectedMatchSnapshot = buildMatchSnapshot(selectedMatch);
+            const selectedScoreSnapshot = buildSelectedScoreSnapshot(selectedMatch, currentScoreMatches);
+            const selectedTeamsSnapshot = buildTeamSnapshot(selectedMatch.teams || []);
+            const selectedMatchChanged = selectedMatchSnapshot !== previousSelectedMatchSnapshot;
+            const selectedScoreChanged = selectedScoreSnapshot !== previousSelectedScoreSnapshot;
+            const selectedRankingsChanged = rankingsChanged && didRankingsAffectMatchTeams(selectedMatch, previousRankings, currentRankings);
+            const selectedTeamsChanged = selectedTeamsSnapshot !== previousSelectedTeamsSnapshot;
+            if (activeViewId === "view-schedule" && (selectedMatchChanged || selectedScoreChanged || selectedRankingsChanged)) {
+                await renderMatchDetails(selectedMatch, currentRankings, currentTeams, {
+                    showLoadingBar: false,
+                    loadNotes: selectedTeamsChanged
+                });
                 const detailsContainer = document.getElementById("schedule-details");
                 if (detailsContainer) {
-                    detailsContainer.innerHTML = '<div class="empty-state">Select a match to view details</div>';
+                    detailsContainer.classList.add("realtime-updated");
+                    window.setTimeout(() => {
+                        detailsContainer.classList.remove("realtime-updated");
+                    }, REALTIME_UI_FLASH_MS);
                 }
-                document.querySelectorAll(".match-item").forEach(item => item.classList.remove("active"));
             }
-            else {
-                const selectedMatchSnapshot = buildMatchSnapshot(selectedMatch);
-                const selectedScoreSnapshot = buildSelectedScoreSnapshot(selectedMatch, currentScoreMatches);
-                const selectedTeamsSnapshot = buildTeamSnapshot(selectedMatch.teams || []);
-                const selectedMatchChanged = selectedMatchSnapshot !== previousSelectedMatchSnapshot;
-                const selectedScoreChanged = selectedScoreSnapshot !== previousSelectedScoreSnapshot;
-                const selectedRankingsChanged = rankingsChanged && didRankingsAffectMatchTeams(selectedMatch, previousRankings, currentRankings);
-                const selectedTeamsChanged = selectedTeamsSnapshot !== previousSelectedTeamsSnapshot;
-                if (activeViewId === "view-schedule" && (selectedMatchChanged || selectedScoreChanged || selectedRankingsChanged)) {
-                    await renderMatchDetails(selectedMatch, currentRankings, currentTeams, {
-                        showLoadingBar: false,
-                        loadNotes: selectedTeamsChanged
-                    });
-                    const detailsContainer = document.getElementById("schedule-details");
-                    if (detailsContainer) {
-                        detailsContainer.classList.add("realtime-updated");
-                        window.setTimeout(() => {
-                            detailsContainer.classList.remove("realtime-updated");
-                        }, REALTIME_UI_FLASH_MS);
-                    }
-                }
-                if (scheduleChanged) {
-                    const selectedItem = document.querySelector(`.match-item[data-match-number="${currentSelectedMatch}"]`);
-                    if (selectedItem) {
-                        document.querySelectorAll(".match-item").forEach(item => item.classList.remove("active"));
-                        selectedItem.classList.add("active");
-                    }
+            if (scheduleChanged) {
+                const selectedItem = document.querySelector(`.match-item[data-match-number="${currentSelectedMatch}"]`);
+                if (selectedItem) {
+                    document.querySelectorAll(".match-item").forEach(item => item.classList.remove("active"));
+                    selectedItem.classList.add("active");
                 }
             }
         }
     }
-    catch (error) {
-        console.error("Realtime refresh failed:", error);
-    }
-    finally {
-        realtimeEventSyncInFlight = false;
-    }
 }
 function initializeScheduleOffsetControls() {
     const toggle = document.getElementById("schedule-offset-toggle");
@@ -975,6 +1134,9 @@ async function handlePasswordChange(event) {
         });
         const data = await response.json();
         if (response.ok) {
+            // Changing the password signs out other devices; this one gets new tokens
+            localStorage.setItem("token", data.token);
+            localStorage.setItem("refreshToken", data.refreshToken);
             successEl.textContent = "Password changed successfully";
             successEl.style.display = "block";
             currentPasswordInput.value = "";
@@ -1049,16 +1211,45 @@ async function loadAdminStats() {
         showAdminMessage("Failed to load statistics", "error");
     }
 }
+// admin lists come a page at a time; next is the cursor for the following page, null on the last one
+async function fetchAdminPage(path, params = {}) {
+    const query = new URLSearchParams(params).toString();
+    const response = await adminFetch(query ? `${path}?${query}` : path);
+    if (!response.ok) {
+        throw new Error(`Failed to load ${path}`);
+    }
+    return response.json();
+}
+function updateLoadMoreButton(id, next) {
+    const button = document.getElementById(id);
+    if (button) {
+        button.style.display = next ? "" : "none";
+    }
+}
 let allUsers = [];
+let adminUsersNext = null;
 async function loadAdminUsers() {
     try {
-        const response = await adminFetch("/api/v1/admin/users");
-        if (!response.ok) {
-            throw new Error("Failed to load users");
-        }
-        const data = await response.json();
+        const data = await fetchAdminPage("/api/v1/admin/users");
         allUsers = data.users;
+        adminUsersNext = data.next;
+        renderAdminUsers(allUsers);
+        updateLoadMoreButton("admin-users-more", adminUsersNext);
+    }
+    catch (error) {
+        console.error("Error loading users:", error);
+        showAdminMessage("Failed to load users", "error");
+    }
+}
+async function loadMoreAdminUsers() {
+    if (!adminUsersNext)
+        return;
+    try {
+        const data = await fetchAdminPage("/api/v1/admin/users", { after: adminUsersNext });
+        allUsers = allUsers.concat(data.users);
+        adminUsersNext = data.next;
         renderAdminUsers(allUsers);
+        updateLoadMoreButton("admin-users-more", adminUsersNext);
     }
     catch (error) {
         console.error("Error loading users:", error);
@@ -1093,22 +1284,27 @@ function renderAdminUsers(users, searchTerm = "") {
 async function searchUsers() {
     const searchInput = document.getElementById("users-search-input");
     const searchTerm = searchInput.value.trim();
-    if (allUsers.length === 0) {
-        try {
-            const response = await adminFetch("/api/v1/admin/users");
-            if (!response.ok) {
-                throw new Error("Failed to load users");
-            }
-            const data = await response.json();
-            allUsers = data.users;
-        }
-        catch (error) {
-            console.error("Error loading users:", error);
-            showAdminMessage("Failed to load users", "error");
+    if (!searchTerm) {
+        clearUsersSearch();
+        return;
+    }
+    // only the loaded pages are in allUsers, so the server looks the team up
+    if (!/^\d+$/.test(searchTerm)) {
+        renderAdminUsers([], searchTerm);
+        return;
+    }
+    try {
+        const data = await fetchAdminPage("/api/v1/admin/users", { team: searchTerm });
+        // a later keystroke already started its own search
+        if (searchInput.value.trim() !== searchTerm)
             return;
-        }
+        renderAdminUsers(data.users, searchTerm);
+        updateLoadMoreButton("admin-users-more", null);
+    }
+    catch (error) {
+        console.error("Error loading users:", error);
+        showAdminMessage("Failed to load users", "error");
     }
-    renderAdminUsers(allUsers, searchTerm);
 }
 function clearUsersSearch() {
     const searchInput = document.getElementById("users-search-input");
@@ -1116,6 +1312,7 @@ function clearUsersSearch() {
         searchInput.value = "";
     }
     renderAdminUsers(allUsers);
+    updateLoadMoreButton("admin-users-more", adminUsersNext);
 }
 async function createUser() {
     const teamIdInput = document.getElementById("new-user-id");
@@ -1212,15 +1409,29 @@ async function resetPassword() {
     }
 }
 let allNotes = [];
+let adminNotesNext = null;
 async function loadAdminNotes() {
     try {
-        const response = await adminFetch("/api/v1/admin/notes");
-        if (!response.ok) {
-            throw new Error("Failed to load notes");
-        }
-        const data = await response.json();
+        const data = await fetchAdminPage("/api/v1/admin/notes");
         allNotes = data.notes;
+        adminNotesNext = data.next;
+        renderAdminNotes(allNotes);
+        updateLoadMoreButton("admin-notes-more", adminNotesNext);
+    }
+    catch (error) {
+        console.error("Error loading notes:", error);
+        showAdminMessage("Failed to load notes", "error");
+    }
+}
+async function loadMoreAdminNotes() {
+    if (!adminNotesNext)
+        return;
+    try {
+        const data = await fetchAdminPage("/api/v1/admin/notes", { after: adminNotesNext });
+        allNotes = allNotes.concat(data.notes);
+        adminNotesNext = data.next;
         renderAdminNotes(allNotes);
+        updateLoadMoreButton("admin-notes-more", adminNotesNext);
     }
     catch (error) {
         console.error("Error loading notes:", error);
@@ -1282,22 +1493,34 @@ function renderAdminNotes(notes, searchTerm = "") {
 async function searchNotes() {
     const searchInput = document.getElementById("notes-search-input");
     const searchTerm = searchInput.value.trim();
-    if (allNotes.length === 0) {
-        try {
-            const response = await adminFetch("/api/v1/admin/notes");
-            if (!response.ok) {
-                throw new Error("Failed to load notes");
-            }
-            const data = await response.json();
-            allNotes = data.notes;
-        }
-        catch (error) {
-            console.error("Error loading notes:", error);
-            showAdminMessage("Failed to load notes", "error");
+    if (!searchTerm) {
+        clearNotesSearch();
+        return;
+    }
+    if (!/^\d+$/.test(searchTerm)) {
+        renderAdminNotes([], searchTerm);
+        return;
+    }
+    // notes written by the team and notes about it, newest first
+    try {
+        const [byTeam, aboutTeam] = await Promise.all([
+            fetchAdminPage("/api/v1/admin/notes", { team: searchTerm, limit: "1000" }),
+            fetchAdminPage("/api/v1/admin/notes", { subjectTeam: searchTerm, limit: "1000" })
+        ]);
+        if (searchInput.value.trim() !== searchTerm)
             return;
+        const notes = new Map();
+        for (const note of [...byTeam.notes, ...aboutTeam.notes]) {
+            notes.set(note.id, note);
         }
+        const results = Array.from(notes.values()).sort((a, b) => b.updatedAt - a.updatedAt || b.id - a.id);
+        renderAdminNotes(results, searchTerm);
+        updateLoadMoreButton("admin-notes-more", null);
+    }
+    catch (error) {
+        console.error("Error loading notes:", error);
+        showAdminMessage("Failed to load notes", "error");
     }
-    renderAdminNotes(allNotes, searchTerm);
 }
 function clearNotesSearch() {
     const searchInput = document.getElementById("notes-search-input");
@@ -1305,6 +1528,7 @@ function clearNotesSearch() {
         searchInput.value = "";
     }
     renderAdminNotes(allNotes);
+    updateLoadMoreButton("admin-notes-more", adminNotesNext);
 }
 function escapeHtml(text) {
     const div = document.createElement("div");
@@ -1427,17 +1651,22 @@ async function clearNotificationHistory() {
     }
 }
 async function vacuumDatabase() {
-    if (!confirm("Are you sure you want to vacuum the database? This may take a few moments.")) {
+    if (!confirm("Prune old rows and reclaim free space now?")) {
         return;
     }
     try {
         const response = await adminFetch("/api/v1/admin/database/vacuum", {
             method: "POST"
         });
+        if (response.status === 409) {
+            showAdminMessage("Database maintenance is already running", "error");
+            return;
+        }
         if (!response.ok) {
             throw new Error("Failed to vacuum database");
         }
-        showAdminMessage("Database vacuumed successfully", "success");
+        const data = await response.json();
+        showAdminMessage(`Database vacuumed, reclaimed ${formatBytes(data.maintenance?.bytesReclaimed ?? 0)}`, "success");
         loadAdminStats();
     }
     catch (error) {
@@ -1445,6 +1674,25 @@ async function vacuumDatabase() {
         showAdminMessage("Failed to vacuum database", "error");
     }
 }
+async function backupDatabase() {
+    try {
+        const response = await adminFetch("/api/v1/admin/database/backup", {
+            method: "POST"
+        });
+        if (response.status === 409) {
+            showAdminMessage("A backup is already running", "error");
+            return;
+        }
+        if (!response.ok) {
+            throw new Error("Failed to start backup");
+        }
+        showAdminMessage("Backup started", "success");
+    }
+    catch (error) {
+        console.error("Error starting backup:", error);
+        showAdminMessage("Failed to start backup", "error");
+    }
+}
 function switchAdminSection(section) {
     const sections = ["overview", "users", "registrations", "notes", "notifications", "database"];
     sections.forEach(s => {
@@ -1514,55 +1762,81 @@ function buildAdminStatusBadge(status) {
     const safe = normalized || "pending";
     return `<span class="admin-status-badge ${safe}">${safe}</span>`;
 }
+let adminRegistrations = [];
+let adminRegistrationsNext = null;
+function showOldRegistrations() {
+    const showOldCheckbox = document.getElementById("show-old-registrations");
+    return showOldCheckbox ? showOldCheckbox.checked : false;
+}
 async function loadAdminRegistrations() {
     try {
-        const response = await adminFetch("/api/v1/admin/registrations");
-        if (!response.ok) {
-            throw new Error("Failed to load registrations");
-        }
-        const data = await response.json();
-        let registrations = data.registrations || [];
-        const showOldCheckbox = document.getElementById("show-old-registrations");
-        const showOld = showOldCheckbox ? showOldCheckbox.checked : false;
-        const oneWeekAgo = Math.floor(Date.now() / 1000) - (7 * 24 * 60 * 60);
-        if (!showOld) {
-            registrations = registrations.filter(reg => reg.status === "pending" && (!reg.submittedAt || reg.submittedAt >= oneWeekAgo));
-        }
-        const tbody = document.querySelector("#admin-registrations-table tbody");
-        tbody.innerHTML = "";
-        if (registrations.length === 0) {
-            tbody.innerHTML = `<tr><td colspan="6" class="admin-empty-state">No registration requests found</td></tr>`;
-            return;
+        const data = await fetchAdminPage("/api/v1/admin/registrations", showOldRegistrations() ? {} : { status: "pending" });
+        adminRegistrations = data.registrations || [];
+        adminRegistrationsNext = data.next;
+        renderAdminRegistrations();
+        updateLoadMoreButton("admin-registrations-more", adminRegistrationsNext);
+    }
+    catch (error) {
+        console.error("Error loading registrations:", error);
+        showAdminMessage("Failed to load registrations", "error");
+    }
+}
+async function loadMoreAdminRegistrations() {
+    if (!adminRegistrationsNext)
+        return;
+    try {
+        const params = { after: adminRegistrationsNext };
+        if (!showOldRegistrations()) {
+            params.status = "pending";
         }
-        registrations.forEach(reg => {
-            const row = document.createElement("tr");
-            const submitted = reg.submittedAt
-                ? new Date(reg.submittedAt * 1000).toLocaleString()
-                : "—";
-            const statusBadge = buildAdminStatusBadge(reg.status);
-            const isPending = reg.status === "pending";
-            const actions = isPending
-                ? `
-                    <button class="admin-action-btn admin-btn-primary" onclick="approveRegistration(${reg.id})">Approve</button>
-                    <button class="admin-action-btn admin-btn-danger" onclick="denyRegistration(${reg.id})">Deny</button>
-                  `
-                : "—";
-            row.innerHTML = `
-                <td>${reg.teamNumber}</td>
-                <td>${escapeHtml(reg.email)}</td>
-                <td><a class="admin-link" href="${escapeHtml(reg.imageLink)}" target="_blank">View</a></td>
-                <td>${submitted}</td>
-                <td>${statusBadge}</td>
-                <td>${actions}</td>
-            `;
-            tbody.appendChild(row);
-        });
+        const data = await fetchAdminPage("/api/v1/admin/registrations", params);
+        adminRegistrations = adminRegistrations.concat(data.registrations || []);
+        adminRegistrationsNext = data.next;
+        renderAdminRegistrations();
+        updateLoadMoreButton("admin-registrations-more", adminRegistrationsNext);
     }
     catch (error) {
         console.error("Error loading registrations:", error);
         showAdminMessage("Failed to load registrations", "error");
     }
 }
+function renderAdminRegistrations() {
+    let registrations = adminRegistrations;
+    const showOld = showOldRegistrations();
+    const oneWeekAgo = Math.floor(Date.now() / 1000) - (7 * 24 * 60 * 60);
+    if (!showOld) {
+        registrations = registrations.filter(reg => reg.status === "pending" && (!reg.submittedAt || reg.submittedAt >= oneWeekAgo));
+    }
+    const tbody = document.querySelector("#admin-registrations-table tbody");
+    tbody.innerHTML = "";
+    if (registrations.length === 0) {
+        tbody.innerHTML = `<tr><td colspan="6" class="admin-empty-state">No registration requests found</td></tr>`;
+        return;
+    }
+    registrations.forEach(reg => {
+        const row = document.createElement("tr");
+        const submitted = reg.submittedAt
+            ? new Date(reg.submittedAt * 1000).toLocaleString()
+            : "—";
+        const statusBadge = buildAdminStatusBadge(reg.status);
+        const isPending = reg.status === "pending";
+        const actions = isPending
+            ? `
+                <button class="admin-action-btn admin-btn-primary" onclick="approveRegistration(${reg.id})">Approve</button>
+                <button class="admin-action-btn admin-btn-danger" onclick="denyRegistration(${reg.id})">Deny</button>
+              `
+            : "—";
+        row.innerHTML = `
+            <td>${reg.teamNumber}</td>
+            <td>${escapeHtml(reg.email)}</td>
+            <td><a class="admin-link" href="${escapeHtml(reg.imageLink)}" target="_blank">View</a></td>
+            <td>${submitted}</td>
+            <td>${statusBadge}</td>
+            <td>${actions}</td>
+        `;
+        tbody.appendChild(row);
+    });
+}
 async function approveRegistration(registrationId) {
     if (!confirm("Approve this registration and create the user?")) {
         return;
@@ -1773,19 +2047,13 @@ async function loadScheduleWithStateRestore(eventCode, urlState) {
             return;
         }
         applyCurrentEventWindow(event);
-        const [scheduleRes, rankingsRes, teamsRes, qualScoresRes, playoffScoresRes] = await Promise.all([
-            authFetch(`/api/v1/schedule?event=${eventCode}`, { headers: { "Authorization": `Bearer ${token}` } }),
-            authFetch(`/api/v1/rankings?event=${eventCode}`, { headers: { "Authorization": `Bearer ${token}` } }),
-            authFetch(`/api/v1/teams?event=${eventCode}`, { headers: { "Authorization": `Bearer ${token}` } }),
-            authFetch(`/api/v1/scores/${eventCode}/qual`, { headers: { "Authorization": `Bearer ${token}` } }),
-            authFetch(`/api/v1/scores/${eventCode}/playoff`, { headers: { "Authorization": `Bearer ${token}` } })
-        ]);
-        if (scheduleRes.ok && teamsRes.ok) {
-            const scheduleData = await scheduleRes.json();
-            const rankingsData = rankingsRes.ok ? await rankingsRes.json() : { rankings: [] };
-            const teamsData = await teamsRes.json();
-            const qualScoresData = qualScoresRes.ok ? await qualScoresRes.json() : { matchScores: [] };
-            const playoffScoresData = playoffScoresRes.ok ? await playoffScoresRes.json() : { matchScores: [] };
+        const bundle = await fetchEventBundle(eventCode, token);
+        if (bundle && bundle.schedule && bundle.teams) {
+            const scheduleData = bundle.schedule;
+            const rankingsData = bundle.rankings || { rankings: [] };
+            const teamsData = bundle.teams;
+            const qualScoresData = bundle.qualScores || { matchScores: [] };
+            const playoffScoresData = bundle.playoffScores || { matchScores: [] };
             currentMatches = scheduleData.schedule || [];
             currentMatches.sort((a, b) => getMatchStartTimestamp(a) - getMatchStartTimestamp(b));
             currentRankings = rankingsData.rankings || [];
@@ -1956,19 +2224,13 @@ async function loadSchedule(eventCode) {
             return;
         }
         applyCurrentEventWindow(event);
-        const [scheduleRes, rankingsRes, teamsRes, qualScoresRes, playoffScoresRes] = await Promise.all([
-            authFetch(`/api/v1/schedule?event=${eventCode}`, { headers: { "Authorization": `Bearer ${token}` } }),
-            authFetch(`/api/v1/rankings?event=${eventCode}`, { headers: { "Authorization": `Bearer ${token}` } }),
-            authFetch(`/api/v1/teams?event=${eventCode}`, { headers: { "Authorization": `Bearer ${token}` } }),
-            authFetch(`/api/v1/scores/${eventCode}/qual`, { headers: { "Authorization": `Bearer ${token}` } }),
-            authFetch(`/api/v1/scores/${eventCode}/playoff`, { headers: { "Authorization": `Bearer ${token}` } })
-        ]);
-        if (scheduleRes.ok && teamsRes.ok) {
-            const scheduleData = await scheduleRes.json();
-            const rankingsData = rankingsRes.ok ? await rankingsRes.json() : { rankings: [] };
-            const teamsData = await teamsRes.json();
-            const qualScoresData = qualScoresRes.ok ? await qualScoresRes.json() : { matchScores: [] };
-            const playoffScoresData = playoffScoresRes.ok ? await playoffScoresRes.json() : { matchScores: [] };
+        const bundle = await fetchEventBundle(eventCode, token);
+        if (bundle && bundle.schedule && bundle.teams) {
+            const scheduleData = bundle.schedule;
+            const rankingsData = bundle.rankings || { rankings: [] };
+            const teamsData = bundle.teams;
+            const qualScoresData = bundle.qualScores || { matchScores: [] };
+            const playoffScoresData = bundle.playoffScores || { matchScores: [] };
             currentMatches = scheduleData.schedule || [];
             currentMatches.sort((a, b) => getMatchStartTimestamp(a) - getMatchStartTimestamp(b));
             currentRankings = rankingsData.rankings || [];
@@ -3006,6 +3268,7 @@ async function handleLogin(event) {
         const data = await response.json();
         if (response.ok) {
             localStorage.setItem("token", data.token);
+            localStorage.setItem("refreshToken", data.refreshToken);
             loggedInTeamId = id;
             currentUserScopes = ["user"];
             isAdminAuthenticated = false;
@@ -3042,10 +3305,55 @@ function getRelativeTime(timestamp) {
         return `${Math.floor(diff / 3600)} hour${Math.floor(diff / 3600) !== 1 ? "s" : ""} ago`;
     return `${Math.floor(diff / 86400)} day${Math.floor(diff / 86400) !== 1 ? "s" : ""} ago`;
 }
+// every note this team has written, kept fresh by syncNotesMirror
+let notesMirror = new Map();
+let notesMirrorCursor = null;
+// one request for all notes saved since the last sync; false if the caller should fetch per team
+async function syncNotesMirror() {
+    const token = localStorage.getItem("token");
+    if (!token)
+        return false;
+    try {
+        const query = notesMirrorCursor === null ? "" : `?since=${notesMirrorCursor}`;
+        const response = await authFetch(`/api/v1/notes/bulk${query}`, {
+            headers: { "Authorization": `Bearer ${token}` }
+        });
+        if (!response.ok)
+            return false;
+        const lines = (await response.text()).split("\n").filter(line => line.trim() !== "");
+        let cursor = notesMirrorCursor ?? 0;
+        for (const line of lines) {
+            const entry = JSON.parse(line);
+            notesMirror.set(entry.subjectTeamId, {
+                autoPerformance: entry.autoPerformance,
+                teleopPerformance: entry.teleopPerformance,
+                generalNotes: entry.generalNotes,
+                updatedAt: entry.updatedAt
+            });
+            cursor = Math.max(cursor, entry.updatedAt);
+        }
+        notesMirrorCursor = cursor;
+        return true;
+    }
+    catch (error) {
+        console.error("Failed to sync notes:", error);
+        return false;
+    }
+}
+function emptyNote() {
+    return { autoPerformance: "", teleopPerformance: "", generalNotes: "", updatedAt: null };
+}
 async function loadNotesStatus() {
     const token = localStorage.getItem("token");
     if (!token)
         return;
+    if (await syncNotesMirror()) {
+        currentNotesStatus = {};
+        notesMirror.forEach((note, teamId) => {
+            currentNotesStatus[teamId] = note.updatedAt ?? undefined;
+        });
+        return;
+    }
     try {
         const response = await authFetch(`/api/v1/notes/list`, {
             headers: { "Authorization": `Bearer ${token}` }
@@ -3072,6 +3380,10 @@ async function loadNotesForTeams(teamIds) {
     const notesMap = new Map();
     if (!token)
         return notesMap;
+    if (await syncNotesMirror()) {
+        teamIds.forEach(teamId => notesMap.set(teamId, notesMirror.get(teamId) ?? emptyNote()));
+        return notesMap;
+    }
     try {
         const promises = teamIds.map(teamId => authFetch(`/api/v1/notes?team=${teamId}`, {
             headers: { "Authorization": `Bearer ${token}` }
@@ -3091,7 +3403,10 @@ async function loadNotesForTeams(teamIds) {
 async function loadNotes(teamId) {
     const token = localStorage.getItem("token");
     if (!token)
-        return { autoPerformance: "", teleopPerformance: "", generalNotes: "", updatedAt: null };
+        return emptyNote();
+    if (await syncNotesMirror()) {
+        return notesMirror.get(teamId) ?? emptyNote();
+    }
     try {
         const response = await authFetch(`/api/v1/notes?team=${teamId}`, {
             headers: { "Authorization": `Bearer ${token}` }
@@ -3104,7 +3419,7 @@ async function loadNotes(teamId) {
     catch (error) {
         console.error("Failed to load notes:", error);
     }
-    return { autoPerformance: "", teleopPerformance: "", generalNotes: "", updatedAt: null };
+    return emptyNote();
 }
 function isNoteStale(updatedAt) {
     if (!updatedAt || currentEventStartTimestamp === null)
@@ -3169,6 +3484,7 @@ async function saveNotes(teamId, notes) {
             }
             throw new Error("Save failed");
         }).then(data => {
+            notesMirror.set(teamId, { ...notes, updatedAt: data.updatedAt });
             currentNotesStatus[teamId] = isComplete ? data.updatedAt : undefined;
             updateTeamNoteStatus(teamId);
         }).catch(error => {
@@ -4521,6 +4837,63 @@ let strategyPhaseCache = new Map();
 let strategyEraserCursorEl = null;
 let strategyCurrentStroke = null;
 let strategyStrokes = [];
+// strokes the server has for each phase key, so saves only send what changed since
+let strategySavedStrokes = new Map();
+// newest updatedAt synced per event code; the next sync asks only for boards saved since
+let strategyMirrorCursors = new Map();
+// must match the stroke encoding in main.py (encode_strokes)
+const STROKE_FORMAT = 1;
+const STROKE_SCALE = 4096;
+const STROKE_WIDTH_SCALE = 65536;
+async function decodeStrategyStrokes(encoded) {
+    const compressed = Uint8Array.from(atob(encoded), c => c.charCodeAt(0));
+    const stream = new Blob([compressed]).stream().pipeThrough(new DecompressionStream("deflate"));
+    const data = new Uint8Array(await new Response(stream).arrayBuffer());
+    if (data[0] !== STROKE_FORMAT)
+        throw new Error(`unknown stroke format ${data[0]}`);
+    let offset = 1;
+    const readVarint = () => {
+        let value = 0;
+        let scale = 1;
+        while (true) {
+            const byte = data[offset++];
+            value += (byte & 0x7f) * scale;
+            if (byte < 0x80)
+                return value;
+            scale *= 128;
+        }
+    };
+    const readSigned = () => {
+        const zigzag = readVarint();
+        return zigzag % 2 ? -(zigzag + 1) / 2 : zigzag / 2;
+    };
+    const strokes = [];
+    while (offset < data.length) {
+        const flags = data[offset++];
+        let color;
+        if (flags & 2) {
+            const length = readVarint();
+            color = new TextDecoder().decode(data.subarray(offset, offset + length));
+            offset += length;
+        }
+        else {
+            color = "#" + Array.from(data.subarray(offset, offset + 3), b => b.toString(16).padStart(2, "0")).join("");
+            offset += 3;
+        }
+        const lineWidthFactor = readVarint() / STROKE_WIDTH_SCALE;
+        const count = readVarint();
+        const points = [];
+        let x = 0;
+        let y = 0;
+        for (let i = 0; i < count; i++) {
+            x += readSigned();
+            y += readSigned();
+            points.push({ x: x / STROKE_SCALE, y: y / STROKE_SCALE });
+        }
+        strokes.push({ points, color, isEraser: (flags & 1) !== 0, lineWidthFactor });
+    }
+    return strokes;
+}
 function getStrategyPhaseKey(match, phase) {
     return `${currentEventCode}_${match.description}_${phase}`;
 }
@@ -4890,12 +5263,11 @@ function collectRobotsData() {
     });
     return JSON.stringify(data);
 }
-function restoreRobotsFromData(robotsDataStr, match, phase) {
+function restoreRobotsFromData(robotsDataStr, phaseKey) {
     if (!robotsDataStr)
         return;
     try {
         const data = JSON.parse(robotsDataStr);
-        const phaseKey = getStrategyPhaseKey(match, phase);
         Object.entries(data).forEach(([robotId, state]) => {
             strategyRobotStates.set(`${phaseKey}_${robotId}`, state);
         });
@@ -5111,8 +5483,10 @@ async function loadStrategyFromBackend(match, phase) {
     const token = localStorage.getItem("token");
     if (!token || !currentEventCode)
         return;
+    // the compact encoding is a fraction of the JSON size, but needs DecompressionStream to read
+    const compact = typeof DecompressionStream !== "undefined";
     try {
-        const res = await authFetch(`/api/v1/strategy?event=${encodeURIComponent(currentEventCode)}&match=${match.matchNumber}&description=${encodeURIComponent(match.description)}&phase=${phase}`, {
+        const res = await authFetch(`/api/v1/strategy?event=${encodeURIComponent(currentEventCode)}&match=${match.matchNumber}&description=${encodeURIComponent(match.description)}&phase=${phase}${compact ? "&format=compact" : ""}`, {
             headers: { "Authorization": `Bearer ${token}` }
         });
         if (!res.ok)
@@ -5121,26 +5495,76 @@ async function loadStrategyFromBackend(match, phase) {
         const strategy = data.strategy;
         if (!strategy)
             return;
-        const key = getStrategyPhaseKey(match, phase);
-        let strokes = [];
-        if (strategy.strokes) {
-            try {
-                strokes = typeof strategy.strokes === "string" ? JSON.parse(strategy.strokes) : strategy.strokes;
-            }
-            catch {
-                strokes = [];
-            }
+        await applyStrategyFromBackend(getStrategyPhaseKey(match, phase), strategy);
+    }
+    catch (e) {
+        console.error("Failed to load strategy:", e);
+    }
+}
+async function applyStrategyFromBackend(key, strategy) {
+    let strokes = [];
+    let decoded = true;
+    try {
+        if (strategy.strokesEncoded) {
+            strokes = await decodeStrategyStrokes(strategy.strokesEncoded);
         }
-        if (strokes.length > 0 || strategy.robotsData) {
-            strategyPhaseCache.set(key, {
-                strokes: strokes,
-                robotsData: strategy.robotsData
-            });
-            restoreRobotsFromData(strategy.robotsData, match, phase);
+        else if (strategy.strokes) {
+            strokes = typeof strategy.strokes === "string" ? JSON.parse(strategy.strokes) : strategy.strokes;
         }
     }
+    catch {
+        strokes = [];
+        decoded = false;
+    }
+    if (decoded) {
+        strategySavedStrokes.set(key, strokes);
+    }
+    if (strokes.length > 0 || strategy.robotsData) {
+        strategyPhaseCache.set(key, {
+            strokes: strokes,
+            robotsData: strategy.robotsData
+        });
+        restoreRobotsFromData(strategy.robotsData, key);
+    }
+}
+function hasUnsavedStrategyStrokes(key) {
+    const cached = strategyPhaseCache.get(key)?.strokes ?? [];
+    const saved = strategySavedStrokes.get(key) ?? [];
+    return cached.length !== saved.length || cached.some((stroke, i) => stroke !== saved[i]);
+}
+// brings every saved board of the current event into strategyPhaseCache with one request,
+// asking only for boards saved since the last sync; false if the caller should load per phase
+async function syncStrategyMirror() {
+    const token = localStorage.getItem("token");
+    if (!token || !currentEventCode)
+        return false;
+    const eventCode = currentEventCode;
+    const params = new URLSearchParams();
+    const cursor = strategyMirrorCursors.get(eventCode);
+    if (cursor !== undefined)
+        params.set("updatedSince", String(cursor));
+    if (typeof DecompressionStream !== "undefined")
+        params.set("format", "compact");
+    try {
+        const res = await authFetch(`/api/v1/strategy/event/${encodeURIComponent(eventCode)}?${params}`, {
+            headers: { "Authorization": `Bearer ${token}` }
+        });
+        if (!res.ok)
+            return false;
+        const data = await res.json();
+        for (const strategy of data.strategies) {
+            const key = `${eventCode}_${strategy.matchDescription}_${strategy.phase}`;
+            // a save of this board may still be on its way; the local copy is newer
+            if (hasUnsavedStrategyStrokes(key))
+                continue;
+            await applyStrategyFromBackend(key, strategy);
+        }
+        strategyMirrorCursors.set(eventCode, data.cursor);
+        return true;
+    }
     catch (e) {
-        console.error("Failed to load strategy:", e);
+        console.error("Failed to sync strategy:", e);
+        return false;
     }
 }
 function saveStrategyToBackend() {
@@ -5150,21 +5574,56 @@ function saveStrategyToBackend() {
     if (!token)
         return;
     const robotsData = collectRobotsData();
-    authFetch("/api/v1/strategy", {
-        method: "POST",
-        headers: {
-            "Authorization": `Bearer ${token}`,
-            "Content-Type": "application/json"
-        },
-        body: JSON.stringify({
-            eventCode: currentEventCode,
-            matchNumber: strategyCurrentMatch.matchNumber,
-            matchDescription: strategyCurrentMatch.description,
-            phase: strategyCurrentPhase,
-            strokes: strategyStrokes,
-            robotsData: robotsData
-        })
-    }).catch(e => console.error("Failed to save strategy:", e));
+    const key = getStrategyPhaseKey(strategyCurrentMatch, strategyCurrentPhase);
+    const strokes = [...strategyStrokes];
+    const saved = strategySavedStrokes.get(key);
+    const board = {
+        eventCode: currentEventCode,
+        matchNumber: strategyCurrentMatch.matchNumber,
+        matchDescription: strategyCurrentMatch.description,
+        phase: strategyCurrentPhase
+    };
+    const headers = {
+        "Authorization": `Bearer ${token}`,
+        "Content-Type": "application/json"
+    };
+    const save = async () => {
+        if (saved) {
+            // strokes are only ever appended or cleared, so only the tail past the shared prefix changed
+            let kept = 0;
+            while (kept < saved.length && kept < strokes.length && saved[kept] === strokes[kept])
+                kept++;
+            const res = await authFetch("/api/v1/strategy", {
+                method: "PATCH",
+                headers,
+                body: JSON.stringify({
+                    ...board,
+                    baseCount: saved.length,
+                    erase: saved.length - kept,
+                    append: strokes.slice(kept),
+                    robotsData: robotsData
+                })
+            });
+            if (res.ok) {
+                strategySavedStrokes.set(key, strokes);
+                return;
+            }
+            // the board changed elsewhere since it was loaded; send all of it instead
+        }
+        const res = await authFetch("/api/v1/strategy", {
+            method: "POST",
+            headers,
+            body: JSON.stringify({
+                ...board,
+                strokes: strokes,
+                robotsData: robotsData
+            })
+        });
+        if (res.ok) {
+            strategySavedStrokes.set(key, strokes);
+        }
+    };
+    save().catch(e => console.error("Failed to save strategy:", e));
 }
 function scheduleStrategySave() {
     if (strategyAutoSaveTimeout) {
@@ -5195,11 +5654,18 @@ async function openStrategyBoard(match) {
     await loadFieldImage();
     resizeStrategyCanvases();
     // Load all three phases from backend
-    await Promise.all([
-        loadStrategyFromBackend(match, "auto"),
-        loadStrategyFromBackend(match, "teleop"),
-        loadStrategyFromBackend(match, "endgame")
-    ]);
+    const phases = ["auto", "teleop", "endgame"];
+    if (await syncStrategyMirror()) {
+        // boards missing from the mirror have never been saved
+        for (const phase of phases) {
+            const key = getStrategyPhaseKey(match, phase);
+            if (!strategySavedStrokes.has(key))
+                strategySavedStrokes.set(key, []);
+        }
+    }
+    else {
+        await Promise.all(phases.map(phase => loadStrategyFromBackend(match, phase)));
+    }
     restorePhaseDrawing();
     initStrategyDrawing();
 }
@@ -5428,7 +5894,18 @@ function handleLogout() {
     stopScheduleOffsetSync();
     stopRealtimeEventSync();
     closeScheduleOffsetMenu();
+    const refreshToken = localStorage.getItem("refreshToken");
+    if (refreshToken) {
+        fetch(buildApiUrl("/api/v1/token/revoke"), {
+            method: "POST",
+            headers: {
+                "Content-Type": "application/json"
+            },
+            body: JSON.stringify({ refreshToken })
+        }).catch(() => { });
+    }
     localStorage.removeItem("token");
+    localStorage.removeItem("refreshToken");
     loggedInTeamId = null;
     currentMatches = [];
     currentRankings = [];
@@ -5438,6 +5915,8 @@ function handleLogout() {
     currentEventEndTimestamp = null;
     currentOPRData = new Map();
     currentNotesStatus = {};
+    notesMirror = new Map();
+    notesMirrorCursor = null;
     currentSelectedMatch = null;
     currentSelectedNotesTeam = null;
     currentInsightsTeam = null;
@@ -5621,6 +6100,25 @@ window.addEventListener("popstate", async (event) => {
     }
 });
 document.addEventListener("DOMContentLoaded", async () => {
+    if (IS_CAPACITOR) {
+        const link = document.getElementById("login-register-link");
+        if (link) {
+            link.addEventListener("click", (e) => {
+                e.preventDefault();
+                window.open("https://ftcvanguard.org/register", "_blank");
+            });
+        }
+        // Desktop nav buttons (back/forward)
+        if (!IS_NATIVE_MOBILE) {
+            document.body.classList.add("capacitor-desktop");
+            const backBtn = document.getElementById("cap-back-btn");
+            const forwardBtn = document.getElementById("cap-forward-btn");
+            if (backBtn)
+                backBtn.addEventListener("click", () => history.back());
+            if (forwardBtn)
+                forwardBtn.addEventListener("click", () => history.forward());
+        }
+    }
     // Mobile menu initialization
     const mobileMenuBtn = document.getElementById("mobile-menu-btn");
     const sidebarOverlay = document.getElementById("sidebar-overlay");
@@ -5759,6 +6257,7 @@ document.addEventListener("DOMContentLoaded", async () => {
         }
         else {
             localStorage.removeItem("token");
+            localStorage.removeItem("refreshToken");
             showLogin();
         }
     }
@@ -5776,12 +6275,16 @@ window.deleteNote = deleteNote;
 window.sendNotification = sendNotification;
 window.clearNotificationHistory = clearNotificationHistory;
 window.vacuumDatabase = vacuumDatabase;
+window.backupDatabase = backupDatabase;
 window.switchAdminSection = switchAdminSection;
 window.switchSettingsSection = switchSettingsSection;
 window.showPasswordChangeModal = showPasswordChangeModal;
 window.closePasswordChangeModal = closePasswordChangeModal;
 window.handlePasswordChange = handlePasswordChange;
 window.loadAdminRegistrations = loadAdminRegistrations;
+window.loadMoreAdminRegistrations = loadMoreAdminRegistrations;
+window.loadMoreAdminNotes = loadMoreAdminNotes;
+window.loadMoreAdminUsers = loadMoreAdminUsers;
 window.approveRegistration = approveRegistration;
 window.denyRegistration = denyRegistration;
 window.searchNotes = searchNotes;
@@ -0,0 +1,201 @@
+"""
+Whether an online backup slows down saves. Grows the sandbox database to
+--size-mb with strategy boards, then runs the same tablet load as
+tests/benchmark.py twice: once idle and once while backups (POST
+/api/v1/admin/database/backup) run back to back.
+
+    python tests/backup_benchmark.py --size-mb 1024 --tablets 32 --duration 60 --output backup.json
+
+The target is that p99 of note and strategy saves does not measurably change.
+"""
+
+from benchmark import PASSWORD, SAVE_ROUTES, Tablet, summarize
+from sandbox import FIRST_TEAM, REPO_DIR, FakeFtcApi, create_sandbox, start_server, stop_server
+import argparse
+import json
+import os
+import pyotp
+import random
+import requests
+import sqlite3
+import sys
+import threading
+import time
+
+sys.path.insert(0, REPO_DIR)
+from migrations import DEFAULT_DB_PATH, migrate_databases  # noqa: E402
+
+ADMIN_SECRET = "JBSWY3DPEHPK3PXP"
+BOARD_BYTES = 8192
+
+
+def grow_database(path: str, size_mb: int):
+    # boards of teams nobody logs in as, with incompressible strokes so the pages are all real
+    db = sqlite3.connect(path)
+    boards = size_mb * 1024 * 1024 // BOARD_BYTES
+    now = int(time.time())
+    db.executemany(
+        """INSERT INTO strategy (team_id, event_code, match_number, match_description, phase, stroke_data, stroke_count, updated_at)
+           VALUES (?, 'FILL', ?, ?, 'auto', ?, 1, ?)""",
+        (
+            (FIRST_TEAM + 1000 + index // 1000, index % 1000, f"Match {index % 1000}", os.urandom(BOARD_BYTES), now)
+            for index in range(boards)
+        ),
+    )
+    db.commit()
+    db.close()
+
+
+def run_tablets(tablets: list[Tablet], duration: float, warmup: float) -> list[tuple]:
+    for tablet in tablets:
+        tablet.samples = []
+    measure_from = time.monotonic() + warmup
+    stop_at = measure_from + duration
+    threads = [
+        threading.Thread(target=tablet.run, args=(stop_at,), daemon=True)
+        for tablet in tablets
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [
+        sample
+        for tablet in tablets
+        for sample in tablet.samples
+        if sample[0] >= measure_from
+    ]
+
+
+def keep_backing_up(base_url: str, token: str, stop: threading.Event, finished: list[dict]):
+    headers = {"Authorization": f"Bearer {token}"}
+    while not stop.is_set():
+        r = requests.post(f"{base_url}/api/v1/admin/database/backup", headers=headers, timeout=30)
+        if r.status_code not in (202, 409):
+            r.raise_for_status()
+        backup_id = r.json().get("backup", {}).get("id")
+        while not stop.is_set():
+            time.sleep(0.5)
+            backups = requests.get(
+                f"{base_url}/api/v1/admin/database/backups", headers=headers, timeout=30
+            ).json()["backups"]
+            latest = next((b for b in backups if b["id"] == backup_id), None)
+            if latest is None or latest["finishedAt"]:
+                if latest:
+                    finished.append(latest)
+                break
+
+
+def save_stats(routes: dict) -> dict:
+    return {route: stats for route, stats in routes.items() if route in SAVE_ROUTES}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Online backup latency benchmark")
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--tablets", type=int, default=32)
+    parser.add_argument("--teams", type=int, default=12, help="teams the tablets log in as")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of load per phase")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds not measured")
+    parser.add_argument("--think", type=float, default=1.0, help="mean seconds between actions")
+    parser.add_argument("--poll", type=float, default=5.0, help="seconds between bundle polls")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--sandbox", help="directory to build the sandbox in")
+    parser.add_argument("--backup-settings", default="", help="extra [backup] settings, e.g. 'compress = true'")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    fake_api = FakeFtcApi(latency_ms=80, port=args.port + 1)
+    # only the benchmark starts backups
+    extra_settings = f"[backup]\ninterval = 0\n{args.backup_settings}\n"
+    sandbox = create_sandbox(fake_api.start(), args.sandbox, extra_settings)
+    print(f"sandbox: {sandbox}")
+    os.chdir(sandbox)
+    migrate_databases(DEFAULT_DB_PATH, "data/cache.db")
+    started = time.perf_counter()
+    grow_database(DEFAULT_DB_PATH, args.size_mb)
+    print(
+        f"database is {os.path.getsize(DEFAULT_DB_PATH) / 1024 / 1024:.0f} MiB "
+        f"({time.perf_counter() - started:.0f} s to fill)"
+    )
+
+    server = start_server(sandbox, args.port, args.workers)
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        team_ids = fake_api.team_numbers[: args.teams]
+        for team_id in team_ids:
+            requests.post(
+                f"{base_url}/api/v1/register",
+                json={"id": team_id, "email": "", "password": PASSWORD},
+                timeout=30,
+            )
+        tablets = [
+            Tablet(base_url, team_ids[i % len(team_ids)], fake_api.team_numbers, args)
+            for i in range(args.tablets)
+        ]
+
+        r = requests.post(
+            f"{base_url}/api/v1/login",
+            json={"id": FIRST_TEAM, "password": PASSWORD},
+            timeout=30,
+        )
+        r = requests.get(
+            f"{base_url}/api/v1/admin/login",
+            params={"otp": pyotp.TOTP(ADMIN_SECRET).now()},
+            headers={"Authorization": f"Bearer {r.json()['token']}"},
+            timeout=30,
+        )
+        admin_token = r.json()["token"]
+
+        idle = summarize(run_tablets(tablets, args.duration, args.warmup), args.duration)
+
+        stop = threading.Event()
+        backups = []
+        backing_up = threading.Thread(
+            target=keep_backing_up, args=(base_url, admin_token, stop, backups), daemon=True
+        )
+        backing_up.start()
+        during = summarize(run_tablets(tablets, args.duration, args.warmup), args.duration)
+        stop.set()
+        backing_up.join()
+    finally:
+        stop_server(server)
+
+    print(
+        f"{'route':<28} {'count':>6} {'idle p50':>9} {'p99':>8} "
+        f"{'count':>6} {'backup p50':>11} {'p99':>8} {'p99 change':>11}"
+    )
+    for route in list(SAVE_ROUTES) + ["total"]:
+        before, after = idle.get(route), during.get(route)
+        if not before or not after:
+            continue
+        change = (after["p99"] - before["p99"]) / before["p99"] * 100 if before["p99"] else 0
+        print(
+            f"{route:<28} {before['count']:>6} {before['p50']:>9.1f} {before['p99']:>8.1f} "
+            f"{after['count']:>6} {after['p50']:>11.1f} {after['p99']:>8.1f} {change:>+10.0f}%"
+        )
+    completed = [b for b in backups if not b["error"]]
+    for backup in completed:
+        print(
+            f"backup {backup['id']}: {backup['bytes'] / 1024 / 1024:.0f} MiB "
+            f"in {backup['finishedAt'] - backup['startedAt']:.1f} s"
+        )
+    failed = [b for b in backups if b["error"]]
+    if failed:
+        print(f"{len(failed)} backups failed: {failed[0]['error']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "config": vars(args),
+                    "idle": save_stats(idle) | {"total": idle["total"]},
+                    "duringBackup": save_stats(during) | {"total": during["total"]},
+                    "backups": backups,
+                },
+                f,
+                indent=2,
+            )
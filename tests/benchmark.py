@@ -0,0 +1,407 @@
+"""
+Event-day load benchmark. Starts main.py under gunicorn against a synthetic FTC
+API (tests/sandbox.py) and drives it with simulated scouting tablets: each one
+logs in, polls the event bundle, reads and saves notes and strategy, and looks
+up teams.
+
+    python tests/benchmark.py --tablets 48 --duration 60 --output before.json
+    python tests/benchmark.py --tablets 48 --duration 60 --compare before.json
+
+Per-route p50/p95/p99 latency (ms), throughput and error rate are printed and,
+with --output, written as JSON.
+"""
+
+from sandbox import EVENT_CODE, FakeFtcApi, create_sandbox, start_server, stop_server
+import argparse
+import json
+import os
+import random
+import requests
+import sqlite3
+import subprocess
+import threading
+import time
+
+PASSWORD = "benchmark-password"
+
+# relative weight of what a tablet does between bundle polls
+ACTIONS = {
+    "GET /api/v1/notes": 20,
+    "POST /api/v1/notes": 12,
+    "GET /api/v1/notes/list": 4,
+    "GET /api/v1/notes/bulk": 2,
+    "GET /api/v1/strategy": 8,
+    "GET /api/v1/strategy/event/<code>": 2,
+    "POST /api/v1/strategy": 2,
+    "PATCH /api/v1/strategy": 6,
+    "GET /api/v1/rankings": 8,
+    "GET /api/v1/team/<team>": 4,
+    "GET /api/v1/team/<team>/events": 4,
+    "POST /api/v1/token/refresh": 2,
+    "POST /api/v1/login": 1,
+}
+SAVE_ROUTES = ("POST /api/v1/notes", "POST /api/v1/strategy", "PATCH /api/v1/strategy")
+
+
+def percentile(latencies: list[float], fraction: float) -> float:
+    index = max(0, int(round(fraction * len(latencies))) - 1)
+    return latencies[index]
+
+
+class Tablet:
+    def __init__(self, base_url: str, team_id: int, team_numbers: list[int], args):
+        self.base_url = base_url
+        self.team_id = team_id
+        self.team_numbers = team_numbers
+        self.args = args
+        self.session = requests.Session()
+        self.rng = random.Random(team_id * 1000 + id(self) % 1000)
+        self.token = None
+        self.refresh_token = None
+        self.versions = {}
+        # stroke count the server has for each strategy board this tablet saved
+        self.boards = {}
+        self.notes_cursor = 0
+        self.strategy_cursor = 0
+        self.samples = []
+
+    def call(self, route: str, method: str, path: str, **kwargs) -> requests.Response | None:
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        started = time.perf_counter()
+        try:
+            r = self.session.request(
+                method, self.base_url + path, headers=headers, timeout=30, **kwargs
+            )
+        except requests.RequestException:
+            r = None
+        elapsed = (time.perf_counter() - started) * 1000
+        ok = r is not None and r.status_code < 400
+        self.samples.append((time.monotonic(), route, elapsed, ok))
+        return r
+
+    def login(self):
+        r = self.call(
+            "POST /api/v1/login",
+            "POST",
+            "/api/v1/login",
+            json={"id": self.team_id, "password": PASSWORD},
+        )
+        if r is not None and r.status_code == 200:
+            self.token = r.json()["token"]
+            self.refresh_token = r.json().get("refreshToken")
+
+    def refresh(self):
+        if not self.refresh_token:
+            return self.login()
+        r = self.call(
+            "POST /api/v1/token/refresh",
+            "POST",
+            "/api/v1/token/refresh",
+            json={"refreshToken": self.refresh_token},
+        )
+        if r is not None and r.status_code == 200:
+            self.token = r.json()["token"]
+            # each refresh replaces the refresh token
+            self.refresh_token = r.json().get("refreshToken", self.refresh_token)
+        elif r is not None and r.status_code == 401:
+            self.refresh_token = None
+
+    def poll_bundle(self):
+        since = ",".join(self.versions.values())
+        r = self.call(
+            "GET /api/v1/event/<code>/bundle",
+            "GET",
+            f"/api/v1/event/{EVENT_CODE}/bundle?since={since}",
+        )
+        if r is not None and r.status_code == 200:
+            for name, section in r.json()["sections"].items():
+                self.versions[name] = section["version"]
+
+    def stroke(self) -> dict:
+        x, y = self.rng.random(), self.rng.random()
+        points = []
+        for _ in range(self.rng.randint(10, 80)):
+            x += self.rng.uniform(-0.01, 0.01)
+            y += self.rng.uniform(-0.01, 0.01)
+            points.append({"x": x, "y": y})
+        return {
+            "points": points,
+            "color": "#ff0000",
+            "isEraser": self.rng.random() < 0.1,
+            "lineWidthFactor": 0.005,
+        }
+
+    def act(self, route: str):
+        subject = self.rng.choice(self.team_numbers)
+        match_number = self.rng.randint(1, 60)
+        strategy_args = {
+            "event": EVENT_CODE,
+            "match": match_number,
+            "description": f"Qualification {match_number}",
+            "phase": self.rng.choice(("auto", "teleop", "endgame")),
+        }
+        if route == "GET /api/v1/notes":
+            self.call(route, "GET", "/api/v1/notes", params={"team": subject})
+        elif route == "POST /api/v1/notes":
+            self.call(
+                route,
+                "POST",
+                "/api/v1/notes",
+                json={
+                    "subjectTeamId": subject,
+                    "autoPerformance": "scored preload " * self.rng.randint(1, 5),
+                    "teleopPerformance": "cycles fast " * self.rng.randint(1, 20),
+                    "generalNotes": "reliable drivetrain " * self.rng.randint(0, 10),
+                },
+            )
+        elif route == "GET /api/v1/notes/list":
+            self.call(route, "GET", "/api/v1/notes/list")
+        elif route == "GET /api/v1/notes/bulk":
+            r = self.call(
+                route, "GET", "/api/v1/notes/bulk", params={"since": self.notes_cursor}
+            )
+            if r is not None and r.status_code == 200:
+                self.notes_cursor = int(r.headers["X-Vanguard-Cursor"])
+        elif route == "GET /api/v1/strategy":
+            self.call(route, "GET", "/api/v1/strategy", params=strategy_args)
+        elif route == "GET /api/v1/strategy/event/<code>":
+            r = self.call(
+                route,
+                "GET",
+                f"/api/v1/strategy/event/{EVENT_CODE}",
+                params={"format": "compact", "updatedSince": self.strategy_cursor},
+            )
+            if r is not None and r.status_code == 200:
+                self.strategy_cursor = r.json()["cursor"]
+        elif route in ("POST /api/v1/strategy", "PATCH /api/v1/strategy"):
+            # appends go to a board this tablet already drew on, like the autosave does
+            key = (match_number, strategy_args["phase"])
+            if route == "PATCH /api/v1/strategy" and self.boards:
+                key = self.rng.choice(list(self.boards))
+            board = {
+                "eventCode": EVENT_CODE,
+                "matchNumber": key[0],
+                "matchDescription": f"Qualification {key[0]}",
+                "phase": key[1],
+                "robotsData": None,
+            }
+            if route == "PATCH /api/v1/strategy" and key in self.boards:
+                r = self.call(
+                    route,
+                    "PATCH",
+                    "/api/v1/strategy",
+                    json=board
+                    | {
+                        "baseCount": self.boards[key],
+                        "append": [self.stroke()],
+                    },
+                )
+            else:
+                r = self.call(
+                    "POST /api/v1/strategy",
+                    "POST",
+                    "/api/v1/strategy",
+                    json=board
+                    | {"strokes": [self.stroke() for _ in range(self.rng.randint(1, 6))]},
+                )
+            if r is not None and r.status_code == 200:
+                self.boards[key] = r.json()["strokeCount"]
+            else:
+                self.boards.pop(key, None)
+        elif route == "GET /api/v1/rankings":
+            self.call(route, "GET", "/api/v1/rankings", params={"event": EVENT_CODE})
+        elif route == "GET /api/v1/team/<team>":
+            self.call(route, "GET", f"/api/v1/team/{subject}")
+        elif route == "GET /api/v1/team/<team>/events":
+            self.call(route, "GET", f"/api/v1/team/{subject}/events")
+        elif route == "POST /api/v1/token/refresh":
+            self.refresh()
+        elif route == "POST /api/v1/login":
+            self.login()
+
+    def run(self, stop_at: float):
+        self.login()
+        self.poll_bundle()
+        next_poll = time.monotonic() + self.args.poll
+        routes = list(ACTIONS)
+        weights = list(ACTIONS.values())
+        while time.monotonic() < stop_at:
+            time.sleep(self.rng.expovariate(1 / self.args.think))
+            if time.monotonic() >= next_poll:
+                self.poll_bundle()
+                next_poll += self.args.poll
+            else:
+                self.act(self.rng.choices(routes, weights)[0])
+
+
+def summarize(samples: list[tuple], duration: float) -> dict:
+    by_route = {}
+    for _, route, elapsed, ok in samples:
+        by_route.setdefault(route, []).append((elapsed, ok))
+    by_route["total"] = [(elapsed, ok) for _, _, elapsed, ok in samples]
+
+    routes = {}
+    for route, results in sorted(by_route.items()):
+        latencies = sorted(elapsed for elapsed, _ in results)
+        errors = sum(1 for _, ok in results if not ok)
+        routes[route] = {
+            "count": len(results),
+            "rps": round(len(results) / duration, 2),
+            "errorRate": round(errors / len(results), 4),
+            "p50": round(percentile(latencies, 0.50), 2),
+            "p95": round(percentile(latencies, 0.95), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "max": round(latencies[-1], 2),
+        }
+    return routes
+
+
+def print_report(routes: dict, baseline: dict | None = None):
+    print(
+        f"{'route':<36} {'count':>7} {'rps':>8} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}"
+    )
+    for route, stats in routes.items():
+        line = (
+            f"{route:<36} {stats['count']:>7} {stats['rps']:>8.1f} "
+            f"{stats['errorRate'] * 100:>6.2f} {stats['p50']:>8.1f} "
+            f"{stats['p95']:>8.1f} {stats['p99']:>8.1f}"
+        )
+        before = (baseline or {}).get(route)
+        if before and before["p95"]:
+            change = (stats["p95"] - before["p95"]) / before["p95"] * 100
+            line += f"   p95 {change:+.0f}% vs {before['p95']:.1f}"
+        print(line)
+
+
+def read_counters(sandbox: str) -> dict[str, int]:
+    # workers flush their counters every few seconds and on exit
+    path = os.path.join(sandbox, "data", "cache.db")
+    if not os.path.exists(path):
+        return {}
+    cache_db = sqlite3.connect(path, timeout=5)
+    rows = cache_db.execute(
+        "SELECT name, value FROM metrics WHERE name LIKE 'db.%' OR name LIKE 'write_queue.%'"
+    ).fetchall()
+    cache_db.close()
+    return dict(rows)
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Event-day load benchmark")
+    parser.add_argument("--tablets", type=int, default=48)
+    parser.add_argument("--teams", type=int, default=12, help="teams the tablets log in as")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of load")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds not measured")
+    parser.add_argument("--think", type=float, default=1.0, help="mean seconds between actions")
+    parser.add_argument("--poll", type=float, default=5.0, help="seconds between bundle polls")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--worker-class", default="gevent")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--api-latency", type=float, default=80, help="fake FTC API delay in ms")
+    parser.add_argument("--api-url", help="use this FTC API (e.g. tests/replay.py) instead of the fake one")
+    parser.add_argument("--sandbox", help="directory to build the sandbox in")
+    parser.add_argument(
+        "--write-queue",
+        action="store_true",
+        help="enable [database] write_queue (group commits for note and strategy saves)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="JSON results to compare p95 against")
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    fake_api = FakeFtcApi(latency_ms=args.api_latency, port=args.port + 1)
+    api_url = args.api_url or fake_api.start()
+    extra_settings = "[database]\nwrite_queue = true\n" if args.write_queue else ""
+    sandbox = create_sandbox(api_url, args.sandbox, extra_settings)
+    print(f"sandbox: {sandbox}")
+    server = start_server(sandbox, args.port, args.workers, args.worker_class)
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        team_ids = fake_api.team_numbers[: args.teams]
+        for team_id in team_ids:
+            requests.post(
+                f"{base_url}/api/v1/register",
+                json={"id": team_id, "email": "", "password": PASSWORD},
+                timeout=30,
+            )
+
+        tablets = [
+            Tablet(base_url, team_ids[i % len(team_ids)], fake_api.team_numbers, args)
+            for i in range(args.tablets)
+        ]
+        registered = read_counters(sandbox)
+        started = time.monotonic()
+        measure_from = started + args.warmup
+        stop_at = measure_from + args.duration
+        threads = [
+            threading.Thread(target=tablet.run, args=(stop_at,), daemon=True)
+            for tablet in tablets
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        stop_server(server)
+
+    samples = [
+        sample
+        for tablet in tablets
+        for sample in tablet.samples
+        if sample[0] >= measure_from
+    ]
+    routes = summarize(samples, args.duration)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["routes"]
+    print_report(routes, baseline)
+    print(f"fake FTC API requests: {fake_api.requests}")
+
+    # counters cover warmup as well as the measured window
+    counters = read_counters(sandbox)
+    database = {
+        name: value - registered.get(name, 0)
+        for name, value in sorted(counters.items())
+    }
+    elapsed = args.warmup + args.duration
+    writes = sum(
+        stats["count"]
+        for route, stats in routes.items()
+        if route in SAVE_ROUTES
+    )
+    print(
+        f"note/strategy saves: {writes / args.duration:.1f}/s, "
+        f"commits: {database.get('db.commits', 0) / elapsed:.1f}/s, "
+        f"queued writes coalesced: {database.get('write_queue.coalesced', 0)}"
+    )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "commit": git_commit(),
+                    "recordedAt": int(time.time()),
+                    "config": vars(args),
+                    "upstreamRequests": fake_api.requests,
+                    "database": database,
+                    "routes": routes,
+                },
+                f,
+                indent=2,
+            )
@@ -0,0 +1,77 @@
+"""
+Picks argon2 parameters for this host: the most memory (up to --max-memory-mib)
+and the fewest passes that still make one hash take about --target-ms.
+Prints a [passwords] block for data/settings.toml.
+
+    python tests/calibrate_argon2.py --target-ms 250
+
+Stored hashes made with other parameters are upgraded on the user's next login.
+"""
+
+from argon2 import PasswordHasher
+import argparse
+import os
+import statistics
+import time
+
+
+def measure(time_cost: int, memory_cost: int, parallelism: int, samples: int) -> float:
+    ph = PasswordHasher(
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+    )
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        ph.hash("correct horse battery staple")
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate argon2 parameters")
+    parser.add_argument("--target-ms", type=float, default=250)
+    parser.add_argument("--max-memory-mib", type=int, default=64)
+    parser.add_argument("--min-memory-mib", type=int, default=19)
+    parser.add_argument("--parallelism", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--max-time-cost", type=int, default=10)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument(
+        "--pool-workers",
+        type=int,
+        default=2,
+        help="[passwords] workers, to estimate peak memory",
+    )
+    parser.add_argument("--gunicorn-workers", type=int, default=4)
+    args = parser.parse_args()
+
+    # start from the most memory allowed; memory hardness matters more than passes
+    memory_mib = args.max_memory_mib
+    while True:
+        elapsed = measure(1, memory_mib * 1024, args.parallelism, args.samples)
+        print(f"m={memory_mib} MiB t=1: {elapsed:.0f} ms")
+        if elapsed <= args.target_ms or memory_mib <= args.min_memory_mib:
+            break
+        memory_mib = max(args.min_memory_mib, memory_mib // 2)
+
+    time_cost = 1
+    while time_cost < args.max_time_cost:
+        next_elapsed = measure(
+            time_cost + 1, memory_mib * 1024, args.parallelism, args.samples
+        )
+        print(f"m={memory_mib} MiB t={time_cost + 1}: {next_elapsed:.0f} ms")
+        if next_elapsed > args.target_ms:
+            break
+        time_cost += 1
+        elapsed = next_elapsed
+
+    peak_mib = memory_mib * args.pool_workers * args.gunicorn_workers
+    print()
+    print(
+        f"# ~{elapsed:.0f} ms per hash; up to {peak_mib} MiB while "
+        f"{args.pool_workers * args.gunicorn_workers} hashes run at once"
+    )
+    print("[passwords]")
+    print(f"time_cost = {time_cost}")
+    print(f"memory_cost = {memory_mib * 1024}")
+    print(f"parallelism = {args.parallelism}")
+    print(f"workers = {args.pool_workers}")
@@ -0,0 +1,68 @@
+"""
+Sign/verify cost of each token signing algorithm main.py supports, with the
+same claims the login endpoints issue.
+
+    python tests/jwt_benchmark.py --iterations 2000 --output jwt.json
+"""
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+import argparse
+import json
+import jwt
+import time
+
+ALGORITHMS = {
+    "RS256 (4096-bit)": (
+        "RS256",
+        lambda: rsa.generate_private_key(public_exponent=65537, key_size=4096),
+    ),
+    "RS256 (2048-bit)": (
+        "RS256",
+        lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    ),
+    "ES256": ("ES256", lambda: ec.generate_private_key(ec.SECP256R1())),
+    "EdDSA": ("EdDSA", ed25519.Ed25519PrivateKey.generate),
+}
+
+
+def measure(operation, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        operation()
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JWT sign/verify microbenchmark")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    claims = {"id": 26855, "scope": ["user"], "exp": int(time.time()) + 86400}
+    results = {}
+    print(f"{'algorithm':<18} {'sign us':>10} {'verify us':>10} {'token bytes':>12}")
+    for name, (algorithm, generate) in ALGORITHMS.items():
+        private_key = generate()
+        public_key = private_key.public_key()
+        headers = {"kid": "benchmark"}
+        token = jwt.encode(claims, private_key, algorithm=algorithm, headers=headers)
+
+        sign_us = measure(
+            lambda: jwt.encode(claims, private_key, algorithm=algorithm, headers=headers),
+            args.iterations,
+        )
+        verify_us = measure(
+            lambda: jwt.decode(token, public_key, algorithms=[algorithm]),
+            args.iterations,
+        )
+        results[name] = {
+            "algorithm": algorithm,
+            "signMicroseconds": round(sign_us, 1),
+            "verifyMicroseconds": round(verify_us, 1),
+            "tokenBytes": len(token),
+        }
+        print(f"{name:<18} {sign_us:>10.1f} {verify_us:>10.1f} {len(token):>12}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"iterations": args.iterations, "results": results}, f, indent=2)
@@ -0,0 +1,254 @@
+"""
+Checks that the queries in main.py are backed by indexes. Every statement
+passed to execute(), executemany() or write_upsert(), every page the admin
+lists can ask fetch_page() for and every retention rule's delete is run
+through EXPLAIN QUERY PLAN against databases built by migrations.py. Exits with 1 if one scans a whole table or
+sorts in a temporary B-tree and is not listed in ALLOWED below, or if an
+ALLOWED entry matches no such statement or more than one.
+
+    python tests/query_plans.py
+    python tests/query_plans.py --verbose
+
+A scan passes when it produces the statement's ORDER BY and there is a LIMIT,
+since it walks the table or index in order and stops there.
+"""
+
+import argparse
+import ast
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+from migrations import CACHE_DB_MIGRATIONS, DEFAULT_DB_MIGRATIONS, migrate  # noqa: E402
+
+# tables that stay a handful of rows, where a scan is the cheapest plan
+SMALL_TABLES = {
+    "stats_counters": "one row per counted table",
+    "metrics": "one row per counter name",
+    "upstream_breaker": "a single row",
+    "upstream_budget": "a single row",
+    "maintenance_lease": "a single row",
+}
+# statements off the request hot path whose scans or sorts are accepted, by function and the
+# start of the statement with its whitespace collapsed
+ALLOWED = {
+    ("_api_v1_admin_cache", "SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM upstream_cache"): (
+        "admin dashboard sums the cached responses"
+    ),
+    ("_api_v1_admin_clear_notifications", "DELETE FROM notifications"): "empties the table",
+    ("_api_v1_notes_search", "SELECT notes.subject_team_id, notes.updated_at, bm25("): (
+        "ranking by bm25 sorts the matches, which the MATCH already narrowed"
+    ),
+    ("run_maintenance", "DELETE FROM maintenance_runs WHERE started_at < ?"): (
+        "a week of runs, pruned once per maintenance pass"
+    ),
+    ("run_maintenance", "DELETE FROM stats_snapshots WHERE taken_at < ?"): (
+        "a week of snapshots, pruned once per maintenance pass"
+    ),
+    ("prune_rows[orphaned_strategy]", "DELETE FROM strategy"): (
+        "reads only idx_strategy_team_event_updated once per maintenance pass; an index on "
+        "updated_at alone would cost every board save"
+    ),
+    ("run_backup", "SELECT COUNT(*) FROM sqlite_master"): "once per backup",
+}
+STATEMENT = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+
+
+def function_name(parents: dict, node: ast.AST) -> str:
+    while node in parents:
+        node = parents[node]
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            return node.name
+    return "<module>"
+
+
+def static_statements(tree: ast.Module, parents: dict) -> list[tuple[str, int, str]]:
+    # (function, line, sql) for string literals handed to the database
+    statements = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or not isinstance(node.func, (ast.Attribute, ast.Name)):
+            continue
+        name = node.func.attr if isinstance(node.func, ast.Attribute) else node.func.id
+        if name in ("execute", "executemany"):
+            argument = node.args[0] if node.args else None
+        elif name == "write_upsert":
+            argument = node.args[1] if len(node.args) > 1 else None
+        else:
+            continue
+        if (
+            isinstance(argument, ast.Constant)
+            and isinstance(argument.value, str)
+            and STATEMENT.match(argument.value)
+        ):
+            statements.append((function_name(parents, node), node.lineno, argument.value))
+    return statements
+
+
+def admin_list_statements(tree: ast.Module) -> list[tuple[str, int, str]]:
+    # rebuilds what fetch_page() sends for each admin_list() call: no filter and each filter
+    # (from int_filters() and "column = ?" conditions), each with and without an after cursor
+    statements = []
+    for function in ast.walk(tree):
+        if not isinstance(function, ast.FunctionDef):
+            continue
+        call = None
+        filters = []
+        for node in ast.walk(function):
+            if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+                if node.func.id == "admin_list":
+                    call = node
+                elif node.func.id == "int_filters" and isinstance(node.args[0], ast.Dict):
+                    filters += [f"{value.value} = ?" for value in node.args[0].values]
+            if (
+                isinstance(node, ast.Constant)
+                and isinstance(node.value, str)
+                and re.fullmatch(r"\w+ = \?", node.value)
+            ):
+                filters.append(node.value)
+        if call is None:
+            continue
+
+        select = call.args[1].value
+        key_columns = [element.value for element in call.args[2].elts]
+        descending = call.args[4].value
+        direction = "DESC" if descending else "ASC"
+        order = ", ".join(f"{column} {direction}" for column in key_columns)
+        keyset = (
+            f"({', '.join(key_columns)}) {'<' if descending else '>'} "
+            f"({', '.join('?' for _ in key_columns)})"
+        )
+        for condition in [None] + filters:
+            for after in (False, True):
+                conditions = ([condition] if condition else []) + ([keyset] if after else [])
+                where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+                statements.append(
+                    (function.name, call.lineno, f"{select}{where} ORDER BY {order} LIMIT ?")
+                )
+    return statements
+
+
+def retention_statements(tree: ast.Module) -> list[tuple[str, int, str]]:
+    # what prune_rows() sends for each rule in RETENTION_RULES
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and isinstance(node.targets[0], ast.Name)
+            and node.targets[0].id == "RETENTION_RULES"
+        ):
+            rules = ast.literal_eval(node.value)
+            return [
+                (
+                    f"prune_rows[{rule}]",
+                    node.lineno,
+                    f"DELETE FROM {table} WHERE id IN (SELECT id FROM {table} WHERE {condition} LIMIT ?)",
+                )
+                for rule, (table, condition) in rules.items()
+            ]
+    return []
+
+
+def allowance(function: str, sql: str) -> tuple[str, str] | None:
+    compact = " ".join(sql.split())
+    for key in ALLOWED:
+        if key[0] == function and compact.startswith(key[1]):
+            return key
+    return None
+
+
+def check(db: sqlite3.Connection, sql: str) -> list[str]:
+    plan = [
+        row[3]
+        for row in db.execute(f"EXPLAIN QUERY PLAN {sql}", [None] * sql.count("?"))
+    ]
+    # with a LIMIT and no sort of its own, an ordered scan stops after the rows it returns
+    walks_in_order = (
+        re.search(r"\bORDER BY\b", sql, re.IGNORECASE) is not None
+        and re.search(r"\bLIMIT\b", sql, re.IGNORECASE) is not None
+        and not any("TEMP B-TREE" in detail for detail in plan)
+    )
+    problems = []
+    for detail in plan:
+        # MIN()/MAX() of an unindexed column shows up as a bare "SEARCH table" but reads every row
+        scan = re.fullmatch(r"SCAN (\w+)(.*)|SEARCH (\w+)", detail)
+        table = scan and (scan.group(1) or scan.group(3))
+        if "TEMP B-TREE" in detail:
+            problems.append(detail)
+        elif table and table not in SMALL_TABLES and "VIRTUAL TABLE" not in detail:
+            if not walks_in_order:
+                problems.append(detail)
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN audit of main.py")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    source = open(os.path.join(REPO_DIR, "main.py")).read()
+    tree = ast.parse(source)
+    parents = {
+        child: node for node in ast.walk(tree) for child in ast.iter_child_nodes(node)
+    }
+
+    directory = tempfile.mkdtemp(prefix="vanguard-plans-")
+    default_db_path = os.path.join(directory, "default.db")
+    cache_db_path = os.path.join(directory, "cache.db")
+    migrate(default_db_path, DEFAULT_DB_MIGRATIONS)
+    migrate(cache_db_path, CACHE_DB_MIGRATIONS)
+    databases = [sqlite3.connect(default_db_path), sqlite3.connect(cache_db_path)]
+
+    failures = 0
+    skipped = []
+    used = {}
+    statements = (
+        static_statements(tree, parents)
+        + admin_list_statements(tree)
+        + retention_statements(tree)
+    )
+    for function, line, sql in statements:
+        for db in databases:
+            try:
+                problems = check(db, sql)
+                break
+            except sqlite3.OperationalError as e:
+                if "no such table" not in str(e):
+                    raise
+        else:
+            # e.g. the exchanges table, which only exists in a [record] archive
+            skipped.append((function, line))
+            continue
+
+        compact = " ".join(sql.split())
+        allowed = allowance(function, sql) if problems else None
+        if allowed:
+            used.setdefault(allowed, []).append(line)
+            if args.verbose:
+                print(f"allow main.py:{line} {function}: {compact}")
+        elif problems:
+            failures += 1
+            print(f"FAIL main.py:{line} {function}: {compact}")
+            for problem in problems:
+                print(f"     {problem}")
+        elif args.verbose:
+            print(f"ok   main.py:{line} {function}: {compact}")
+
+    # each entry has to excuse exactly the one statement it was written for
+    for key in ALLOWED:
+        lines = used.get(key, [])
+        if len(lines) != 1:
+            failures += 1
+            where = ", ".join(f"main.py:{line}" for line in lines) or "no statement"
+            print(f"FAIL ALLOWED entry {key} matches {where}")
+
+    for function, line in skipped:
+        print(f"skip main.py:{line} {function}: table not in default.db or cache.db")
+    for db in databases:
+        db.close()
+    shutil.rmtree(directory)
+    print(f"{len(statements)} statements, {failures} failed")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,183 @@
+"""
+Serves a recorded FTC API archive (see [record] in settings.toml) as a stand-in
+for the real API. Point main.py at it with
+
+    [ftc_api]
+    url = "http://127.0.0.1:8001/v2.0"
+
+and ntfy_server_url / registration_notification_url at http://127.0.0.1:8001 to
+capture notifications too.
+
+Responses follow the archive's own clock: with --speed 1 a request made ten
+minutes after startup gets whatever the API returned ten minutes into the
+recording. --speed 0 always serves the latest recorded response.
+"""
+
+from bisect import bisect_right
+from flask import Flask, Response, request
+import argparse
+import json
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+REPLAYED_HEADERS = ("Content-Type", "Last-Modified", "ETag")
+
+
+def exchange_key(method: str, url: str) -> tuple[str, str]:
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return method.upper(), f"{parts.path}?{query}" if query else parts.path
+
+
+def load_archive(path: str) -> dict[tuple[str, str], list[tuple]]:
+    db = sqlite3.connect(path)
+    cursor = db.cursor()
+    # 304s carry no body; the response they confirmed is already in the archive
+    cursor.execute(
+        """SELECT recorded_at, method, url, status_code, response_headers, response_body, elapsed_ms
+           FROM exchanges WHERE status_code != 304 ORDER BY recorded_at"""
+    )
+    exchanges = {}
+    for recorded_at, method, url, status_code, headers, body, elapsed_ms in cursor:
+        headers = json.loads(headers)
+        headers = {name: headers[name] for name in REPLAYED_HEADERS if name in headers}
+        exchanges.setdefault(exchange_key(method, url), []).append(
+            (recorded_at, status_code, headers, zlib.decompress(body), elapsed_ms)
+        )
+    cursor.close()
+    db.close()
+    return exchanges
+
+
+def print_summary(exchanges: dict[tuple[str, str], list[tuple]]):
+    recorded = [entry[0] for entries in exchanges.values() for entry in entries]
+    if not recorded:
+        print("archive is empty")
+        return
+    print(
+        f"{len(recorded)} responses for {len(exchanges)} URLs over "
+        f"{(max(recorded) - min(recorded)) / 60:.1f} minutes"
+    )
+    for (method, path), entries in sorted(exchanges.items()):
+        size = sum(len(entry[3]) for entry in entries)
+        print(f"  {method} {path}: {len(entries)} responses, {size} bytes")
+
+
+def create_app(exchanges: dict[tuple[str, str], list[tuple]], args) -> Flask:
+    app = Flask(__name__)
+    recorded = [entry[0] for entries in exchanges.values() for entry in entries]
+    archive_start = min(recorded, default=0) + args.start
+    started = time.time()
+    timelines = {
+        key: [entry[0] for entry in entries] for key, entries in exchanges.items()
+    }
+    stats = {"served": 0, "notModified": 0, "errors": 0, "missing": 0}
+    stats_lock = threading.Lock()
+
+    def count(name: str):
+        with stats_lock:
+            stats[name] += 1
+
+    def pick(key: tuple[str, str]) -> tuple | None:
+        entries = exchanges.get(key)
+        if not entries:
+            return None
+        if args.speed <= 0:
+            return entries[-1]
+        archive_now = archive_start + (time.time() - started) * args.speed
+        index = bisect_right(timelines[key], archive_now)
+        return entries[max(index - 1, 0)]
+
+    @app.route("/_replay/stats", methods=["GET"])
+    def _replay_stats():
+        return stats, 200
+
+    @app.route("/", defaults={"path": ""}, methods=["GET", "POST"])
+    @app.route("/<path:path>", methods=["GET", "POST"])
+    def _replay(path):
+        if args.recorded_latency:
+            delay = None
+        else:
+            delay = args.latency + random.uniform(-args.jitter, args.jitter)
+
+        if random.random() < args.hang_rate:
+            count("errors")
+            time.sleep(args.hang_seconds)
+            return {"error": "injected hang"}, 504
+        if random.random() < args.error_rate:
+            count("errors")
+            time.sleep(max(0, delay or 0) / 1000)
+            return {"error": "injected failure"}, args.error_status
+
+        entry = pick(exchange_key(request.method, request.full_path.rstrip("?")))
+        if entry is None:
+            if request.method == "POST":
+                # notifications that weren't in the recording are accepted and logged
+                print(f"POST {request.path}: {request.get_data(as_text=True)}")
+                count("served")
+                return {}, 200
+            count("missing")
+            return {"error": f"{request.path} is not in the archive"}, 404
+
+        _, status_code, headers, body, elapsed_ms = entry
+        time.sleep(max(0, elapsed_ms if delay is None else delay) / 1000)
+
+        modified_since = request.headers.get(
+            "FMS-OnlyModifiedSince"
+        ) or request.headers.get("If-Modified-Since")
+        unchanged = (
+            modified_since and modified_since == headers.get("Last-Modified")
+        ) or (
+            request.headers.get("If-None-Match")
+            and request.headers.get("If-None-Match") == headers.get("ETag")
+        )
+        if status_code == 200 and unchanged:
+            count("notModified")
+            return Response(status=304, headers=headers)
+
+        count("served")
+        return Response(body, status=status_code, headers=headers)
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded FTC API archive")
+    parser.add_argument("archive", help="archive written by main.py's [record] path")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="archive seconds per wall second; 0 serves the latest recording",
+    )
+    parser.add_argument(
+        "--start", type=float, default=0, help="seconds into the archive to begin at"
+    )
+    parser.add_argument("--latency", type=float, default=0, help="added delay in ms")
+    parser.add_argument("--jitter", type=float, default=0, help="+/- delay in ms")
+    parser.add_argument(
+        "--recorded-latency",
+        action="store_true",
+        help="delay each response by the time the real API took",
+    )
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--hang-rate", type=float, default=0)
+    parser.add_argument("--hang-seconds", type=float, default=30)
+    parser.add_argument(
+        "--list", action="store_true", help="print what the archive holds and exit"
+    )
+    args = parser.parse_args()
+
+    exchanges = load_archive(args.archive)
+    print_summary(exchanges)
+    if not args.list:
+        create_app(exchanges, args).run(
+            host=args.host, port=args.port, threaded=True
+        )
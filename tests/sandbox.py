@@ -0,0 +1,275 @@
+"""
+Throwaway environments for the benchmark scripts: a data directory with its own
+settings.toml and RSA keys, a synthetic FTC API to point it at, and a gunicorn
+process running main.py out of that directory.
+
+    sandbox = create_sandbox(ftc_api_url)
+    server = start_server(sandbox, port=8100)
+    ...
+    stop_server(server)
+"""
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from flask import Flask, request
+from werkzeug.serving import make_server
+import logging
+import os
+import random
+import requests
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EVENT_CODE = "BENCH"
+FIRST_TEAM = 20000
+
+
+def create_sandbox(
+    ftc_api_url: str, path: str | None = None, extra_settings: str = ""
+) -> str:
+    path = path or tempfile.mkdtemp(prefix="vanguard-sandbox-")
+    os.makedirs(os.path.join(path, "data"), exist_ok=True)
+    ssh_dir = os.path.join(path, "home", ".ssh")
+    os.makedirs(ssh_dir, exist_ok=True)
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    with open(os.path.join(ssh_dir, "id_rsa.pem"), "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    with open(os.path.join(ssh_dir, "id_rsa.pub"), "wb") as f:
+        f.write(
+            key.public_key().public_bytes(
+                serialization.Encoding.PEM,
+                serialization.PublicFormat.SubjectPublicKeyInfo,
+            )
+        )
+
+    # the fake API also swallows ntfy posts
+    base_url = ftc_api_url.rsplit("/v2.0", 1)[0]
+    with open(os.path.join(path, "data", "settings.toml"), "w") as f:
+        f.write(f"""[ftc_api]
+url = "{ftc_api_url}"
+username = "benchmark"
+token = "benchmark"
+
+[notifications]
+ntfy_server_url = "{base_url}"
+ntfy_topic = "FTC-{{}}"
+ntfy_teams = []
+
+[server]
+vanguard_url = "http://localhost"
+
+[admin]
+admin_teams = [{FIRST_TEAM}]
+admin_secret = "JBSWY3DPEHPK3PXP"
+registration_notification_url = "{base_url}/registrations"
+{extra_settings}
+""")
+    return path
+
+
+def start_server(
+    sandbox: str,
+    port: int = 8100,
+    workers: int = 4,
+    worker_class: str = "gevent",
+    extra_args: list[str] | None = None,
+) -> subprocess.Popen:
+    # a server left over from an earlier run would answer the readiness check below
+    with socket.socket() as probe:
+        if probe.connect_ex(("127.0.0.1", port)) == 0:
+            raise RuntimeError(f"port {port} is already in use")
+
+    env = os.environ | {"HOME": os.path.join(sandbox, "home")}
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "main:app",
+            "--config",
+            os.path.join(REPO_DIR, "gunicorn.conf.py"),
+            "--chdir",
+            sandbox,
+            "--pythonpath",
+            REPO_DIR,
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(workers),
+            "--worker-class",
+            worker_class,
+            "--worker-connections",
+            "2000",
+            "--log-level",
+            "warning",
+        ]
+        + (extra_args or []),
+        env=env,
+        stdout=open(os.path.join(sandbox, "gunicorn.log"), "ab"),
+        stderr=subprocess.STDOUT,
+    )
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited, see {sandbox}/gunicorn.log")
+        try:
+            requests.get(f"http://127.0.0.1:{port}/api/v1/verify", timeout=5)
+            return server
+        except requests.RequestException:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("gunicorn did not start within 60 seconds")
+
+
+def stop_server(server: subprocess.Popen):
+    server.terminate()
+    try:
+        server.wait(10)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+class FakeFtcApi:
+    """
+    Serves one synthetic event. Matches are "played" every match_seconds, so
+    scores and rankings change during a run the way they do on event day.
+    """
+
+    def __init__(
+        self,
+        teams: int = 32,
+        matches: int = 60,
+        match_seconds: float = 30,
+        latency_ms: float = 0,
+        port: int = 8101,
+    ):
+        self.team_numbers = [FIRST_TEAM + i for i in range(teams)]
+        self.match_seconds = match_seconds
+        self.latency_ms = latency_ms
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}/v2.0"
+        self.started = time.time()
+        self.requests = 0
+
+        rng = random.Random(EVENT_CODE)
+        start = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
+        self.schedule = []
+        for number in range(1, matches + 1):
+            picked = rng.sample(self.team_numbers, 4)
+            self.schedule.append(
+                {
+                    "description": f"Qualification {number}",
+                    "field": str(number % 2 + 1),
+                    "tournamentLevel": "QUALIFICATION",
+                    "matchNumber": number,
+                    "startTime": (start + timedelta(minutes=6 * number)).isoformat(),
+                    "teams": [
+                        {"teamNumber": team, "station": station, "surrogate": False}
+                        for team, station in zip(
+                            picked, ("Red1", "Red2", "Blue1", "Blue2")
+                        )
+                    ],
+                }
+            )
+        self.scores = [
+            {
+                "matchLevel": "QUALIFICATION",
+                "matchNumber": match["matchNumber"],
+                "alliances": [
+                    {"alliance": "Red", "totalPoints": rng.randint(20, 250)},
+                    {"alliance": "Blue", "totalPoints": rng.randint(20, 250)},
+                ],
+            }
+            for match in self.schedule
+        ]
+
+        self.app = Flask(__name__)
+        self.app.add_url_rule(
+            "/<path:path>", view_func=self.handle, methods=["GET", "POST"]
+        )
+
+    def played(self) -> int:
+        elapsed = time.time() - self.started
+        return min(len(self.schedule), int(elapsed / self.match_seconds) + 1)
+
+    def last_modified(self) -> str:
+        played_at = self.started + (self.played() - 1) * self.match_seconds
+        return format_datetime(datetime.fromtimestamp(played_at, timezone.utc), True)
+
+    def handle(self, path: str):
+        self.requests += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        if request.method == "POST":
+            return {}, 200
+
+        parts = path.split("/")
+        resource = parts[2] if len(parts) > 2 else ""
+        if resource == "events":
+            return {
+                "events": [
+                    {
+                        "code": EVENT_CODE,
+                        "name": "Benchmark Event",
+                        "dateStart": (datetime.now() - timedelta(weeks=34)).isoformat(),
+                    }
+                ]
+            }, 200
+        if resource == "teams":
+            team_number = request.args.get("teamNumber", type=int)
+            numbers = [team_number] if team_number else self.team_numbers
+            return {
+                "teams": [
+                    {"teamNumber": n, "nameShort": f"Team {n}", "city": "Bench"}
+                    for n in numbers
+                ]
+            }, 200
+        if resource == "schedule":
+            if request.args.get("tournamentLevel") == "playoff":
+                return {"schedule": []}, 200
+            return {"schedule": self.schedule}, 200
+
+        # scores and rankings follow the matches played so far
+        last_modified = self.last_modified()
+        if request.headers.get("FMS-OnlyModifiedSince") == last_modified:
+            return "", 304
+        headers = {"Last-Modified": last_modified}
+        played = self.played()
+        if resource == "scores":
+            if parts[-1] == "playoff":
+                return {"matchScores": []}, 200, headers
+            return {"matchScores": self.scores[:played]}, 200, headers
+        if resource == "matches":
+            return {"matches": self.schedule[:played]}, 200, headers
+        if resource == "rankings":
+            shuffled = random.Random(played).sample(
+                self.team_numbers, len(self.team_numbers)
+            )
+            return {
+                "rankings": [
+                    {"rank": rank, "teamNumber": team, "matchesPlayed": played}
+                    for rank, team in enumerate(shuffled, 1)
+                ]
+            }, 200, headers
+        return {"error": "not found"}, 404
+
+    def start(self) -> str:
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        server = make_server("127.0.0.1", self.port, self.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return self.url
@@ -0,0 +1,176 @@
+"""
+Latency of GET /api/v1/notes/search against a database of synthetic scouting
+notes, next to what the client did before: fetching every note with
+/api/v1/notes/bulk and searching them itself.
+
+    python tests/search_benchmark.py --notes 100000 --teams 200 --output search.json
+
+Notes are inserted with the FTS5 triggers in place, so the insert rate shows
+what the index costs each save.
+"""
+
+from argon2 import PasswordHasher
+from sandbox import FIRST_TEAM, REPO_DIR, create_sandbox, start_server, stop_server
+import argparse
+import json
+import os
+import random
+import requests
+import sqlite3
+import statistics
+import sys
+import time
+
+sys.path.insert(0, REPO_DIR)
+from migrations import DEFAULT_DB_PATH, migrate_databases  # noqa: E402
+
+PASSWORD = "benchmark-password"
+PHRASES = [
+    "reliable climb",
+    "fast cycles",
+    "slow intake",
+    "scored preload",
+    "specimen on high chamber",
+    "samples in the high basket",
+    "parked in observation zone",
+    "level 3 ascent",
+    "good defense",
+    "drivetrain broke mid match",
+    "consistent auton",
+    "dropped samples",
+    "intake jammed",
+    "great driver",
+    "disconnected in teleop",
+    "strong alliance partner",
+    "missed the climb",
+    "tipped over",
+]
+QUERIES = {
+    "common word": "climb",
+    "two words": "reliable climb",
+    "rare word": "tipped",
+    "prefix": "disc",
+    "no match": "mecanum",
+}
+
+
+def sentence(rng: random.Random, phrases: int) -> str:
+    return ", ".join(rng.choice(PHRASES) for _ in range(phrases))
+
+
+def populate(path: str, notes: int, teams: int, seed: int) -> float:
+    # returns notes inserted per second
+    rng = random.Random(seed)
+    subjects = max(1, notes // teams)
+    now = int(time.time())
+    db = sqlite3.connect(path)
+    # the benchmark searches as the first team
+    db.execute(
+        "INSERT INTO users (id, password) VALUES (?, ?)",
+        (FIRST_TEAM, PasswordHasher().hash(PASSWORD)),
+    )
+    rows = (
+        (
+            FIRST_TEAM + index // subjects,
+            1000 + index % subjects,
+            sentence(rng, rng.randint(1, 2)),
+            sentence(rng, rng.randint(1, 4)),
+            sentence(rng, rng.randint(0, 6)),
+            now - rng.randint(0, 86400 * 60),
+        )
+        for index in range(notes)
+    )
+    started = time.perf_counter()
+    db.executemany(
+        """INSERT INTO notes (team_id, subject_team_id, auto_performance, teleop_performance, general_notes, updated_at)
+           VALUES (?, ?, ?, ?, ?, ?)""",
+        rows,
+    )
+    db.commit()
+    elapsed = time.perf_counter() - started
+    db.close()
+    return notes / elapsed
+
+
+def time_requests(session: requests.Session, url: str, params: dict, runs: int) -> tuple[list[float], int]:
+    timings = []
+    size = 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        r = session.get(url, params=params, timeout=60)
+        timings.append((time.perf_counter() - started) * 1000)
+        r.raise_for_status()
+        size = len(r.content)
+    return timings, size
+
+
+def summarize(timings: list[float], size: int) -> dict:
+    timings = sorted(timings)
+    return {
+        "p50": round(statistics.median(timings), 2),
+        "p95": round(timings[max(0, int(round(0.95 * len(timings))) - 1)], 2),
+        "bytes": size,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Notes full-text search benchmark")
+    parser.add_argument("--notes", type=int, default=100000)
+    parser.add_argument("--teams", type=int, default=200, help="scouting teams the notes belong to")
+    parser.add_argument("--runs", type=int, default=50, help="requests per query")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--sandbox", help="directory to build the sandbox in")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    # search never calls the FTC API
+    sandbox = create_sandbox("http://127.0.0.1:9/v2.0", args.sandbox)
+    print(f"sandbox: {sandbox}")
+    os.chdir(sandbox)
+    migrate_databases(DEFAULT_DB_PATH, "data/cache.db")
+    insert_rate = populate(DEFAULT_DB_PATH, args.notes, args.teams, args.seed)
+    print(f"inserted {args.notes} notes at {insert_rate:.0f}/s with the search index")
+
+    server = start_server(sandbox, args.port, args.workers)
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        session = requests.Session()
+        r = session.post(
+            f"{base_url}/api/v1/login",
+            json={"id": FIRST_TEAM, "password": PASSWORD},
+            timeout=30,
+        )
+        r.raise_for_status()
+        session.headers["Authorization"] = f"Bearer {r.json()['token']}"
+
+        results = {}
+        for name, query in QUERIES.items():
+            timings, size = time_requests(
+                session, f"{base_url}/api/v1/notes/search", {"q": query}, args.runs
+            )
+            results[f"search: {name}"] = summarize(timings, size)
+        timings, size = time_requests(
+            session, f"{base_url}/api/v1/notes/bulk", {}, args.runs
+        )
+        results["all notes (client-side search)"] = summarize(timings, size)
+    finally:
+        stop_server(server)
+
+    print(f"{'request':<32} {'p50 ms':>10} {'p95 ms':>10} {'bytes':>10}")
+    for name, summary in results.items():
+        print(f"{name:<32} {summary['p50']:>10.2f} {summary['p95']:>10.2f} {summary['bytes']:>10}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "notes": args.notes,
+                    "teams": args.teams,
+                    "insertsPerSecond": round(insert_rate),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
@@ -0,0 +1,107 @@
+"""
+What schema setup costs a starting worker. Times migrate_databases() on a new
+database, on an up-to-date one (what each worker now does on import) and with
+user_version reset so every migration reruns (what each worker used to do),
+then the full `import main` and gunicorn boot to first response.
+
+    python tests/startup_benchmark.py --runs 20 --workers 4 --output startup.json
+"""
+
+from sandbox import REPO_DIR, create_sandbox, start_server, stop_server
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, REPO_DIR)
+from migrations import DEFAULT_DB_PATH, migrate_databases  # noqa: E402
+
+
+def reset_versions(sandbox: str):
+    for name in ("default.db", "cache.db"):
+        db = sqlite3.connect(os.path.join(sandbox, "data", name))
+        db.execute("PRAGMA user_version = 0")
+        db.commit()
+        db.close()
+
+
+def time_migrations(sandbox: str, runs: int, reset: bool) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        if reset:
+            reset_versions(sandbox)
+        started = time.perf_counter()
+        migrate_databases(DEFAULT_DB_PATH, "data/cache.db")
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def time_import(sandbox: str, runs: int) -> list[float]:
+    env = os.environ | {"HOME": os.path.join(sandbox, "home"), "PYTHONPATH": REPO_DIR}
+    script = "import time; started = time.perf_counter(); import main; print((time.perf_counter() - started) * 1000)"
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=sandbox,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def time_boot(sandbox: str, port: int, workers: int) -> float:
+    started = time.perf_counter()
+    server = start_server(sandbox, port, workers)
+    elapsed = (time.perf_counter() - started) * 1000
+    stop_server(server)
+    return elapsed
+
+
+def summarize(timings: list[float]) -> dict:
+    return {
+        "median": round(statistics.median(timings), 2),
+        "max": round(max(timings), 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker startup benchmark")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--sandbox", help="directory to build the sandbox in")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    # nothing is fetched from the FTC API while starting up
+    sandbox = create_sandbox("http://127.0.0.1:9/v2.0", args.sandbox)
+    print(f"sandbox: {sandbox}")
+    os.chdir(sandbox)
+
+    results = {
+        "migrate (new database)": time_migrations(sandbox, 1, reset=False),
+        "migrate (every start, old behaviour)": time_migrations(sandbox, args.runs, reset=True),
+        "migrate (up to date, version check)": time_migrations(sandbox, args.runs, reset=False),
+        "import main": time_import(sandbox, args.runs),
+        f"gunicorn boot ({args.workers} workers)": [
+            time_boot(sandbox, args.port, args.workers) for _ in range(3)
+        ],
+    }
+
+    print(f"{'step':<40} {'median ms':>10} {'max ms':>10}")
+    summary = {}
+    for step, timings in results.items():
+        summary[step] = summarize(timings)
+        print(f"{step:<40} {summary[step]['median']:>10.2f} {summary[step]['max']:>10.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"runs": args.runs, "workers": args.workers, "results": summary}, f, indent=2)
@@ -0,0 +1,119 @@
+"""
+Checks POST and PATCH /api/v1/strategy against a sandbox server: strokes round
+trip through the compact encoding to within 1/STROKE_SCALE, and coordinates or
+widths that are NaN, infinite or too large for a float are a 400, not a 500.
+Exits with 1 on any failure.
+
+    python tests/strokes.py
+"""
+
+from argon2 import PasswordHasher
+from sandbox import FIRST_TEAM, REPO_DIR, create_sandbox, start_server, stop_server
+import argparse
+import json
+import os
+import requests
+import sqlite3
+import sys
+
+sys.path.insert(0, REPO_DIR)
+from migrations import DEFAULT_DB_PATH, migrate_databases  # noqa: E402
+
+PASSWORD = "strokes-password"
+BOARD = {"eventCode": "STROKES", "matchNumber": 1, "matchDescription": "Match 1", "phase": "auto"}
+STROKE = {
+    "color": "#ff0000",
+    "isEraser": False,
+    "lineWidthFactor": 0.5,
+    "points": [{"x": 0.125, "y": 0.25}, {"x": 0.5, "y": 0.75}],
+}
+# request bodies written out by hand, since json.dumps would refuse or rewrite some of these
+BAD_VALUES = ["NaN", "Infinity", "-Infinity", "1e400", "1e305"]
+
+
+def stroke_body(x: str = "0.5", width: str = "0.5") -> str:
+    return (
+        f'{{"color": "#00ff00", "lineWidthFactor": {width}, '
+        f'"points": [{{"x": {x}, "y": 0.5}}]}}'
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Strategy stroke validation check")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    # strategy never calls the FTC API
+    sandbox = create_sandbox("http://127.0.0.1:9/v2.0")
+    os.chdir(sandbox)
+    migrate_databases(DEFAULT_DB_PATH, "data/cache.db")
+    db = sqlite3.connect(DEFAULT_DB_PATH)
+    db.execute(
+        "INSERT INTO users (id, password) VALUES (?, ?)",
+        (FIRST_TEAM, PasswordHasher().hash(PASSWORD)),
+    )
+    db.commit()
+    db.close()
+
+    failures = []
+    server = start_server(sandbox, args.port, 1)
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        session = requests.Session()
+        r = session.post(
+            f"{base_url}/api/v1/login",
+            json={"id": FIRST_TEAM, "password": PASSWORD},
+            timeout=30,
+        )
+        r.raise_for_status()
+        session.headers["Authorization"] = f"Bearer {r.json()['token']}"
+
+        r = session.post(
+            f"{base_url}/api/v1/strategy", json=BOARD | {"strokes": [STROKE]}, timeout=30
+        )
+        if r.status_code != 200:
+            failures.append(f"POST valid strokes: {r.status_code} {r.text}")
+        r = session.get(
+            f"{base_url}/api/v1/strategy",
+            params={"event": "STROKES", "match": 1, "description": "Match 1", "phase": "auto"},
+            timeout=30,
+        )
+        # strokes come back as the JSON text the client stores
+        strokes = json.loads(r.json()["strategy"]["strokes"] or "[{}]") if r.ok else [{}]
+        points = strokes[0].get("points", [])
+        if len(points) != 2 or any(
+            abs(got[axis] - want[axis]) > 1 / 4096
+            for got, want in zip(points, STROKE["points"])
+            for axis in ("x", "y")
+        ):
+            failures.append(f"round trip: {r.status_code} {r.text[:200]}")
+
+        headers = {"Content-Type": "application/json"}
+        board = ", ".join(
+            f'"{key}": {value!r}'.replace("'", '"') for key, value in BOARD.items()
+        )
+        for value in BAD_VALUES:
+            for field, stroke in (("x", stroke_body(x=value)), ("lineWidthFactor", stroke_body(width=value))):
+                r = session.post(
+                    f"{base_url}/api/v1/strategy",
+                    data=f'{{{board}, "strokes": [{stroke}]}}',
+                    headers=headers,
+                    timeout=30,
+                )
+                if r.status_code != 400:
+                    failures.append(f"POST {field} = {value}: {r.status_code}, expected 400")
+                r = session.patch(
+                    f"{base_url}/api/v1/strategy",
+                    data=f'{{{board}, "baseCount": 1, "append": [{stroke}]}}',
+                    headers=headers,
+                    timeout=30,
+                )
+                if r.status_code != 400:
+                    failures.append(f"PATCH {field} = {value}: {r.status_code}, expected 400")
+    finally:
+        stop_server(server)
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(BAD_VALUES) * 4 + 1} checks, {len(failures)} failed")
+    sys.exit(1 if failures else 0)